@@ -0,0 +1,37 @@
+"""
+Benchmark of scrapping engines of WikiPageRankInfoAccumulator against
+a local stand-in server, reports pages per second for every engine
+
+Run as: python -m page_ranker_app.benchmarks.crawl_engines
+"""
+
+from page_ranker_app import settings
+from page_ranker_app.source.page_rankers import WikiPageRankInfoAccumulator
+from page_ranker_app.source.wiki_server import running_wiki_server
+
+
+def main(pages_number: int, max_workers: int) -> None:
+    """
+    Function crawls all pages of a stand-in server with every engine
+    and prints pages per second for each of them
+
+    :param pages_number: a number of pages to crawl
+    :param max_workers: max number of workers or in-flight requests
+    :return: None
+    """
+    with running_wiki_server(pages_number=pages_number) as base_url:
+        for engine in ("threads", "asyncio", "pipeline"):
+            accumulator = WikiPageRankInfoAccumulator(
+                base_url + "/wiki/Page_0", pages_number
+            )
+            accumulator.scrap_data_till_limit(max_workers, engine=engine)
+            stats = accumulator.crawl_stats
+            print(
+                f"{engine:>8}: {stats['pages']} pages in "
+                f"{stats['seconds']:.2f} s, "
+                f"{stats['pages_per_second']:.1f} pages/s"
+            )
+
+
+if __name__ == "__main__":
+    main(pages_number=2000, max_workers=settings.THREADS_SCRAPPING)
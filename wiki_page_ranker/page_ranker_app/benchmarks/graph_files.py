@@ -0,0 +1,63 @@
+"""
+Benchmark of ranking a saved link graph against building the graph
+from crawled page links, on a random graph of a given size
+
+Run as: python -m page_ranker_app.benchmarks.graph_files
+"""
+
+import pathlib
+import tempfile
+import timeit
+
+import numpy as np
+
+from page_ranker_app.source import graph_files, graphs, rank_engines
+
+
+def main(pages_number: int, links_per_page: int) -> None:
+    """
+    Function builds a random graph, saves it and prints times of
+    building a matrix from a UrlGraph, opening the saved file and
+    ranking the opened matrix
+
+    :param pages_number: a number of pages in the graph
+    :param links_per_page: a number of links on every page
+    :return: None
+    """
+    rng = np.random.default_rng(0)
+    graph = graphs.UrlGraph()
+    targets = rng.integers(0, pages_number, (pages_number, links_per_page))
+    for page, links in enumerate(targets.tolist()):
+        graph.add_page(
+            f"/wiki/Page_{page}", [f"/wiki/Page_{i}" for i in links]
+        )
+
+    start = timeit.default_timer()
+    matrix = rank_engines.LinkMatrix.from_page_links(graph)
+    build_time = timeit.default_timer() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / "graph.bin"
+        start = timeit.default_timer()
+        graph_files.save_link_matrix(matrix, path)
+        save_time = timeit.default_timer() - start
+
+        start = timeit.default_timer()
+        mapped = graph_files.open_link_matrix(path)
+        open_time = timeit.default_timer() - start
+
+        start = timeit.default_timer()
+        result = rank_engines.PowerIterationRankEngine().rank(mapped)
+        rank_time = timeit.default_timer() - start
+        size = path.stat().st_size / 2**20
+
+    print(
+        f"{matrix.edges_number} edges, {size:.1f} MB file: "
+        f"build {build_time:.2f} s, save {save_time:.2f} s, "
+        f"open {open_time * 1000:.2f} ms, "
+        f"rank {rank_time:.2f} s ({result.iterations} iterations)"
+    )
+
+
+if __name__ == "__main__":
+    main(pages_number=500_000, links_per_page=10)
@@ -0,0 +1,98 @@
+"""
+Benchmark of dictionary inverters on random link graphs of 10k to 10M
+edges stored in a UrlGraph, as WikiPageRankInfoAccumulator stores
+them, reports seconds of invert_dict for every inverter (the processing
+one both with a task per key-value pair and in the chunked mode, with
+a process per CPU core) and of inverting edge arrays for the NumPy
+inverter; slow inverters are skipped on large graphs
+
+Run as: python -m page_ranker_app.benchmarks.inverters
+"""
+
+import functools
+import os
+import timeit
+
+import numpy as np
+
+from page_ranker_app.source import graphs, inverters
+
+LINKS_PER_PAGE = 10
+WORKERS = os.cpu_count() or 1
+# inverting functions by column name with max numbers of edges
+INVERTERS = {
+    "Sync": (inverters.DictionaryInverterSync().invert_dict, 10_000_000),
+    "Threading": (
+        inverters.DictionaryInverterThreading().invert_dict,
+        1_000_000,
+    ),
+    "PerPair": (
+        functools.partial(
+            inverters.DictionaryInverterProcessing().invert_dict,
+            max_workers=WORKERS,
+            chunk_size=None,
+        ),
+        100_000,
+    ),
+    "Chunked": (
+        functools.partial(
+            inverters.DictionaryInverterProcessing().invert_dict,
+            max_workers=WORKERS,
+        ),
+        10_000_000,
+    ),
+    "Numpy": (inverters.DictionaryInverterNumpy().invert_dict, 10_000_000),
+}
+
+
+def make_page_links(edges_number: int) -> graphs.UrlGraph:
+    """
+    Function generates a graph of page links with a given number of
+    edges, LINKS_PER_PAGE random links on every page
+
+    :param edges_number: a number of edges
+    :return: a UrlGraph instance
+    """
+    pages_number = edges_number // LINKS_PER_PAGE
+    urls = [f"/wiki/Page_{page}" for page in range(pages_number)]
+    targets = np.random.default_rng(0).integers(
+        0, pages_number, (pages_number, LINKS_PER_PAGE)
+    )
+    graph = graphs.UrlGraph()
+    for url, links in zip(urls, targets.tolist()):
+        graph.add_page(url, [urls[target] for target in links])
+    return graph
+
+
+def main() -> None:
+    """
+    Function prints a table of inverting times in seconds
+
+    :return: None
+    """
+    print(f"{'edges':>10}" + "".join(f"{name:>12}" for name in INVERTERS))
+    for edges_number in (10_000, 100_000, 1_000_000, 10_000_000):
+        page_links = make_page_links(edges_number)
+        row = f"{edges_number:>10}"
+        for invert_dict, max_edges in INVERTERS.values():
+            if edges_number > max_edges:
+                row += f"{'-':>12}"
+                continue
+            spent_time = timeit.timeit(
+                lambda: invert_dict(page_links), number=1
+            )
+            row += f"{spent_time:>12.3f}"
+        print(row, flush=True)
+
+        sources, targets = page_links.edge_arrays()
+        spent_time = timeit.timeit(
+            lambda: inverters.DictionaryInverterNumpy.invert_edges(
+                sources, targets, page_links.nodes_number
+            ),
+            number=1,
+        )
+        print(f"{'':>10}{'arrays only':>48}{spent_time:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark of WikiParser backends on the example Wikipedia pages,
+reports parsing speed in MB/s for every backend
+
+Run as: python -m page_ranker_app.benchmarks.parsers
+"""
+
+import pathlib
+import timeit
+
+from page_ranker_app import settings
+from page_ranker_app.source.parsers import WikiParser
+
+EXAMPLES_DIR = settings.BASE_DIR / "tests" / "test_examples"
+
+
+def main(repeat: int) -> None:
+    """
+    Function parses every example page a given number of times with
+    every backend and prints parsing speed
+
+    :param repeat: a number of times every page is parsed
+    :return: None
+    """
+    pages = [
+        path.read_text(encoding="utf-8")
+        for path in sorted(pathlib.Path(EXAMPLES_DIR).glob("*.html"))
+    ]
+    megabytes = sum(len(page.encode("utf-8")) for page in pages) / 2**20
+
+    for backend in WikiParser.backends:
+        parser = WikiParser(backend)
+        spent_time = timeit.timeit(
+            lambda: [parser.parse(page) for page in pages], number=repeat
+        )
+        print(
+            f"{backend:>8}: {megabytes * repeat / spent_time:.1f} MB/s, "
+            f"{len(pages) * repeat / spent_time:.0f} pages/s"
+        )
+
+
+if __name__ == "__main__":
+    main(repeat=50)
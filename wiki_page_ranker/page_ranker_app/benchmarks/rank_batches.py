@@ -0,0 +1,63 @@
+"""
+Benchmark of batched PageRank against separate runs for every damping
+factor, on a random graph with power-law in-degrees like the ones of
+Wikipedia pages
+
+Run as: python -m page_ranker_app.benchmarks.rank_batches
+"""
+
+import timeit
+
+import numpy as np
+
+from page_ranker_app.source import rank_engines
+
+BATCH_SIZES = (1, 4, 16, 32)
+
+
+def main(pages_number: int, links_per_page: int) -> None:
+    """
+    Function builds a random link matrix and prints times of ranking it
+    for batches of damping factors with a run per damping factor and
+    with one batched run
+
+    :param pages_number: a number of pages in the graph
+    :param links_per_page: a number of links on every page
+    :return: None
+    """
+    rng = np.random.default_rng(0)
+    sources = np.repeat(np.arange(pages_number), links_per_page)
+    popularity = rng.pareto(1.2, len(sources)) * 50
+    targets = rng.permutation(pages_number)[
+        np.minimum(popularity.astype(np.int64), pages_number - 1)
+    ]
+    matrix = rank_engines.LinkMatrix.from_edges(
+        [f"/wiki/Page_{page}" for page in range(pages_number)],
+        sources,
+        targets,
+    )
+
+    print(f"{matrix.edges_number} edges")
+    for batch_size in BATCH_SIZES:
+        rank_settings = [
+            rank_engines.RankSetting(0.85 - 0.01 * number)
+            for number in range(batch_size)
+        ]
+        start = timeit.default_timer()
+        for setting in rank_settings:
+            rank_engines.PowerIterationRankEngine(setting.damping).rank(matrix)
+        separate_time = timeit.default_timer() - start
+
+        start = timeit.default_timer()
+        rank_engines.PowerIterationRankEngine().rank_batch(
+            matrix, rank_settings
+        )
+        batch_time = timeit.default_timer() - start
+        print(
+            f"{batch_size} settings: separate {separate_time:.2f} s, "
+            f"batch {batch_time:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main(pages_number=200_000, links_per_page=10)
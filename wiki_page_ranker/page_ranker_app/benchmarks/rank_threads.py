@@ -0,0 +1,70 @@
+"""
+Benchmark of the blocked rank engine on a random graph, reports
+seconds of a single-threaded PowerIterationRankEngine run and of
+BlockedPowerIterationRankEngine runs with 1 to N threads, where N is
+a number of CPU cores, with speedups over one thread
+
+Run as: python -m page_ranker_app.benchmarks.rank_threads
+"""
+
+import os
+import timeit
+
+import numpy as np
+
+from page_ranker_app.source import rank_engines
+
+CORES = os.cpu_count() or 1
+
+
+def thread_numbers() -> list:
+    """
+    Function returns numbers of threads to measure: powers of two below
+    a number of CPU cores and the number itself
+
+    :return: a list of numbers of threads
+    """
+    numbers = [2**power for power in range(CORES.bit_length())]
+    return sorted({*[number for number in numbers if number < CORES], CORES})
+
+
+def main(pages_number: int, links_per_page: int) -> None:
+    """
+    Function builds a random link matrix and prints times of ranking it
+    with the single-threaded engine and with the blocked engine for
+    every number of threads
+
+    :param pages_number: a number of pages in the graph
+    :param links_per_page: a number of links on every page
+    :return: None
+    """
+    rng = np.random.default_rng(0)
+    matrix = rank_engines.LinkMatrix.from_edges(
+        [f"/wiki/Page_{page}" for page in range(pages_number)],
+        np.repeat(np.arange(pages_number), links_per_page),
+        rng.integers(0, pages_number, pages_number * links_per_page),
+    )
+    print(f"{matrix.edges_number} edges, {CORES} cores")
+
+    start = timeit.default_timer()
+    result = rank_engines.PowerIterationRankEngine().rank(matrix)
+    print(
+        f"single-threaded: {timeit.default_timer() - start:.2f} s "
+        f"({result.iterations} iterations)"
+    )
+
+    one_thread_time = None
+    for threads in thread_numbers():
+        engine = rank_engines.BlockedPowerIterationRankEngine(threads=threads)
+        start = timeit.default_timer()
+        engine.rank(matrix)
+        spent_time = timeit.default_timer() - start
+        one_thread_time = one_thread_time or spent_time
+        print(
+            f"blocked, {threads} threads: {spent_time:.2f} s "
+            f"(x{one_thread_time / spent_time:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main(pages_number=2_000_000, links_per_page=25)
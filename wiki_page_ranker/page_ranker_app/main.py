@@ -1,23 +1,46 @@
+from typing import Optional
+
+from page_ranker_app import settings
 from page_ranker_app.source.page_rankers import WikiPageRankInfoAccumulator
-from page_ranker_app.source import utils
+from page_ranker_app.source import graph_files, rank_engines, utils
 
 
-def main(url: str, limit: int) -> None:
+def main(
+    url: str, limit: int, graph_path: Optional[str] = settings.GRAPH_PATH
+) -> None:
     """
     Main script of the project, it organizes collection of data, its
     processing and output
     :param url: given starting URL
     :param limit: a limit of URLs to scrap
+    :param graph_path: a path to save the crawled graph to, it is not
+    saved if None
     :return: None
     """
     wiki_scraper = WikiPageRankInfoAccumulator(url, limit)
     wiki_scraper.scrap_data_till_limit()
+    if graph_path is not None:
+        wiki_scraper.save_graph(graph_path)
     wiki_scraper.count_page_rank()
 
     distribution = utils.count_distribution(wiki_scraper.page_rank)
     utils.print_hist_and_plot_combined(distribution)
 
 
+def rank_saved_graph(graph_path: str) -> None:
+    """
+    Script ranks a graph saved by main without scrapping it again and
+    outputs the rank distribution
+    :param graph_path: a path of the saved graph
+    :return: None
+    """
+    matrix = graph_files.open_link_matrix(graph_path)
+    result = rank_engines.PowerIterationRankEngine().rank(matrix)
+
+    distribution = utils.count_distribution(result.scores)
+    utils.print_hist_and_plot_combined(distribution)
+
+
 if __name__ == "__main__":
     test_url = "https://en.wikipedia.org/wiki/Superintendent"
     test_limit = 1000
@@ -3,6 +3,7 @@ File contains default settings for all subsystems of the project
 """
 
 import logging
+import os
 import pathlib
 
 
@@ -22,15 +23,90 @@ THREADS_INVERTING = 100
 
 # Multiprocessing inverter
 PROCESSES_INVERTING = 20
+INVERTING_CHUNK_SIZE = 10_000  # pairs per task, None for a task per pair
+
+
+# ----> urls.py defaults <-----
+CANONICAL_URL_CACHE_SIZE = 2**16  # memoized link to canonical URL pairs
+
+
+# ----> parsers.py defaults <-----
+PARSER_BACKEND = "scanner"  # "scanner" or "bs4"
+STREAM_END_MARKER = '<div class="printfooter"'  # end of main page content
 
 
 # ----> crawlers.py defaults <-----
 REQUEST_TIMEOUT = 5
 
+# MediaWiki API crawler
+MEDIAWIKI_API_PATH = "/w/api.php"
+API_BATCH_SIZE = 50  # titles per request, the API limit for most clients
 
-# ----> page_ranker.py defaults <-----
-THREADS_SCRAPPING = 200  # 1 worker does 1 request per second
+# Streaming crawler
+STREAM_CHUNK_SIZE = 16 * 2**10  # bytes read from a response at once
+STREAM_MAX_BODY_SIZE = 8 * 2**20  # bytes, reading stops after them
+
+
+# ----> sessions.py defaults <-----
+MAX_HOST_CONNECTIONS = None  # kept-alive connections per host, None for all
+CONNECTION_POOL_HOSTS = 10  # hosts whose connection pools are kept
+
+
+# ----> caches.py defaults <-----
+RESPONSE_CACHE_DIR = None  # a directory path enables the cache
+RESPONSE_CACHE_TTL = 24 * 60 * 60  # seconds an entry stays fresh
+RESPONSE_CACHE_MAX_SIZE = 512 * 2**20  # bytes
+
+
+# ----> checkpoints.py defaults <-----
+CHECKPOINT_PATH = None  # a file path enables checkpoints
+CHECKPOINT_INTERVAL = 5  # seconds between flushes to disk
+
+
+# ----> rate_limiters.py defaults <-----
 MAX_REQUESTS_PER_SECOND = 200
+MAX_HOST_REQUESTS_PER_SECOND = 200
+RATE_LIMIT_BURST = 20
+
+
+# ----> concurrency.py defaults <-----
+CONCURRENCY_INITIAL = 10
+CONCURRENCY_MIN = 1
+CONCURRENCY_WINDOW = 50  # requests between decisions
+CONCURRENCY_LATENCY_TOLERANCE = 3.0  # p95 latency / baseline latency
+CONCURRENCY_MAX_ERROR_RATE = 0.02  # share of 429 and 5xx responses
+CONCURRENCY_DECREASE_FACTOR = 0.5
+
+
+# ----> page_ranker.py defaults <-----
+THREADS_SCRAPPING = 50  # upper bound, in-flight requests adapt below it
+SCRAPPING_ENGINE = "threads"  # "threads", "asyncio", "pipeline" or "api"
+STREAMING_FETCH = False  # True extracts links while pages download
+
+GRAPH_PATH = None  # a file path saves the crawled graph for re-ranking
+
+# Pipeline engine
+PROCESSES_PARSING = os.cpu_count() or 1
+PIPELINE_QUEUE_SIZE = 100
+
+
+# ----> rank_engines.py defaults <-----
+DAMPING_FACTOR = 0.85
+RANK_TOLERANCE = 1e-8
+MAX_RANK_ITERATIONS = 100
+WARM_START_LOCAL_FRACTION = 0.1  # max share of pages updated locally
+WARM_START_LOCAL_TOLERANCE = 1e-2  # relative rank change to propagate
+
+# Blocked rank engine
+THREADS_RANKING = os.cpu_count() or 1
+RANK_BLOCK_EDGES = 2**16  # links per row block, 512 KB of gathered ranks
+
+# Live Monte Carlo estimates during scrapping
+LIVE_RANK = False  # True updates rank estimates as pages are scrapped
+LIVE_RANK_WALKS = 10  # random walks started at every node
+LIVE_RANK_CONFIDENCE_Z = 1.96  # standard errors in an error bound
+LIVE_RANK_STABLE_PAGES = 50  # pages an unchanged top k needs to stop
+LIVE_RANK_CHECK_PAGES = 10  # recorded pages between checks of top k
 
 
 # ----> loggers.py defaults <-----
@@ -44,6 +120,10 @@ CRAWLER_LOGGER_NAME = "Crawler"
 CRAWLER_LOGGER_LEVEL = logging.INFO
 CRAWLER_FORMAT = "%(name)s %(levelname)s %(asctime)s - %(message)s"
 
+# Metrics logger
+METRICS_LOGGER_NAME = "Metrics"
+METRICS_LOGGER_LEVEL = logging.INFO
+
 
 # ----> utils.py defaults <-----
 # handle_errors
@@ -0,0 +1,293 @@
+"""
+On-disk caches of HTTP responses, that let repeated crawls read pages
+locally or revalidate them with conditional requests
+"""
+
+import collections
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+import zlib
+
+from typing import Dict, NamedTuple, Optional, Union
+
+from page_ranker_app import settings
+from page_ranker_app.source.loggers import crawler_logger
+
+
+class CachedResponse(NamedTuple):
+    """
+    a cached response body with validators of its version
+    """
+
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """
+        getter for headers of a conditional request, that lets the
+        server answer with 304 status if the cached version is current
+
+        :return: a dictionary of request headers
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    a thread-safe on-disk cache of response bodies
+
+    An entry is stored in a file named by a SHA-256 digest of its URL,
+    which holds a JSON header line with validators followed by a
+    zlib-compressed body. The modification time of the file is the time
+    the entry was stored or last revalidated, and its access time is
+    the time of the last lookup. Entries younger than ttl are fresh and can be
+    used without a request, older ones need revalidation; expired
+    entries without validators are evicted on lookup, and the least
+    recently used entries are evicted while the cache is above max_size
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        ttl: float = settings.RESPONSE_CACHE_TTL,
+        max_size: int = settings.RESPONSE_CACHE_MAX_SIZE,
+    ):
+        """
+        object constructor, indexing entries left by previous runs
+
+        :param directory: a directory for cache files, created if absent
+        :param ttl: a number of seconds an entry stays fresh
+        :param max_size: a max total size of cache files in bytes
+        """
+        self._directory = pathlib.Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidations = 0
+        self._stores = 0
+        self._evictions = 0
+
+        # entry keys in the least recently used order with file sizes,
+        # temporary files left by interrupted writes are removed
+        self._sizes = collections.OrderedDict()
+        entries = []
+        for path in self._directory.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            entries.append((stat.st_atime, path.name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+        self._size = sum(self._sizes.values())
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for cache counters: fresh hits, misses, revalidations
+        (304 responses), stored responses, evicted entries, a number of
+        entries and their total size in bytes
+
+        :return: a dictionary of counters
+        """
+        with self._lock:
+            return {
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_revalidations": self._revalidations,
+                "cache_stores": self._stores,
+                "cache_evictions": self._evictions,
+                "cache_entries": len(self._sizes),
+                "cache_size": self._size,
+            }
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """
+        method returns a key of an entry for a given URL
+
+        :param url: given URL
+        :return: a hex digest of the URL
+        """
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        """
+        method returns a path of an entry file, entries are spread over
+        subdirectories named by the first two digits of their keys
+
+        :param key: a key of the entry
+        :return: a path of the entry file
+        """
+        return self._directory / key[:2] / key
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """
+        method checks if an entry can be used without revalidation
+
+        :param entry: given entry
+        :return: True if the entry is younger than ttl
+        """
+        return time.time() - entry.stored_at < self._ttl
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        method reads an entry of a given URL, counting a hit for a fresh
+        entry and a miss for an absent one, a stale entry is returned
+        for revalidation and counted by refresh or put later
+
+        :param url: given URL
+        :return: a CachedResponse instance or None if there is no
+        usable entry
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._sizes:
+                self._misses += 1
+                return None
+            self._sizes.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            header, body = path.read_bytes().split(b"\n", 1)
+            entry = CachedResponse(
+                body=zlib.decompress(body).decode("utf-8"),
+                stored_at=stored_at,
+                **json.loads(header),
+            )
+            os.utime(path, (time.time(), stored_at))
+        except (OSError, ValueError, TypeError, zlib.error) as exc:
+            crawler_logger.error(f"Dropping cache entry of {url}: {exc!r}")
+            entry = None
+
+        with self._lock:
+            if entry is not None and self.is_fresh(entry):
+                self._hits += 1
+                return entry
+            if entry is None or not entry.validators:
+                self._misses += 1
+                self._evict(key)
+                return None
+            return entry
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        method stores a response body of a given URL and evicts least
+        recently used entries if the cache gets too large
+
+        :param url: given URL
+        :param body: a response body
+        :param etag: an ETag header of the response if any
+        :param last_modified: a Last-Modified header of the response
+        if any
+        :return: None
+        """
+        self._write(
+            url,
+            zlib.compress(body.encode("utf-8")),
+            etag,
+            last_modified,
+        )
+        with self._lock:
+            self._stores += 1
+
+    def refresh(self, entry: CachedResponse) -> CachedResponse:
+        """
+        method marks an entry revalidated by a 304 response as fresh
+        again by touching its file, the stored body is left as it is
+
+        :param entry: the revalidated entry
+        :return: the refreshed entry
+        """
+        stored_at = time.time()
+        try:
+            os.utime(self._path(self._key(entry.url)), (stored_at, stored_at))
+        except FileNotFoundError:
+            self.put(entry.url, entry.body, entry.etag, entry.last_modified)
+        with self._lock:
+            self._revalidations += 1
+        return entry._replace(stored_at=stored_at)
+
+    def _write(
+        self,
+        url: str,
+        compressed_body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        """
+        method writes an entry file atomically, replacing a previous
+        version if any, and updates the index
+
+        :param url: a URL of the entry
+        :param compressed_body: a compressed response body
+        :param etag: an ETag header if any
+        :param last_modified: a Last-Modified header if any
+        :return: None
+        """
+        key = self._key(url)
+        path = self._path(key)
+        header = json.dumps(
+            {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+            }
+        ).encode("utf-8")
+        data = header + b"\n" + compressed_body
+
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            while self._size > self._max_size and len(self._sizes) > 1:
+                self._evict(next(iter(self._sizes)))
+
+    def _evict(self, key: str) -> None:
+        """
+        method removes an entry, must be called holding the lock
+
+        :param key: a key of the entry
+        :return: None
+        """
+        size = self._sizes.pop(key, None)
+        if size is None:
+            return
+        self._size -= size
+        self._evictions += 1
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,213 @@
+"""
+Crawl checkpoints, append-only journals of scrapped pages that let
+an interrupted crawl continue where it stopped
+"""
+
+import json
+import os
+import pathlib
+import queue
+import threading
+import time
+
+from typing import Dict, Iterator, List, Tuple, Union
+
+from page_ranker_app import settings
+from page_ranker_app.source.loggers import crawler_logger
+
+_STOP = object()
+
+
+class CrawlCheckpoint:
+    """
+    an append-only journal of a crawl: a JSON header line with the start
+    URL and the page limit followed by a JSON line for every recorded
+    page with its links
+
+    The journal is enough to restore the crawl: pages give the graph,
+    and the frontier is every linked URL that is not a page yet, as all
+    links of recorded pages were added to it. Records are queued by
+    the scrapping workers and written by a background thread, which
+    flushes them to disk every interval seconds, so workers never wait
+    for disk
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        interval: float = settings.CHECKPOINT_INTERVAL,
+    ):
+        """
+        object constructor
+
+        :param path: a path of the journal file
+        :param interval: a max number of seconds records stay in memory
+        """
+        self.path = pathlib.Path(path)
+        self._interval = interval
+        self._records = queue.SimpleQueue()
+        self._thread = None
+        self._written = 0
+        self._flushes = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for checkpoint counters: written page records, flushes
+        to disk and records waiting to be written
+
+        :return: a dictionary of counters
+        """
+        return {
+            "checkpoint_records": self._written,
+            "checkpoint_flushes": self._flushes,
+            "checkpoint_pending": self._records.qsize(),
+        }
+
+    @staticmethod
+    def load(
+        path: Union[str, os.PathLike],
+    ) -> Tuple[Dict, Iterator[Tuple[str, List[str]]]]:
+        """
+        method reads a journal, a partly written last line left by
+        an interrupted run is ignored
+
+        :param path: a path of the journal file
+        :return: a tuple of the header dictionary and an iterator over
+        tuples of page URLs and their links in the recorded order
+        """
+        with open(path, encoding="utf-8") as file:
+            header = json.loads(file.readline())
+        return header, CrawlCheckpoint._read_pages(path)
+
+    @staticmethod
+    def _read_pages(
+        path: Union[str, os.PathLike],
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """
+        method yields page records of a journal
+
+        :param path: a path of the journal file
+        :return: an iterator over tuples of page URLs and their links
+        """
+        with open(path, encoding="utf-8") as file:
+            file.readline()
+            for line in file:
+                try:
+                    url, links = json.loads(line)
+                except ValueError:
+                    crawler_logger.error(
+                        f"Skipping a broken checkpoint record in {path}"
+                    )
+                    continue
+                yield url, links
+
+    def open(
+        self, start_url: str, page_limit: int, append: bool = False
+    ) -> None:
+        """
+        method starts the writer thread, creating the journal with
+        a header if it does not exist, or appending to it if asked,
+        after cutting off a partly written last line; an existing
+        journal is never mixed with records of another crawl
+
+        :param start_url: a URL the crawl started from
+        :param page_limit: a max number of pages of the crawl
+        :param append: True to continue an existing journal of the same
+        crawl
+        :return: None
+        """
+        header = {"start_url": start_url, "page_limit": page_limit}
+        if not self.path.exists() or not self.path.stat().st_size:
+            self.path.write_text(json.dumps(header) + "\n", encoding="utf-8")
+        elif not append:
+            raise ValueError(
+                f"Checkpoint journal {self.path} already exists, "
+                f"resume the crawl from it or remove it"
+            )
+        else:
+            journal_header, _ = self.load(self.path)
+            if journal_header != header:
+                raise ValueError(
+                    f"Checkpoint journal {self.path} belongs to another "
+                    f"crawl: {journal_header}"
+                )
+            self._truncate_partial_record()
+        self._thread = threading.Thread(
+            target=self._write, name="checkpoint-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _truncate_partial_record(self) -> None:
+        """
+        method cuts the journal after its last complete line, reading it
+        backwards in chunks
+
+        :return: None
+        """
+        with open(self.path, "rb+") as file:
+            position = file.seek(0, os.SEEK_END)
+            while position > 0:
+                step = min(position, 2**16)
+                position -= step
+                file.seek(position)
+                newline = file.read(step).rfind(b"\n")
+                if newline != -1:
+                    file.truncate(position + newline + 1)
+                    return
+
+    def record(self, url: str, links: List[str]) -> None:
+        """
+        method queues a record of a page without waiting for disk
+
+        :param url: a URL of the page
+        :param links: links of the page
+        :return: None
+        """
+        self._records.put((url, links))
+
+    def close(self) -> None:
+        """
+        method writes all queued records, syncs the journal to disk and
+        stops the writer thread
+
+        :return: None
+        """
+        if self._thread is not None:
+            self._records.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _write(self) -> None:
+        """
+        method is a loop of the writer thread, it appends queued records
+        to the buffered journal file, flushing it every interval seconds
+        and syncing it to disk before it exits
+
+        :return: None
+        """
+        with open(self.path, "a", encoding="utf-8") as file:
+            next_flush = time.monotonic() + self._interval
+            while True:
+                try:
+                    record = self._records.get(
+                        timeout=max(0.0, next_flush - time.monotonic())
+                    )
+                except queue.Empty:
+                    record = None
+                if record is _STOP:
+                    break
+                if record is not None:
+                    file.write(json.dumps(record) + "\n")
+                    self._written += 1
+                if time.monotonic() >= next_flush:
+                    file.flush()
+                    self._flushes += 1
+                    next_flush = time.monotonic() + self._interval
+            file.flush()
+            os.fsync(file.fileno())
+            self._flushes += 1
+
+
+if __name__ == "__main__":
+    pass
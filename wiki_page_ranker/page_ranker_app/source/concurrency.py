@@ -0,0 +1,195 @@
+"""
+Concurrency controllers that decide how many requests the crawler keeps
+in flight
+"""
+
+import threading
+
+from collections import deque
+from typing import Dict, Optional, Union
+
+from page_ranker_app import settings
+from page_ranker_app.source.loggers import metrics_logger
+
+
+class AdaptiveConcurrencyController:
+    """
+    an AIMD (additive increase, multiplicative decrease) controller of
+    a number of in-flight requests
+
+    Every finished request is recorded with its latency and response
+    status; after each window of records the controller compares the
+    95th latency percentile with the lowest median latency seen so far
+    and counts throttled (429) and failed (5xx or no response)
+    requests. The limit shrinks multiplicatively when the upstream is
+    congested and grows by one otherwise, so it settles near the
+    highest concurrency the upstream serves without slowing down
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = settings.CONCURRENCY_INITIAL,
+        min_limit: int = settings.CONCURRENCY_MIN,
+        max_limit: int = settings.THREADS_SCRAPPING,
+        window: int = settings.CONCURRENCY_WINDOW,
+        latency_tolerance: float = settings.CONCURRENCY_LATENCY_TOLERANCE,
+        max_error_rate: float = settings.CONCURRENCY_MAX_ERROR_RATE,
+        decrease_factor: float = settings.CONCURRENCY_DECREASE_FACTOR,
+    ):
+        """
+        object constructor
+
+        :param initial_limit: a number of in-flight requests to start with
+        :param min_limit: the lowest allowed limit
+        :param max_limit: the highest allowed limit
+        :param window: a number of records between decisions
+        :param latency_tolerance: a max ratio of the 95th latency
+        percentile to the baseline latency of a healthy upstream
+        :param max_error_rate: a max share of throttled and failed
+        requests of a healthy upstream
+        :param decrease_factor: a factor the limit is multiplied by when
+        the upstream is congested
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min <= max")
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._limit = min(max(initial_limit, min_limit), max_limit)
+        self._window = window
+        self._latency_tolerance = latency_tolerance
+        self._max_error_rate = max_error_rate
+        self._decrease_factor = decrease_factor
+
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._records = 0
+        self._throttled = 0
+        self._failed = 0
+        self._baseline_latency = None
+        self._last_percentiles = (0.0, 0.0)
+        self._increases = 0
+        self._decreases = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        getter for the current limit of in-flight requests
+
+        :return: the limit
+        """
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """
+        getter for a number of in-flight requests
+
+        :return: a number of in-flight requests
+        """
+        return self._in_flight
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        getter for controller statistics: current limit, numbers of
+        increases and decreases, latency percentiles of the last window
+        and the baseline latency
+
+        :return: a dictionary of statistics
+        """
+        with self._condition:
+            p50, p95 = self._last_percentiles
+            return {
+                "concurrency_limit": self._limit,
+                "concurrency_increases": self._increases,
+                "concurrency_decreases": self._decreases,
+                "latency_p50": p50,
+                "latency_p95": p95,
+                "baseline_latency": self._baseline_latency or 0.0,
+            }
+
+    def acquire(self) -> None:
+        """
+        method blocks the calling thread until a number of in-flight
+        requests is below the limit and takes a slot
+
+        :return: None
+        """
+        with self._condition:
+            while self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """
+        method frees a slot taken with acquire
+
+        :return: None
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        """
+        method records a finished request and adjusts the limit after
+        every window of records
+
+        :param latency: request latency in seconds
+        :param status: response status code, None if no response came
+        :return: None
+        """
+        with self._condition:
+            self._latencies.append(latency)
+            self._records += 1
+            if status == 429:
+                self._throttled += 1
+            elif status is None or status >= 500:
+                self._failed += 1
+            if self._records >= self._window:
+                self._adjust()
+
+    def _adjust(self) -> None:
+        """
+        method makes a decision on the limit from the current window of
+        records, logs it and starts a new window, must be called
+        holding the condition lock
+
+        :return: None
+        """
+        latencies = sorted(self._latencies)
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self._last_percentiles = (p50, p95)
+        if self._baseline_latency is None or p50 < self._baseline_latency:
+            self._baseline_latency = p50
+
+        error_rate = (self._throttled + self._failed) / self._records
+        congested = (
+            error_rate > self._max_error_rate
+            or p95 > self._baseline_latency * self._latency_tolerance
+        )
+        old_limit = self._limit
+        if congested:
+            self._limit = max(
+                self._min_limit, int(self._limit * self._decrease_factor)
+            )
+            self._decreases += 1
+        else:
+            self._limit = min(self._max_limit, self._limit + 1)
+            self._increases += 1
+            self._condition.notify()
+
+        metrics_logger.info(
+            f"concurrency {'decrease' if congested else 'increase'}: "
+            f"limit={old_limit}->{self._limit} p50={p50:.3f}s "
+            f"p95={p95:.3f}s baseline={self._baseline_latency:.3f}s "
+            f"throttled={self._throttled} failed={self._failed} "
+            f"records={self._records}"
+        )
+        self._records = self._throttled = self._failed = 0
+
+
+if __name__ == "__main__":
+    pass
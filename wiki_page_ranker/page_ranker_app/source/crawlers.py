@@ -1,13 +1,26 @@
+import asyncio
+import codecs
+import timeit
+import urllib.parse
+
+import aiohttp
 import requests
 
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
 from requests import HTTPError
 
 from page_ranker_app import settings
+from page_ranker_app.source.caches import ResponseCache
 from page_ranker_app.source.utils import handle_errors
 from page_ranker_app.source.loggers import crawler_logger
+from page_ranker_app.source.parsers import (
+    IncrementalLinkExtractor,
+    WikiParser,
+)
+from page_ranker_app.source.rate_limiters import RateLimiter
+from page_ranker_app.source.urls import RedirectMap, url_title
 
 
 class Crawler(ABC):
@@ -19,6 +32,10 @@ class Crawler(ABC):
         self,
         timeout: Union[int, float] = settings.REQUEST_TIMEOUT,
         default: Union[str, None, settings.NotSet] = settings.NOT_SET,
+        rate_limiter: Optional[RateLimiter] = None,
+        observer: Optional[Callable[[float, Optional[int]], None]] = None,
+        cache: Optional[ResponseCache] = None,
+        redirects: Optional[RedirectMap] = None,
     ):
         """
         object constructor, utilizing a property for value validation
@@ -27,9 +44,21 @@ class Crawler(ABC):
         :param timeout: a timeout for making a request in seconds
         :param default: a default value for whenever a request fails
         with 404 status
+        :param rate_limiter: a rate limiter shared by crawlers, every
+        request waits for its permission if given
+        :param observer: a callable that is given latency in seconds
+        and status code (None if no response came) of every request
+        :param cache: a response cache shared by crawlers, used by
+        crawlers that support caching
+        :param redirects: a redirect map shared by crawlers, that
+        followed redirects are recorded in if given
         """
         self.timeout = timeout
         self.default = default
+        self.rate_limiter = rate_limiter
+        self.observer = observer
+        self.cache = cache
+        self.redirects = redirects
 
     @property
     def timeout(self) -> Union[int, float]:
@@ -53,6 +82,62 @@ class Crawler(ABC):
         else:
             self._timeout = new_value
 
+    def _observe(self, start: float, status: Optional[int]) -> None:
+        """
+        method reports a finished request to the observer if given
+
+        :param start: a timer value taken before the request
+        :param status: response status code, None if no response came
+        :return: None
+        """
+        if self.observer is not None:
+            self.observer(timeit.default_timer() - start, status)
+
+    def _record_redirect(self, url: str, final_url: object) -> str:
+        """
+        method records a redirect in the redirect map if given and
+        a response came from another URL than the requested one
+
+        :param url: a requested URL
+        :param final_url: a URL of the final response
+        :return: a canonical URL of the page the response belongs to
+        """
+        if self.redirects is None or not isinstance(final_url, str):
+            return url
+        if self.redirects.add(url, final_url):
+            return self.redirects.resolve(url)
+        return url
+
+    def _record_canonical(self, url: str, href: Optional[str]) -> None:
+        """
+        method records a redirect to the page a canonical link of
+        a response body points to, as Wikipedia answers a request of
+        a redirect with 200 status and the content of its target page;
+        the link is resolved on the host of the requested URL
+
+        :param url: a requested URL
+        :param href: an href value of the canonical link if any
+        :return: None
+        """
+        if href is None:
+            return
+        path = urllib.parse.urlsplit(href).path
+        if WikiParser._is_internal(path):
+            self._record_redirect(url, urllib.parse.urljoin(url, path))
+
+    def _cache_keys(self, url: str) -> List[str]:
+        """
+        method returns URLs a response to a request of a given URL is
+        cached under: the requested URL, so that the next request of it
+        is a cache hit, and the URL of a redirect target if any
+
+        :param url: a requested URL
+        :return: a list of URLs
+        """
+        if self.redirects is None:
+            return [url]
+        return list(dict.fromkeys([url, self.redirects.resolve(url)]))
+
     @abstractmethod
     def __call__(
         self,
@@ -65,6 +150,12 @@ class Crawler(ABC):
 class WikiCrawler(Crawler):
     """
     a callable class that allows making requests to a URL
+
+    With a cache, fresh cached pages are read without a request and
+    stale ones are requested conditionally, so that a 304 response
+    reuses the cached body; a response that came through redirects,
+    or whose canonical link points to another page, is cached under
+    the requested URL and the URL of its target page
     """
 
     @handle_errors(logger=crawler_logger)
@@ -83,13 +174,429 @@ class WikiCrawler(Crawler):
         :raises appropriate type Error if it happens during runtime
         except for the 404 status error
         """
-        response = session.get(url=url, timeout=self._timeout)
-        if response.status_code == requests.codes.ok:
-            return response.text
-        elif response.status_code == requests.codes.not_found:
-            return self.default
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            return self._read_body(url, cached.body)
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        start = timeit.default_timer()
+        try:
+            response = self._get(
+                url,
+                session,
+                cached.validators if cached is not None else None,
+            )
+        except requests.RequestException:
+            self._observe(start, None)
+            raise
+        self._observe(start, response.status_code)
+        try:
+            if response.status_code == requests.codes.ok:
+                self._record_redirect(url, response.url)
+                return self._read_response(url, response)
+            elif (
+                response.status_code == requests.codes.not_modified
+                and cached is not None
+            ):
+                return self._read_body(url, self.cache.refresh(cached).body)
+            elif response.status_code == requests.codes.not_found:
+                return self.default
+            else:
+                raise HTTPError(f"Crawler could not get data from {url}")
+        finally:
+            response.close()
+
+    def _get(
+        self,
+        url: str,
+        session: requests.Session,
+        headers: Optional[dict],
+    ) -> requests.Response:
+        """
+        method makes a request to a given URL
+
+        :param url: given URL
+        :param session: given Session instance
+        :param headers: request headers if any
+        :return: a response
+        """
+        return session.get(url=url, timeout=self._timeout, headers=headers)
+
+    def _read_response(self, url: str, response: requests.Response) -> Any:
+        """
+        method returns content of a response with 200 status, storing
+        its body in the cache if there is one
+
+        :param url: a requested URL
+        :param response: a response with 200 status
+        :return: the response body
+        """
+        body = self._read_body(url, response.text)
+        if self.cache is not None:
+            self._store(url, body, response)
+        return body
+
+    def _read_body(self, url: str, body: str) -> Any:
+        """
+        method returns content of a response or a cached body, recording
+        a redirect if its canonical link points to another page
+
+        :param url: a requested URL
+        :param body: a response body
+        :return: the body
+        """
+        self._record_canonical(url, WikiParser.scan_canonical_href(body))
+        return body
+
+    def _store(self, url: str, body: str, response: requests.Response) -> None:
+        """
+        method stores a response body in the cache with its validators
+
+        :param url: a requested URL
+        :param body: a response body to store
+        :param response: a response with 200 status
+        :return: None
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        for key in self._cache_keys(url):
+            self.cache.put(
+                key,
+                body,
+                etag if isinstance(etag, str) else None,
+                last_modified if isinstance(last_modified, str) else None,
+            )
+
+
+class StreamingWikiCrawler(WikiCrawler):
+    """
+    a callable class that makes requests to a URL and extracts internal
+    links of a page while its body downloads, calling an instance
+    returns a list of links instead of the page data
+
+    A body is read in chunks and fed to an incremental link extractor,
+    reading stops once the main content of the page has ended or the
+    body exceeds max_body_size, so a worker never holds a whole large
+    page in memory; with a cache, a body is kept in memory and stored
+    only if it was read to its end, a partly read body is not a page
+
+    A response closed before its end cannot be kept alive, so its
+    connection is dropped and the pool reconnects it for a later
+    request; urllib3 does not count such reconnections as opened
+    connections, so with streaming fetch connections_reused of crawl
+    statistics overstates reuse by up to one connection per page whose
+    reading stopped early
+    """
+
+    def __init__(
+        self,
+        max_body_size: int = settings.STREAM_MAX_BODY_SIZE,
+        chunk_size: int = settings.STREAM_CHUNK_SIZE,
+        **kwargs: Any,
+    ):
+        """
+        object constructor
+
+        :param max_body_size: a max number of body bytes to read
+        :param chunk_size: a number of bytes to read at once
+        :param kwargs: keyword arguments of WikiCrawler constructor
+        """
+        super().__init__(**kwargs)
+        self.max_body_size = max_body_size
+        self.chunk_size = chunk_size
+
+    def _get(
+        self,
+        url: str,
+        session: requests.Session,
+        headers: Optional[dict],
+    ) -> requests.Response:
+        """
+        method makes a request to a given URL without reading its body
+
+        :param url: given URL
+        :param session: given Session instance
+        :param headers: request headers if any
+        :return: a response
+        """
+        return session.get(
+            url=url, timeout=self._timeout, headers=headers, stream=True
+        )
+
+    def _read_response(
+        self, url: str, response: requests.Response
+    ) -> List[str]:
+        """
+        method reads a response body in chunks until the main content
+        of the page ends or max_body_size bytes are read
+
+        :param url: a requested URL
+        :param response: a response with 200 status
+        :return: a list of links on internal resources
+        """
+        extractor = IncrementalLinkExtractor()
+        decoder = codecs.getincrementaldecoder(
+            response.encoding
+            if isinstance(response.encoding, str)
+            else "utf-8"
+        )(errors="replace")
+        body = [] if self.cache is not None else None
+        size = 0
+        complete = False
+        for chunk in response.iter_content(self.chunk_size):
+            chunk = chunk[: self.max_body_size - size]
+            size += len(chunk)
+            text = decoder.decode(chunk)
+            if body is not None:
+                body.append(text)
+            if extractor.feed(text):
+                break
+            if size >= self.max_body_size:
+                crawler_logger.warning(
+                    f"Reading of {url} stopped at {size} bytes"
+                )
+                break
         else:
-            raise HTTPError(f"Crawler could not get data from {url}")
+            complete = True
+            text = decoder.decode(b"", final=True)
+            if body is not None:
+                body.append(text)
+            extractor.feed(text)
+        links = extractor.close()
+        self._record_canonical(url, extractor.canonical_href)
+        if body is not None and complete:
+            self._store(url, "".join(body), response)
+        return links
+
+    def _read_body(self, url: str, body: str) -> List[str]:
+        """
+        method extracts internal links of a cached body, recording
+        a redirect if its canonical link points to another page
+
+        :param url: a requested URL
+        :param body: a cached response body
+        :return: a list of links on internal resources
+        """
+        extractor = IncrementalLinkExtractor()
+        extractor.feed(body)
+        links = extractor.close()
+        self._record_canonical(url, extractor.canonical_href)
+        return links
+
+
+class MediaWikiApiCrawler(Crawler):
+    """
+    a callable class that requests links of a batch of pages from
+    the MediaWiki API with action=query&prop=links, calling an instance
+    with a list of page URLs returns a list of decoded API responses
+
+    Links of up to settings.API_BATCH_SIZE pages come in one response,
+    the API splits longer lists of links between responses and the
+    crawler follows its continuation until all links are returned;
+    redirects are resolved by the API
+    """
+
+    def __init__(
+        self, api_path: str = settings.MEDIAWIKI_API_PATH, **kwargs: Any
+    ):
+        """
+        object constructor
+
+        :param api_path: a path of the API endpoint on the wiki host
+        :param kwargs: keyword arguments of Crawler constructor
+        """
+        super().__init__(**kwargs)
+        self.api_path = api_path
+
+    def __call__(
+        self,
+        urls: List[str],
+        session: requests.Session,
+    ) -> Union[List[Dict[str, Any]], None, settings.NotSet]:
+        """
+        method requests links of pages of given URLs of one wiki host,
+        every request is retried on its own, so that a failure keeps
+        the responses received and the continuation to resume from
+
+        :param urls: given URLs
+        :param session: given Session instance
+        :return: a list of decoded API responses
+        :raises ValueError if a number of URLs is out of the batch range
+        """
+        if not 0 < len(urls) <= settings.API_BATCH_SIZE:
+            raise ValueError(
+                f"A batch must have 1 to {settings.API_BATCH_SIZE} URLs"
+            )
+        scheme, netloc, *_ = urllib.parse.urlsplit(urls[0])
+        api_url = f"{scheme}://{netloc}{self.api_path}"
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "prop": "links",
+            "titles": "|".join(url_title(url) for url in urls),
+            "pllimit": "max",
+            "plnamespace": "0",
+            "redirects": "1",
+        }
+        responses = []
+        continuation = {}
+        while True:
+            data = self._request(api_url, {**params, **continuation}, session)
+            if not isinstance(data, dict):
+                return data
+            responses.append(data)
+            continuation = data.get("continue")
+            if not continuation:
+                return responses
+
+    @handle_errors(logger=crawler_logger)
+    def _request(
+        self,
+        api_url: str,
+        params: Dict[str, str],
+        session: requests.Session,
+    ) -> Union[Dict[str, Any], None, settings.NotSet]:
+        """
+        method makes one request to the API
+
+        :param api_url: a URL of the API endpoint
+        :param params: query parameters of the request
+        :param session: given Session instance
+        :return: a decoded API response
+        :raises appropriate type Error if it happens during runtime
+        except for the 404 status error
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(api_url)
+        start = timeit.default_timer()
+        try:
+            response = session.get(
+                api_url, params=params, timeout=self._timeout
+            )
+        except requests.RequestException:
+            self._observe(start, None)
+            raise
+        self._observe(start, response.status_code)
+        if response.status_code == requests.codes.not_found:
+            return self.default
+        elif response.status_code != requests.codes.ok:
+            raise HTTPError(f"Crawler could not get data from {api_url}")
+        data = response.json()
+        if "error" in data:
+            raise HTTPError(f"MediaWiki API error: {data['error']}")
+        return data
+
+
+class AsyncCrawler(Crawler):
+    """
+    an interface for Crawler classes that make requests on an asyncio
+    event loop, calling an instance returns an awaitable
+    """
+
+    def __call__(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+    ) -> Awaitable[Union[str, None, settings.NotSet]]:
+        return self.fetch(url, session)
+
+    @abstractmethod
+    async def fetch(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+    ) -> Union[str, None, settings.NotSet]:
+        raise NotImplementedError
+
+
+class AsyncWikiCrawler(AsyncCrawler):
+    """
+    a class that allows making requests to a URL on an asyncio event
+    loop, so that many requests can wait for responses on one thread
+
+    A cache and canonical links are used as by WikiCrawler, cache files
+    are read and written in the default executor not to block the loop
+    """
+
+    def _read_body(self, url: str, body: str) -> str:
+        """
+        method returns a response or a cached body, recording
+        a redirect if its canonical link points to another page
+
+        :param url: a requested URL
+        :param body: a response body
+        :return: the body
+        """
+        self._record_canonical(url, WikiParser.scan_canonical_href(body))
+        return body
+
+    @handle_errors(logger=crawler_logger)
+    async def fetch(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+    ) -> Union[str, None, settings.NotSet]:
+        """
+        method allows to make request to a given URL with given timeout
+        and default values
+
+        :param url: given URL
+        :param session: given aiohttp ClientSession instance
+        :return: response content
+        :raises appropriate type Error if it happens during runtime
+        except for the 404 status error
+        """
+        loop = asyncio.get_running_loop()
+        cached = (
+            await loop.run_in_executor(None, self.cache.get, url)
+            if self.cache is not None
+            else None
+        )
+        if cached is not None and self.cache.is_fresh(cached):
+            return self._read_body(url, cached.body)
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(url)
+        timeout = aiohttp.ClientTimeout(total=self._timeout)
+        start = timeit.default_timer()
+        status = None
+        try:
+            async with session.get(
+                url,
+                timeout=timeout,
+                headers=cached.validators if cached is not None else None,
+            ) as response:
+                status = response.status
+                if status == requests.codes.ok:
+                    self._record_redirect(url, str(response.url))
+                    body = self._read_body(url, await response.text())
+                    if self.cache is not None:
+                        for key in self._cache_keys(url):
+                            await loop.run_in_executor(
+                                None,
+                                self.cache.put,
+                                key,
+                                body,
+                                response.headers.get("ETag"),
+                                response.headers.get("Last-Modified"),
+                            )
+                    return body
+                elif (
+                    status == requests.codes.not_modified
+                    and cached is not None
+                ):
+                    refreshed = await loop.run_in_executor(
+                        None, self.cache.refresh, cached
+                    )
+                    return self._read_body(url, refreshed.body)
+                elif status == requests.codes.not_found:
+                    return self.default
+                else:
+                    raise HTTPError(f"Crawler could not get data from {url}")
+        finally:
+            self._observe(start, status)
 
 
 if __name__ == "__main__":
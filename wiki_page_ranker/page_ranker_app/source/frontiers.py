@@ -0,0 +1,253 @@
+"""
+URL frontiers that hold URLs waiting to be scrapped
+"""
+
+import threading
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class UrlFrontier:
+    """
+    a thread-safe queue of URLs to visit, which remembers every URL it
+    has ever seen, so that each URL is queued and handed out only once
+
+    Workers take URLs with claim (blocking) or try_claim (non-blocking)
+    and report results with commit or release; a claim reserves one of
+    page_limit page slots, so no URL is handed out once all slots are
+    committed or reserved, and a released slot becomes free again
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str] = (),
+        page_limit: Optional[int] = None,
+        seen: Iterable[str] = (),
+    ):
+        """
+        object constructor
+
+        :param urls: URLs to start with
+        :param page_limit: a max number of committed URLs, unlimited if
+        not given
+        :param seen: URLs visited before, that are never queued
+        """
+        self._queue = deque()
+        self._seen = set()
+        self._page_limit = page_limit
+        self._in_progress = 0
+        self._committed = 0
+        self._duplicate_urls = 0
+        self._wasted_requests = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._seen.update(seen)
+        self.add(urls)
+
+    @property
+    def seen_number(self) -> int:
+        """
+        getter for a number of URLs ever added to the frontier
+
+        :return: a number of seen URLs
+        """
+        return len(self._seen)
+
+    @property
+    def in_progress(self) -> int:
+        """
+        getter for a number of claimed URLs not committed or released
+
+        :return: a number of URLs in progress
+        """
+        return self._in_progress
+
+    @property
+    def committed(self) -> int:
+        """
+        getter for a number of committed URLs
+
+        :return: a number of committed URLs
+        """
+        return self._committed
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for frontier counters: seen, queued, in progress and
+        committed URLs, duplicate URLs rejected on add (a number of
+        found links that were already seen, not of requests saved) and
+        wasted requests (URLs released after a request, whose results
+        were not recorded)
+
+        :return: a dictionary of counters
+        """
+        with self._condition:
+            return {
+                "seen": len(self._seen),
+                "queued": len(self._queue),
+                "in_progress": self._in_progress,
+                "committed": self._committed,
+                "duplicate_urls": self._duplicate_urls,
+                "wasted_requests": self._wasted_requests,
+            }
+
+    def add(self, urls: Iterable[str]) -> int:
+        """
+        method queues given URLs that were never seen before
+
+        :param urls: given URLs
+        :return: a number of queued URLs
+        """
+        with self._condition:
+            queued = len(self._queue)
+            offered = 0
+            for offered, url in enumerate(urls, 1):
+                if url not in self._seen:
+                    self._seen.add(url)
+                    self._queue.append(url)
+            added = len(self._queue) - queued
+            self._duplicate_urls += offered - added
+            if added:
+                self._condition.notify(added)
+            return added
+
+    def mark_seen(self, urls: Iterable[str]) -> int:
+        """
+        method marks given URLs as seen without queuing them, so that
+        they are never handed out, URLs queued already stay queued
+
+        :param urls: given URLs
+        :return: a number of URLs that were not seen before
+        """
+        with self._condition:
+            seen = len(self._seen)
+            self._seen.update(urls)
+            return len(self._seen) - seen
+
+    def _is_full(self) -> bool:
+        """
+        method checks if all page slots are committed or reserved,
+        must be called holding the condition lock
+
+        :return: True if no more URLs can be claimed
+        """
+        return (
+            self._page_limit is not None
+            and self._committed + self._in_progress >= self._page_limit
+        )
+
+    def _is_finished(self) -> bool:
+        """
+        method checks if no more URLs will ever be handed out, must be
+        called holding the condition lock
+
+        :return: True if the frontier is closed, the limit is committed
+        or the queue is empty with no URLs in progress
+        """
+        return (
+            self._closed
+            or (
+                self._page_limit is not None
+                and self._committed >= self._page_limit
+            )
+            or (not self._queue and not self._in_progress)
+        )
+
+    def _take(self) -> Optional[str]:
+        """
+        method hands out the next URL reserving a page slot for it,
+        must be called holding the condition lock
+
+        :return: a URL or None if none can be claimed now
+        """
+        if self._closed or not self._queue or self._is_full():
+            return None
+        self._in_progress += 1
+        return self._queue.popleft()
+
+    def _notify_waiting(self) -> None:
+        """
+        method wakes one waiting worker after a slot or a URL may have
+        become available, or all of them if the frontier is finished,
+        must be called holding the condition lock
+
+        :return: None
+        """
+        if self._is_finished():
+            self._condition.notify_all()
+        else:
+            self._condition.notify()
+
+    def try_claim(self) -> Optional[str]:
+        """
+        method claims the next URL without waiting
+
+        :return: a URL or None if none can be claimed now
+        """
+        with self._condition:
+            return self._take()
+
+    def claim(self) -> Optional[str]:
+        """
+        method claims the next URL, waiting while claimed URLs are in
+        progress and may either bring new URLs or free their slots
+
+        :return: a URL or None if the frontier is finished
+        """
+        with self._condition:
+            while (url := self._take()) is None and not self._is_finished():
+                self._condition.wait()
+            return url
+
+    def commit(self, url: str) -> None:
+        """
+        method reports that a claimed URL was scrapped and recorded
+
+        :param url: the claimed URL
+        :return: None
+        """
+        with self._condition:
+            self._in_progress -= 1
+            self._committed += 1
+            self._notify_waiting()
+
+    def release(self, url: str, wasted: bool = True) -> None:
+        """
+        method reports that a claimed URL gave no data to record, its
+        page slot becomes free again, but the URL is not queued again
+
+        :param url: the claimed URL
+        :param wasted: False if no request was made for the URL, so it
+        is not counted as a wasted request
+        :return: None
+        """
+        with self._condition:
+            self._in_progress -= 1
+            self._wasted_requests += wasted
+            self._notify_waiting()
+
+    def close(self) -> None:
+        """
+        method stops handing out URLs and wakes all waiting workers
+
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._seen
+
+    def __iter__(self) -> Iterator[str]:
+        with self._condition:
+            return iter(list(self._queue))
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+if __name__ == "__main__":
+    pass
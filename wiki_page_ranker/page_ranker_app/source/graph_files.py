@@ -0,0 +1,179 @@
+"""
+A binary file format of link graphs, that is written in a streaming
+fashion and opened with numpy.memmap without copying or parsing
+
+A file holds a header followed by 8-byte aligned sections: CSR row
+offsets of in-links, CSR column indices, out-degrees of nodes, a URL
+string table (UTF-8 URLs separated by newlines) and offsets of URLs in
+the table; all numbers are little-endian
+"""
+
+import os
+import struct
+
+from array import array
+from typing import Iterator, List, Sequence, Union
+
+import numpy as np
+
+from page_ranker_app.source.rank_engines import LinkMatrix
+
+MAGIC = b"WPRGRAPH"
+VERSION = 1
+_HEADER = struct.Struct("<8sI4xqq5q")
+_ALIGNMENT = 8
+
+
+class UrlTable(Sequence):
+    """
+    a read-only sequence of URLs over a mapped string table, URLs are
+    decoded only when they are accessed
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        """
+        object constructor
+
+        :param data: bytes of URLs, each followed by a newline
+        :param offsets: offsets of URLs in data, of a number of URLs + 1
+        """
+        self._data = data
+        self._offsets = offsets
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("URL table index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1] - 1
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        if not len(self):
+            return iter(())
+        return iter(self._data[:-1].tobytes().decode("utf-8").split("\n"))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+def _write_section(file, values: np.ndarray, dtype: type) -> int:
+    """
+    function writes an array to a file at the next aligned position
+
+    :param file: a binary file opened for writing
+    :param values: an array to write
+    :param dtype: a type of array items in the file
+    :return: a position of the section in the file
+    """
+    position = _align(file)
+    np.ascontiguousarray(
+        values, dtype=np.dtype(dtype).newbyteorder("<")
+    ).tofile(file)
+    return position
+
+
+def _align(file) -> int:
+    """
+    function pads a file with zeros up to an aligned position
+
+    :param file: a binary file opened for writing
+    :return: the aligned position
+    """
+    position = file.tell()
+    padding = -position % _ALIGNMENT
+    file.write(b"\0" * padding)
+    return position + padding
+
+
+def save_link_matrix(
+    matrix: LinkMatrix, path: Union[str, os.PathLike]
+) -> None:
+    """
+    function writes a link matrix to a file section after section,
+    URLs are encoded one at a time, so that no copy of the whole graph
+    is made in memory; the file is written next to its final path and
+    moved in place when complete
+
+    :param matrix: a LinkMatrix instance
+    :param path: a path of the file
+    :return: None
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(b"\0" * _HEADER.size)
+        indptr_at = _write_section(file, matrix.indptr, np.int64)
+        indices_at = _write_section(file, matrix.indices, np.int32)
+        degree_at = _write_section(file, matrix.out_degree, np.int64)
+
+        urls_at = _align(file)
+        url_offsets = array("q", [0])
+        for url in matrix.urls:
+            url_offsets.append(
+                url_offsets[-1] + file.write(url.encode("utf-8") + b"\n")
+            )
+        offsets_at = _write_section(
+            file, np.frombuffer(url_offsets, dtype=np.int64), np.int64
+        )
+
+        file.seek(0)
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                matrix.nodes_number,
+                matrix.edges_number,
+                indptr_at,
+                indices_at,
+                degree_at,
+                urls_at,
+                offsets_at,
+            )
+        )
+    os.replace(temp_path, path)
+
+
+def open_link_matrix(path: Union[str, os.PathLike]) -> LinkMatrix:
+    """
+    function maps a file written by save_link_matrix into memory and
+    returns a matrix whose arrays are read-only views of the mapping,
+    so opening takes the same time for any graph size and the pages
+    are read from disk only when a rank engine touches them
+
+    :param path: a path of the file
+    :return: a LinkMatrix instance
+    """
+    mapping = np.memmap(path, dtype=np.uint8, mode="r")
+    (
+        magic,
+        version,
+        nodes_number,
+        edges_number,
+        indptr_at,
+        indices_at,
+        degree_at,
+        urls_at,
+        offsets_at,
+    ) = _HEADER.unpack_from(mapping)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a link graph file")
+
+    def section(position: int, length: int, dtype: type) -> np.ndarray:
+        dtype = np.dtype(dtype).newbyteorder("<")
+        return mapping[position : position + length * dtype.itemsize].view(
+            dtype
+        )
+
+    url_offsets = section(offsets_at, nodes_number + 1, np.int64)
+    return LinkMatrix(
+        UrlTable(mapping[urls_at : urls_at + url_offsets[-1]], url_offsets),
+        section(indptr_at, nodes_number + 1, np.int64),
+        section(indices_at, edges_number, np.int32),
+        section(degree_at, nodes_number, np.int64),
+    )
+
+
+if __name__ == "__main__":
+    pass
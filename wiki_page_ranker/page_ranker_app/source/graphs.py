@@ -0,0 +1,320 @@
+"""
+Compact storage for crawled link graphs
+"""
+
+import threading
+
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+
+class UrlGraph(Mapping):
+    """
+    a link graph that interns every URL once to an integer id and keeps
+    out-links of crawled pages in flat integer arrays; it behaves as
+    a read-only dictionary of page URLs to lists of linked URLs, and
+    new pages are added with add_page method
+    """
+
+    def __init__(self):
+        self._url_ids: Dict[str, int] = {}
+        self._urls: List[str] = []
+        self._page_rows: Dict[int, int] = {}
+        self._page_ids = array("i")
+        self._offsets = array("q", [0])
+        self._targets = array("i")
+
+    @classmethod
+    def from_mapping(cls, page_links: Mapping) -> "UrlGraph":
+        """
+        method builds a graph from a dictionary of page links, where
+        keys are URLs of pages and values are lists of URLs they link to
+
+        :param page_links: a dictionary of page links
+        :return: a UrlGraph instance
+        """
+        graph = cls()
+        for url, links in page_links.items():
+            graph.add_page(url, links)
+        return graph
+
+    @property
+    def urls(self) -> List[str]:
+        """
+        getter for the id to URL table, where position is a node id
+
+        :return: a list of URLs
+        """
+        return self._urls
+
+    @property
+    def nodes_number(self) -> int:
+        """
+        getter for a number of known URLs, crawled or only linked to
+
+        :return: a number of nodes
+        """
+        return len(self._urls)
+
+    @property
+    def edges_number(self) -> int:
+        """
+        getter for a number of stored links
+
+        :return: a number of edges
+        """
+        return len(self._targets)
+
+    def intern(self, url: str) -> int:
+        """
+        method returns an id of a given URL, assigning a new one if
+        the URL is met for the first time
+
+        :param url: given URL
+        :return: an id of the URL
+        """
+        node_id = self._url_ids.get(url)
+        if node_id is None:
+            node_id = self._url_ids[url] = len(self._urls)
+            self._urls.append(url)
+        return node_id
+
+    def url_id(self, url: str) -> int:
+        """
+        method returns an id of a known URL
+
+        :param url: given URL
+        :return: an id of the URL
+        :raises KeyError if the URL is unknown
+        """
+        return self._url_ids[url]
+
+    def url(self, node_id: int) -> str:
+        """
+        method returns a URL for a given id
+
+        :param node_id: given id
+        :return: a URL
+        """
+        return self._urls[node_id]
+
+    def add_page(self, url: str, links: Iterable[str]) -> int:
+        """
+        method records out-links of a crawled page
+
+        :param url: a URL of the page
+        :param links: URLs the page links to
+        :return: an id of the page
+        :raises ValueError if links of the page are already recorded
+        """
+        page_id = self.intern(url)
+        if page_id in self._page_rows:
+            raise ValueError(f"Links of {url} are already recorded")
+        self._targets.extend(self.intern(link) for link in links)
+        self._page_rows[page_id] = len(self._page_ids)
+        self._page_ids.append(page_id)
+        self._offsets.append(len(self._targets))
+        return page_id
+
+    def links_of(self, node_id: int) -> array:
+        """
+        method returns ids of pages a given page links to
+
+        :param node_id: an id of a crawled page
+        :return: an array of ids
+        :raises KeyError if the page is not crawled
+        """
+        row = self._page_rows[node_id]
+        return self._targets[self._offsets[row] : self._offsets[row + 1]]
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        method returns copies of all stored links as parallel arrays
+        of source and target ids
+
+        :return: a tuple of sources and targets arrays
+        """
+        page_ids = np.frombuffer(self._page_ids, dtype=np.int32)
+        offsets = np.frombuffer(self._offsets, dtype=np.int64)
+        targets = np.frombuffer(self._targets, dtype=np.int32).copy()
+        return np.repeat(page_ids, np.diff(offsets)), targets
+
+    def __getitem__(self, url: str) -> List[str]:
+        node_id = self._url_ids[url]
+        return [self._urls[target] for target in self.links_of(node_id)]
+
+    def __contains__(self, url: object) -> bool:
+        return self._url_ids.get(url) in self._page_rows
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._urls[page_id] for page_id in self._page_ids)
+
+    def __len__(self) -> int:
+        return len(self._page_ids)
+
+
+class InLinkIndex:
+    """
+    a reverse index of a UrlGraph that is updated page by page as pages
+    are recorded, so that in-link counts and rank inputs are available
+    during a crawl and right after it
+
+    Every page is recorded once, so repeated edges can only come from
+    repeated links on one page, which are dropped at insert time; the
+    index keeps an in-degree and an out-degree of every node and flat
+    arrays of distinct edges
+    """
+
+    def __init__(self, graph: UrlGraph):
+        """
+        object constructor
+
+        :param graph: an indexed graph
+        """
+        self.graph = graph
+        self._in_degree = array("q")
+        self._out_degree = array("q")
+        self._sources = array("i")
+        self._targets = array("i")
+        self._pages_number = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pages_number(self) -> int:
+        """
+        getter for a number of indexed pages
+
+        :return: a number of pages
+        """
+        return self._pages_number
+
+    @property
+    def edges_number(self) -> int:
+        """
+        getter for a number of distinct indexed edges
+
+        :return: a number of edges
+        """
+        return len(self._targets)
+
+    def _grow(self, nodes_number: int) -> None:
+        """
+        method extends degree arrays to a given number of nodes, must be
+        called holding the lock
+
+        :param nodes_number: a number of nodes
+        :return: None
+        """
+        missing = nodes_number - len(self._in_degree)
+        if missing > 0:
+            self._in_degree.extend([0] * missing)
+            self._out_degree.extend([0] * missing)
+
+    def add_page(self, page_id: int) -> int:
+        """
+        method indexes distinct links of a page recorded in the graph
+
+        :param page_id: an id of the page
+        :return: a number of distinct links of the page
+        """
+        targets = dict.fromkeys(self.graph.links_of(page_id))
+        with self._lock:
+            self._grow(self.graph.nodes_number)
+            for target in targets:
+                self._in_degree[target] += 1
+            self._out_degree[page_id] = len(targets)
+            self._sources.extend([page_id] * len(targets))
+            self._targets.extend(targets)
+            self._pages_number += 1
+        return len(targets)
+
+    def in_degree(self, url: str) -> int:
+        """
+        method returns a number of distinct indexed pages linking to
+        a given URL
+
+        :param url: given URL
+        :return: a number of in-links
+        """
+        try:
+            return self._in_degree[self.graph.url_id(url)]
+        except (KeyError, IndexError):
+            return 0
+
+    def in_degrees(self) -> Dict[str, int]:
+        """
+        method returns numbers of distinct pages linking to every URL
+        that has in-links
+
+        :return: a dictionary of in-link numbers
+        """
+        with self._lock:
+            in_degree = self._in_degree.tolist()
+        urls = self.graph.urls
+        return {
+            urls[node_id]: degree
+            for node_id, degree in enumerate(in_degree)
+            if degree
+        }
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        method returns a snapshot of the index as a CSR matrix where
+        rows are link targets and columns are link sources, with
+        out-degrees of all nodes of the graph
+
+        :return: a tuple of CSR row offsets, column indices and
+        out-degrees
+        """
+        with self._lock:
+            self._grow(self.graph.nodes_number)
+            nodes_number = len(self._in_degree)
+            in_degree = np.array(self._in_degree, dtype=np.int64)
+            out_degree = np.array(self._out_degree, dtype=np.int64)
+            sources = np.array(self._sources, dtype=np.int32)
+            targets = np.array(self._targets, dtype=np.int32)
+
+        indptr = np.zeros(nodes_number + 1, dtype=np.int64)
+        np.cumsum(in_degree, out=indptr[1:])
+        indices = sources[np.argsort(targets, kind="stable")]
+        return indptr, indices, out_degree
+
+    def out_csr_arrays(
+        self, nodes_number: int, edges_number: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        method returns the first edges_number indexed edges as a CSR
+        matrix where rows are link sources and columns are link targets,
+        matching a snapshot of csr_arrays with given numbers of nodes
+        and edges; distinct links of a page are indexed together, so
+        rows are moved into place without sorting
+
+        :param nodes_number: a number of rows of the matrix
+        :param edges_number: a number of indexed edges to take
+        :return: a tuple of CSR row offsets and column indices
+        """
+        with self._lock:
+            sources = np.array(self._sources[:edges_number], dtype=np.int32)
+            targets = np.array(self._targets[:edges_number], dtype=np.int32)
+
+        out_indptr = np.zeros(nodes_number + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(sources, minlength=nodes_number), out=out_indptr[1:]
+        )
+        out_indices = np.empty_like(targets)
+        if edges_number:
+            starts = np.flatnonzero(np.diff(sources, prepend=-1))
+            lengths = np.diff(starts, append=edges_number)
+            positions = np.repeat(
+                out_indptr[sources[starts]] - starts, lengths
+            )
+            positions += np.arange(edges_number)
+            out_indices[positions] = targets
+        return out_indptr, out_indices
+
+
+if __name__ == "__main__":
+    pass
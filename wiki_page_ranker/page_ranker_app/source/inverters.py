@@ -1,11 +1,26 @@
 import concurrent
+import itertools
+import marshal
 import threading
+import zlib
 from abc import ABC, abstractmethod
 
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-from typing import List, Dict
+from typing import (
+    List,
+    Dict,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 
 from page_ranker_app import settings
+from page_ranker_app.source import graphs, rank_engines
 
 
 class DictionaryInverter(ABC):
@@ -160,22 +175,80 @@ class DictionaryInverterProcessing(DictionaryInverter):
             temp_dict[value] = [key]
         return temp_dict
 
+    @staticmethod
+    def invert_chunk(
+        items: List[Tuple[str, List[str]]], shards_number: int
+    ) -> List[bytes]:
+        """
+        a method that inverts a chunk of dictionary key-value pairs into
+        shards, a value goes to a shard chosen by its CRC32 checksum
+        (hash() of strings differs between processes), so that all
+        pairs for a value end up in the same shard of every chunk;
+        a shard is serialized with marshal as two flat lists of values
+        and keys
+
+        :param items: a list of key-value pairs
+        :param shards_number: a number of shards
+        :return: a list of serialized shards
+        """
+        shards = [([], []) for _ in range(shards_number)]
+        shard_ids = {}
+        for key, list_of_values in items:
+            for value in list_of_values:
+                shard_id = shard_ids.get(value)
+                if shard_id is None:
+                    shard_id = shard_ids[value] = (
+                        zlib.crc32(value.encode("utf-8")) % shards_number
+                    )
+                values, keys = shards[shard_id]
+                values.append(value)
+                keys.append(key)
+        return [marshal.dumps(shard) for shard in shards]
+
+    @staticmethod
+    def merge_shard(parts: List[bytes]) -> bytes:
+        """
+        a method that merges serialized parts of a shard from all chunks
+        into an inverted dictionary, keys are kept in the order of chunks
+
+        :param parts: a list of serialized parts of the shard
+        :return: a serialized inverted dictionary
+        """
+        inverted_dict = {}
+        for part in parts:
+            values, keys = marshal.loads(part)
+            for value, key in zip(values, keys):
+                value_keys = inverted_dict.get(value)
+                if value_keys is None:
+                    inverted_dict[value] = [key]
+                else:
+                    value_keys.append(key)
+        return marshal.dumps(inverted_dict)
+
     def invert_dict(
         self,
         source_dict: Dict[str, List[str]],
         max_workers: int = settings.PROCESSES_INVERTING,
+        chunk_size: Optional[int] = settings.INVERTING_CHUNK_SIZE,
     ) -> Dict[str, List[str]]:
         """
         The method inverts dictionaries key-value pairs in a way that
         each string from the lists of values becomes a key, and keys
         of the original key-value pairs are put into lists of values
         for new keys and returns results as a dictionary
-        Uses up to max_workers of active processes
+        Uses up to max_workers of active processes, that invert chunks
+        of chunk_size key-value pairs into max_workers shards and then
+        merge every shard from all chunks, or invert every key-value
+        pair separately if chunk_size is None
 
         :param source_dict: a given dictionary
         :param max_workers: a max number of active processes
+        :param chunk_size: a number of key-value pairs in a chunk
         :return: an inverted dictionary
         """
+        if chunk_size is not None:
+            return self._invert_chunked(source_dict, max_workers, chunk_size)
+
         inverted_dict = {}
         with ProcessPoolExecutor(max_workers=max_workers) as executor:
             futures = [
@@ -186,3 +259,132 @@ class DictionaryInverterProcessing(DictionaryInverter):
                 if isinstance(future.result(), dict):
                     self.merge_json(inverted_dict, future.result())
         return inverted_dict
+
+    def _invert_chunked(
+        self,
+        source_dict: Dict[str, List[str]],
+        max_workers: int,
+        chunk_size: int,
+    ) -> Dict[str, List[str]]:
+        """
+        The method inverts a dictionary in two map-reduce rounds: chunks
+        are inverted into shards, then parts of every shard are merged;
+        shards hold disjoint keys, so merged shards are joined without
+        merge_json
+
+        :param source_dict: a given dictionary
+        :param max_workers: a max number of active processes
+        :param chunk_size: a number of key-value pairs in a chunk
+        :return: an inverted dictionary
+        """
+        items = iter(source_dict.items())
+        chunks = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+        inverted_dict = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunk_futures = [
+                executor.submit(self.invert_chunk, chunk, max_workers)
+                for chunk in chunks
+            ]
+            shard_parts = zip(*(future.result() for future in chunk_futures))
+            merge_futures = [
+                executor.submit(self.merge_shard, list(parts))
+                for parts in shard_parts
+            ]
+            for future in merge_futures:
+                inverted_dict.update(marshal.loads(future.result()))
+        return inverted_dict
+
+
+class ReverseIndex(NamedTuple):
+    """
+    an inverted dictionary in the array form, a CSR matrix where rows
+    are values of the source dictionary and columns are its keys, so
+    that keys linking to urls[i] are urls[j] for j in
+    indices[indptr[i]:indptr[i + 1]]
+    """
+
+    urls: List[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+
+
+class DictionaryInverterNumpy(DictionaryInverter):
+    """
+    a dictionary inverter class that works on integer arrays of edges
+    with vectorized NumPy operations instead of Python dictionaries
+    """
+
+    @staticmethod
+    def invert_edges(
+        sources: np.ndarray, targets: np.ndarray, nodes_number: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        a method that inverts edges given as parallel arrays of source
+        and target ids into a CSR reverse index; a stable sort keeps
+        sources of every target in the order of the edges
+
+        :param sources: an array of source ids
+        :param targets: an array of target ids
+        :param nodes_number: a number of ids
+        :return: a tuple of CSR row offsets and column indices
+        """
+        order = np.argsort(targets, kind="stable")
+        indptr = np.zeros(nodes_number + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=nodes_number), out=indptr[1:])
+        return indptr, np.asarray(sources)[order]
+
+    def invert_graph(
+        self,
+        source_dict: Union[
+            Mapping[str, Sequence[str]], rank_engines.LinkMatrix
+        ],
+    ) -> ReverseIndex:
+        """
+        The method inverts a UrlGraph or any dictionary of lists into
+        the array form, repeated values are kept like in other
+        inverters; a LinkMatrix already holds in-links in this form,
+        so its arrays are returned as they are (without repeated
+        links, which the matrix does not keep)
+
+        :param source_dict: a given UrlGraph, dictionary or LinkMatrix
+        :return: a ReverseIndex instance
+        """
+        if isinstance(source_dict, rank_engines.LinkMatrix):
+            return ReverseIndex(
+                list(source_dict.urls), source_dict.indptr, source_dict.indices
+            )
+        graph = (
+            source_dict
+            if isinstance(source_dict, graphs.UrlGraph)
+            else graphs.UrlGraph.from_mapping(source_dict)
+        )
+        sources, targets = graph.edge_arrays()
+        indptr, indices = self.invert_edges(
+            sources, targets, graph.nodes_number
+        )
+        return ReverseIndex(graph.urls[:], indptr, indices)
+
+    def invert_dict(
+        self,
+        source_dict: Union[
+            Mapping[str, Sequence[str]], rank_engines.LinkMatrix
+        ],
+    ) -> Dict[str, List[str]]:
+        """
+        The method inverts all dictionary key-value pairs in a way that
+        each string from the lists of values becomes a key, and keys
+        of the original key-value pairs are put into lists of values
+        for new keys and returns results as a dictionary
+        Inverts the array form and converts it to a dictionary
+
+        :param source_dict: a given UrlGraph, dictionary or LinkMatrix
+        :return: an inverted dictionary
+        """
+        urls, indptr, indices = self.invert_graph(source_dict)
+        keys = [urls[key_id] for key_id in indices.tolist()]
+        bounds = indptr.tolist()
+        return {
+            urls[row]: keys[start:end]
+            for row, (start, end) in enumerate(zip(bounds, bounds[1:]))
+            if start < end
+        }
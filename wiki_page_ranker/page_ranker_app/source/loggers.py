@@ -20,6 +20,10 @@ crawler_logger = logging.getLogger(settings.CRAWLER_LOGGER_NAME)
 crawler_logger.setLevel(settings.CRAWLER_LOGGER_LEVEL)
 crawler_logger.addHandler(crawler_handler)
 
+metrics_logger = logging.getLogger(settings.METRICS_LOGGER_NAME)
+metrics_logger.setLevel(settings.METRICS_LOGGER_LEVEL)
+metrics_logger.addHandler(crawler_handler)
+
 
 if __name__ == "__main__":
     pass
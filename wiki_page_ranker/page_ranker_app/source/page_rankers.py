@@ -1,19 +1,37 @@
+import asyncio
 import concurrent
+import functools
+import multiprocessing
 import re
 import threading
-import time
 import timeit
-import urllib.parse
 
 from abc import abstractmethod, ABC
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from requests import Session
 from tqdm import tqdm
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import aiohttp
 
 from page_ranker_app import settings
-from page_ranker_app.source import crawlers, inverters, parsers
+from page_ranker_app.source import (
+    caches,
+    checkpoints,
+    concurrency,
+    crawlers,
+    frontiers,
+    graph_files,
+    graphs,
+    inverters,
+    parsers,
+    pipelines,
+    rank_engines,
+    rate_limiters,
+    sessions,
+    urls,
+)
+from page_ranker_app.source.loggers import crawler_logger, metrics_logger
 
 
 class PageRankInfoAccumulator(ABC):
@@ -24,8 +42,10 @@ class PageRankInfoAccumulator(ABC):
     def __init__(self, start_url: str, page_limit: int):
         self._start_url = start_url
         self._page_limit = page_limit
-        self._page_links = defaultdict(list)
+        self._page_links = graphs.UrlGraph()
         self._page_rank = {}
+        self._authorities = {}
+        self._hubs = {}
 
     @property
     def page_rank(self):
@@ -35,6 +55,22 @@ class PageRankInfoAccumulator(ABC):
         """
         return self._page_rank
 
+    @property
+    def authorities(self):
+        """
+        a getter method for _authorities attribute
+        :return: _authorities value
+        """
+        return self._authorities
+
+    @property
+    def hubs(self):
+        """
+        a getter method for _hubs attribute
+        :return: _hubs value
+        """
+        return self._hubs
+
     @abstractmethod
     def scrap_data_till_limit(self) -> None:
         """
@@ -48,12 +84,34 @@ class PageRankInfoAccumulator(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def count_page_rank(self) -> None:
+    def count_page_rank(
+        self,
+        engine: Optional[rank_engines.RankEngine] = None,
+        warm_start: bool = False,
+    ) -> rank_engines.RankResult:
         """
         The method counts page rank for pages and saves results
         in self._page_rank dictionary
 
-        :return: None
+        :param engine: a rank engine instance, a default one is used
+        if not given
+        :param warm_start: if True, iterations start from ranks of
+        the previous run
+        :return: a RankResult instance
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_hits(
+        self, engine: Optional[rank_engines.HitsRankEngine] = None
+    ) -> rank_engines.HitsResult:
+        """
+        The method counts HITS authority and hub scores for pages and
+        saves results in self._authorities and self._hubs dictionaries
+
+        :param engine: a HITS engine instance, a default one is used
+        if not given
+        :return: a HitsResult instance
         """
         raise NotImplementedError
 
@@ -65,41 +123,212 @@ class WikiPageRankInfoAccumulator(PageRankInfoAccumulator):
     """
 
     url_crawler = crawlers.WikiCrawler
+    streaming_url_crawler = crawlers.StreamingWikiCrawler
     url_parser = parsers.WikiParser
     dict_inverter = inverters.DictionaryInverterThreading
+    rank_engine = rank_engines.PowerIterationRankEngine
+    blocked_rank_engine = rank_engines.BlockedPowerIterationRankEngine
+    hits_engine = rank_engines.HitsRankEngine
+    async_url_crawler = crawlers.AsyncWikiCrawler
+    api_url_crawler = crawlers.MediaWikiApiCrawler
+    api_url_parser = parsers.MediaWikiApiParser
 
-    def __init__(self, start_url: str, page_limit: int):
-        super().__init__(start_url, page_limit)
+    def __init__(
+        self,
+        start_url: str,
+        page_limit: int,
+        cache_dir: Optional[str] = settings.RESPONSE_CACHE_DIR,
+        checkpoint_path: Optional[str] = settings.CHECKPOINT_PATH,
+        live_rank: bool = settings.LIVE_RANK,
+        streaming_fetch: bool = settings.STREAMING_FETCH,
+    ):
+        """
+        object constructor
+
+        :param start_url: a URL to start scrapping from
+        :param page_limit: a max number of pages to scrap
+        :param cache_dir: a directory of the on-disk response cache,
+        responses are not cached if None
+        :param checkpoint_path: a path of the crawl checkpoint journal,
+        that every scrapped page is appended to, no checkpoints are
+        written if None; an existing journal is only continued by resume
+        :param live_rank: if True, a Monte Carlo estimate of PageRank is
+        updated as pages are scrapped
+        :param streaming_fetch: if True, the "threads" engine extracts
+        links of pages while they download and stops reading them once
+        their main content ends; connections of such pages are not kept
+        alive, see StreamingWikiCrawler about connections_reused
+        """
+        super().__init__(urls.canonical_url(start_url), page_limit)
         self._url_mask = self.get_wiki_url_mask(self._start_url)
+        self._crawl_stats = {}
+        self._connection_stats = {}
+        self._frontier = None
+        self._rate_limiter = rate_limiters.RateLimiter()
+        self._concurrency = None
+        self._response_cache = (
+            caches.ResponseCache(cache_dir) if cache_dir is not None else None
+        )
+        self._checkpoint = (
+            checkpoints.CrawlCheckpoint(checkpoint_path)
+            if checkpoint_path is not None
+            else None
+        )
+        # the journal is appended to only after resume or earlier runs
+        self._checkpoint_append = False
+        self._in_links = graphs.InLinkIndex(self._page_links)
+        self._redirects = urls.RedirectMap()
+        self._rank_stats = {}
+        self._matrix = None
+        self._matrix_pages = 0
+        self._live_rank = (
+            rank_engines.MonteCarloRankEstimator(self._page_links)
+            if live_rank
+            else None
+        )
+        self._stop_top_k = None
+        self._stable_top = ()
+        self._stable_since = 0
+        self._top_k_checked_at = 0
+        self._top_k_lock = threading.Lock()
+        self._stopped_early = False
+        self._streaming_fetch = streaming_fetch
+
+    @classmethod
+    def resume(
+        cls, checkpoint_path: str, **kwargs: Any
+    ) -> "WikiPageRankInfoAccumulator":
+        """
+        Method restores an accumulator from a crawl checkpoint journal,
+        so that scrap_data_till_limit continues the crawl from where it
+        stopped and keeps appending to the same journal
+
+        :param checkpoint_path: a path of the checkpoint journal
+        :param kwargs: other keyword arguments of the constructor
+        :return: a WikiPageRankInfoAccumulator instance
+        """
+        header, pages = checkpoints.CrawlCheckpoint.load(checkpoint_path)
+        accumulator = cls(
+            header["start_url"],
+            header["page_limit"],
+            checkpoint_path=checkpoint_path,
+            **kwargs,
+        )
+        accumulator._checkpoint_append = True
+        for url, links in pages:
+            if url not in accumulator._page_links:
+                page_id = accumulator._page_links.add_page(url, links)
+                accumulator._in_links.add_page(page_id)
+                if accumulator._live_rank is not None:
+                    accumulator._live_rank.add_page(page_id)
+        crawler_logger.info(
+            f"Resumed {len(accumulator._page_links)} pages "
+            f"from {checkpoint_path}"
+        )
+        return accumulator
+
+    @property
+    def in_links(self) -> graphs.InLinkIndex:
+        """
+        a getter method for the in-link index of collected pages, that
+        is updated as pages are recorded and can be queried during
+        scrapping
+        :return: _in_links value
+        """
+        return self._in_links
+
+    @property
+    def crawl_stats(self) -> Dict[str, Union[str, int, float]]:
+        """
+        a getter method for statistics of the last scrapping run: used
+        engine, number of scrapped pages, spent seconds, pages per
+        second, frontier counters, redirect counters, request rates of
+        the rate limiter, decisions of the concurrency controller,
+        connections opened and reused by the requests engines, response
+        cache,
+        checkpoint and live rank counters if they are used and
+        statistics of every stage for the pipeline engine
+        :return: _crawl_stats value
+        """
+        return self._crawl_stats
+
+    @property
+    def redirects(self) -> urls.RedirectMap:
+        """
+        a getter method for the map of redirects followed by crawlers,
+        that is kept between scrapping runs
+        :return: _redirects value
+        """
+        return self._redirects
+
+    @property
+    def live_rank(self) -> Optional[rank_engines.MonteCarloRankEstimator]:
+        """
+        a getter method for the live PageRank estimator, that can be
+        queried for current_top_k during scrapping, None if live
+        estimates are off
+        :return: _live_rank value
+        """
+        return self._live_rank
+
+    @property
+    def rank_stats(self) -> Dict[str, Union[bool, int, float]]:
+        """
+        a getter method for statistics of the last PageRank run: whether
+        it was warm-started, numbers of full and local iterations, local
+        rank updates and final residual, plus iterations of a cold start
+        and iterations saved if they were compared
+        :return: _rank_stats value
+        """
+        return self._rank_stats
 
     @staticmethod
     def get_wiki_url_mask(url: str) -> str:
         """
         method processes a URL and returns a URL mask, that contains
-        Scheme, Sub-domain, Domain and Top-level domain
+        Scheme, Sub-domain, Domain, Top-level domain and Port if any
 
         :param url: a given URK
         :return: a URL mask
         """
-        mask = re.search("^(https?://)(?:www\.)?([^:/?\n]+)", url)[0]
+        mask = re.search(r"^(https?://)(?:www\.)?([^/?#\n]+)", url)[0]
         return mask
 
     def _process_wiki_links(self, links: List[str]) -> List[str]:
         """
-        method processes internal Wikipedia links by adding a URL mask
-        to them which is saved in self._url_mask and replacing inner
-        spaces with underscores
+        method processes internal Wikipedia links by resolving them
+        against a URL mask which is saved in self._url_mask and turning
+        them into canonical URLs, so that fragment, percent-encoding and
+        title case variants of a link are one page; links to known
+        redirects are replaced with their targets
 
         :param links: a list of internal links
         :return: a processed list of internal links
         """
-        processed_links = [
-            urllib.parse.urljoin(self._url_mask, link) for link in links
-        ]
-        processed_links = [
-            link.strip().replace(" ", "_") for link in processed_links
-        ]
-        return processed_links
+        mask = self._url_mask
+        return self._redirects.rewrite(
+            [urls.canonical_url(link, mask) for link in links]
+        )
+
+    def _crawler_options(self) -> Dict:
+        """
+        method returns keyword arguments for crawlers of a scrapping
+        run, that share the rate limiter and the response cache and
+        report every request to the concurrency controller if there is
+        one
+
+        :return: a dictionary of keyword arguments
+        """
+        return {
+            "rate_limiter": self._rate_limiter,
+            "observer": (
+                self._concurrency.record
+                if self._concurrency is not None
+                else None
+            ),
+            "cache": self._response_cache,
+            "redirects": self._redirects,
+        }
 
     def collect_page_data(
         self,
@@ -114,10 +343,15 @@ class WikiPageRankInfoAccumulator(PageRankInfoAccumulator):
         :param session: a session instance
         :return: a list of found internal links
         """
-        url_crawler = self.url_crawler()
+        if self._streaming_fetch:
+            links = self.streaming_url_crawler(**self._crawler_options())(
+                url, session
+            )
+            return links if isinstance(links, list) else None
+        url_crawler = self.url_crawler(**self._crawler_options())
         url_parser = self.url_parser()
         request_text = url_crawler(url, session)
-        if not isinstance(request_text, settings.NotSet):
+        if isinstance(request_text, str):
             internal_links = url_parser.parse(request_text)
             return internal_links
 
@@ -125,114 +359,854 @@ class WikiPageRankInfoAccumulator(PageRankInfoAccumulator):
         self,
         url: str,
         lock: threading.Lock,
-        visited: set,
-        url_pool: list,
+        frontier: frontiers.UrlFrontier,
         session: Session,
-    ) -> None:
+    ) -> bool:
         """
-        Method scraps a given URL link, processes collected data and
-        writes collected data in self._page_links dictionary while also
-        copying found links to a given pool to continue parsing and
-        recording current URL as visited to prevent repeated scraping
+        Method scraps a given URL link claimed from a frontier,
+        processes collected data and writes collected data in
+        self._page_links dictionary while also adding found links to
+        the frontier to continue parsing; committing or releasing the
+        claim and skipping URLs recorded as redirect targets is left to
+        the caller
         Uses a lock to prevent race conditions, and a session instance
         for processing the request
 
         :param url: given URL
         :param lock:  a lock instance
-        :param visited: set of visited URLs
-        :param url_pool: a list of URLs to visit
+        :param frontier: a frontier of URLs to visit
+        :param session: a session instance
+        :return: True if page data were recorded
+        """
+        local = threading.local()
+        local.links = self.collect_page_data(url, session)
+        if not local.links:
+            return False
+
+        local.processed_links = self._process_wiki_links(local.links)
+        with lock:
+            local.page_url = self._record_page(url, local.processed_links)
+        if local.page_url is None:
+            return False
+        self._add_to_frontier(
+            frontier, url, local.page_url, local.processed_links
+        )
+        return True
+
+    def _is_recorded_target(self, url: str) -> bool:
+        """
+        Method checks if a claimed URL was recorded already as a target
+        of a redirect, counting a saved fetch if it was; the claim of
+        such a URL is released without counting a wasted request
+
+        :param url: a claimed URL
+        :return: True if the URL must not be fetched
+        """
+        if url not in self._page_links:
+            return False
+        self._redirects.count_saved_fetches()
+        return True
+
+    def _add_to_frontier(
+        self,
+        frontier: frontiers.UrlFrontier,
+        url: str,
+        page_url: str,
+        processed_links: List[str],
+    ) -> None:
+        """
+        Method adds found links of a recorded page to a frontier, if the
+        page was recorded under a redirect target, the target is marked
+        as seen, so that it is never fetched again
+        The page is added to the live rank estimator here, after
+        the page was recorded, since its walks do not need the crawl
+        lock
+
+        :param frontier: a frontier of URLs to visit
+        :param url: a claimed URL
+        :param page_url: a URL the page was recorded under
+        :param processed_links: processed links of the page
+        :return: None
+        """
+        if self._live_rank is not None:
+            self._live_rank.add_page(self._page_links.url_id(page_url))
+            if self._stop_top_k is not None:
+                self._check_top_k()
+        if page_url != url:
+            self._redirects.count_saved_fetches(frontier.mark_seen([page_url]))
+        frontier.add(processed_links)
+
+    def _record_page(
+        self, url: str, processed_links: List[str]
+    ) -> Optional[str]:
+        """
+        Method writes page data in self._page_links, adds it to the
+        in-link index and queues it for the checkpoint journal if there
+        is one, callers must not record pages concurrently
+        A page fetched through a redirect is recorded under the URL of
+        its target, unless the target was recorded already
+
+        :param url: a URL of the page
+        :param processed_links: processed links of the page
+        :return: a URL the page was recorded under or None if it was
+        a duplicate
+        """
+        url = self._redirects.resolve(url)
+        if url in self._page_links:
+            self._redirects.count_duplicate_fetch()
+            return None
+        page_id = self._page_links.add_page(url, processed_links)
+        self._in_links.add_page(page_id)
+        if self._checkpoint is not None:
+            self._checkpoint.record(url, processed_links)
+        return url
+
+    def _check_top_k(self) -> None:
+        """
+        Method closes the frontier once the set of self._stop_top_k
+        highest ranked pages of the live estimate has not changed for
+        settings.LIVE_RANK_STABLE_PAGES recorded pages and is separated
+        from the next page by error bounds
+        The top is sorted out of all estimates, so it is checked once
+        per settings.LIVE_RANK_CHECK_PAGES recorded pages and by one
+        worker at a time, others skip the check
+
+        :return: None
+        """
+        if not self._top_k_lock.acquire(blocking=False):
+            return
+        try:
+            self._check_top_k_stability()
+        finally:
+            self._top_k_lock.release()
+
+    def _check_top_k_stability(self) -> None:
+        """
+        Method makes a check of _check_top_k method, must be called
+        holding self._top_k_lock
+
+        :return: None
+        """
+        pages = self._live_rank.pages_number
+        if pages - self._top_k_checked_at < settings.LIVE_RANK_CHECK_PAGES:
+            return
+        self._top_k_checked_at = pages
+        top = frozenset(
+            estimate.url
+            for estimate in self._live_rank.current_top_k(self._stop_top_k)
+        )
+        if top != self._stable_top:
+            self._stable_top, self._stable_since = top, pages
+        elif (
+            not self._stopped_early
+            and pages - self._stable_since >= settings.LIVE_RANK_STABLE_PAGES
+            and self._live_rank.is_top_k_separated(self._stop_top_k)
+        ):
+            crawler_logger.info(
+                f"Top {self._stop_top_k} pages are stable since "
+                f"{self._stable_since} pages, stopping at {pages} pages"
+            )
+            self._stopped_early = True
+            self._frontier.close()
+
+    def _scrap_worker(
+        self,
+        lock: threading.Lock,
+        frontier: frontiers.UrlFrontier,
+        session: Session,
+        prog_bar: tqdm,
+    ) -> None:
+        """
+        Method is a long-lived worker loop that claims URLs from
+        a frontier and scraps them, committing claims of recorded pages
+        and releasing the others, until the frontier is finished; each
+        request waits for a slot of the concurrency controller
+
+        :param lock:  a lock instance
+        :param frontier: a frontier of URLs to visit
         :param session: a session instance
+        :param prog_bar: a progress bar to update
         :return: None
         """
-        if url not in visited:
+        while (url := frontier.claim()) is not None:
+            recorded = requested = False
+            self._concurrency.acquire()
+            try:
+                if not self._is_recorded_target(url):
+                    requested = True
+                    recorded = self.scrap_one_url(url, lock, frontier, session)
+            finally:
+                self._concurrency.release()
+                if recorded:
+                    frontier.commit(url)
+                    prog_bar.update(1)
+                else:
+                    frontier.release(url, wasted=requested)
+
+    def scrap_url_batch(
+        self,
+        batch: List[str],
+        lock: threading.Lock,
+        frontier: frontiers.UrlFrontier,
+        session: Session,
+    ) -> Set[str]:
+        """
+        Method gets links of a batch of URLs claimed from a frontier
+        with MediaWiki API requests, records pages that have links in
+        self._page_links dictionary and adds found links to the
+        frontier; pages the API resolved as redirects are recorded
+        under URLs of their targets, committing or releasing the claims
+        and skipping URLs recorded as redirect targets is left to the
+        caller
+
+        :param batch: claimed URLs
+        :param lock: a lock instance
+        :param frontier: a frontier of URLs to visit
+        :param session: a session instance
+        :return: a set of claimed URLs whose pages were recorded
+        """
+        if not batch:
+            return set()
+        responses = self.api_url_crawler(**self._crawler_options())(
+            batch, session
+        )
+        if not isinstance(responses, list):
+            return set()
+        api_links = self.api_url_parser().parse_batch(responses)
+
+        recorded = set()
+        for url in batch:
+            title = api_links.resolve(urls.url_title(url))
+            self._redirects.add(
+                url, urls.canonical_url(urls.title_href(title), self._url_mask)
+            )
+            links = api_links.links.get(title)
+            if not links:
+                continue
+            processed_links = self._process_wiki_links(links)
             with lock:
-                visited.add(url)
+                page_url = self._record_page(url, processed_links)
+            if page_url is not None:
+                self._add_to_frontier(frontier, url, page_url, processed_links)
+                recorded.add(url)
+        return recorded
 
-            if len(self._page_links) < self._page_limit:
-                local = threading.local()
-                local.start = timeit.default_timer()
+    def _api_worker(
+        self,
+        lock: threading.Lock,
+        frontier: frontiers.UrlFrontier,
+        session: Session,
+        prog_bar: tqdm,
+    ) -> None:
+        """
+        Method is a long-lived worker loop that claims batches of up to
+        settings.API_BATCH_SIZE URLs from a frontier and scraps them
+        with the MediaWiki API, committing claims of recorded pages and
+        releasing the others, until the frontier is finished; each
+        batch waits for a slot of the concurrency controller
+        A batch request is counted as one wasted request if it records
+        no page, other unrecorded URLs of a batch are released without
+        counting
 
-                local.links = self.collect_page_data(url, session)
-                if local.links:
-                    local.processed_links = self._process_wiki_links(
-                        local.links
-                    )
-                    with lock:
-                        self._page_links[url] = local.processed_links
-                        url_pool.extend(local.processed_links)
+        :param lock:  a lock instance
+        :param frontier: a frontier of URLs to visit
+        :param session: a session instance
+        :param prog_bar: a progress bar to update
+        :return: None
+        """
+        while (url := frontier.claim()) is not None:
+            batch = [url]
+            while len(batch) < settings.API_BATCH_SIZE and (
+                url := frontier.try_claim()
+            ):
+                batch.append(url)
+            recorded, requested = set(), []
+            self._concurrency.acquire()
+            try:
+                requested = [
+                    url for url in batch if not self._is_recorded_target(url)
+                ]
+                recorded = self.scrap_url_batch(
+                    requested, lock, frontier, session
+                )
+            finally:
+                self._concurrency.release()
+                # an empty result of a batch request is one wasted
+                # request, not one per URL
+                wasted = bool(requested) and not recorded
+                for url in batch:
+                    if url in recorded:
+                        frontier.commit(url)
+                    else:
+                        frontier.release(url, wasted=wasted)
+                        wasted = False
+                prog_bar.update(len(recorded))
 
-                    local.spent_time = timeit.default_timer() - local.start
-                    if local.spent_time < 1:
-                        time.sleep(1 - local.spent_time)
-        else:
-            return settings.NOT_SET
+    async def scrap_one_url_async(
+        self,
+        url: str,
+        frontier: frontiers.UrlFrontier,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.BoundedSemaphore,
+    ) -> bool:
+        """
+        Method scraps a given URL link on an event loop, processes
+        collected data and writes it in self._page_links dictionary
+        while also adding found links to a given frontier to continue
+        parsing, the claim of the URL is committed or released and the
+        slot taken from the semaphore is released when the work is done
+        Parsing runs in the default executor not to block the loop
+
+        :param url: given URL
+        :param frontier: a frontier of URLs to visit
+        :param session: an aiohttp session instance
+        :param semaphore: a semaphore bounding in-flight requests
+        :return: True if page data were recorded
+        """
+        recorded = requested = False
+        try:
+            if self._is_recorded_target(url):
+                return False
+            requested = True
+            request_text = await self.async_url_crawler(
+                **self._crawler_options()
+            )(url, session)
+            if not isinstance(request_text, str):
+                return False
+
+            links = await asyncio.get_running_loop().run_in_executor(
+                None, self.url_parser().parse, request_text
+            )
+            if not links:
+                return False
+
+            processed_links = self._process_wiki_links(links)
+            page_url = self._record_page(url, processed_links)
+            if page_url is None:
+                return False
+            self._add_to_frontier(frontier, url, page_url, processed_links)
+            recorded = True
+            return True
+        finally:
+            if recorded:
+                frontier.commit(url)
+            else:
+                frontier.release(url, wasted=requested)
+            semaphore.release()
 
     def scrap_data_till_limit(
         self,
         max_workers: int = settings.THREADS_SCRAPPING,
+        engine: str = settings.SCRAPPING_ENGINE,
+        stop_top_k: Optional[int] = None,
     ):
         """
         Method gets data starting from self._start_url page saved on
         initialization until it scraps a number of links equal to
         self._page_limit value and then saves collected data in
-        self._page_links dictionary
-        Uses threading to improve performance
+        self._page_links dictionary and run statistics in
+        self._crawl_stats
+        Uses threading ("threads" engine), an asyncio event loop
+        ("asyncio" engine) or a staged pipeline with a process pool for
+        parsing ("pipeline" engine) to improve performance; the "api"
+        engine gets links of many pages per request from the MediaWiki
+        API instead of fetching and parsing pages
+
+        A number of in-flight requests is adapted by an AIMD controller
+        up to max_workers
+
+        With live rank estimates, scrapping can stop before the limit
+        once the set of stop_top_k highest ranked pages has stabilised
+
+        :param max_workers: max number of active threads or in-flight
+        requests of the event loop
+        :param engine: a name of scrapping engine
+        :param stop_top_k: a number of top pages whose stability stops
+        scrapping early, scrapping runs till the limit if None
+        :return: None
+        """
+        self._concurrency = concurrency.AdaptiveConcurrencyController(
+            max_limit=max_workers
+        )
+        pages_before = len(self._page_links)
+        stage_stats = None
+        start = timeit.default_timer()
+
+        if engine not in ("threads", "asyncio", "pipeline", "api"):
+            raise ValueError(f"Unknown scrapping engine {engine}")
+        if self._streaming_fetch and engine != "threads":
+            raise ValueError("Streaming fetch needs the threads engine")
+        if stop_top_k is not None and self._live_rank is None:
+            raise ValueError("Stopping at stable top pages needs live rank")
+        self._stop_top_k = stop_top_k
+        self._stable_top, self._stable_since = (), 0
+        self._top_k_checked_at = 0
+        self._stopped_early = False
+        self._connection_stats = {}
+        if self._checkpoint is not None:
+            self._checkpoint.open(
+                self._start_url, self._page_limit, self._checkpoint_append
+            )
+            self._checkpoint_append = True
+
+        try:
+            with tqdm(
+                total=self._page_limit, initial=pages_before
+            ) as prog_bar:
+                if engine == "threads":
+                    self._scrap_with_threads(max_workers, prog_bar)
+                elif engine == "asyncio":
+                    asyncio.run(
+                        self._scrap_with_asyncio(max_workers, prog_bar)
+                    )
+                elif engine == "api":
+                    self._scrap_with_threads(
+                        max_workers, prog_bar, self._api_worker
+                    )
+                else:
+                    stage_stats = self._scrap_with_pipeline(
+                        max_workers, prog_bar
+                    )
+        finally:
+            if self._checkpoint is not None:
+                self._checkpoint.close()
+
+        spent_time = timeit.default_timer() - start
+        pages = len(self._page_links) - pages_before
+        self._crawl_stats = {
+            "engine": engine,
+            "pages": pages,
+            "seconds": spent_time,
+            "pages_per_second": pages / spent_time if spent_time else 0.0,
+            **self._frontier.stats,
+            **self._redirects.stats,
+            **self._rate_limiter.stats,
+            **self._concurrency.stats,
+            **self._connection_stats,
+        }
+        if self._response_cache is not None:
+            self._crawl_stats.update(self._response_cache.stats)
+        if self._checkpoint is not None:
+            self._crawl_stats.update(self._checkpoint.stats)
+        if self._live_rank is not None:
+            self._crawl_stats.update(self._live_rank.stats)
+            self._crawl_stats["stopped_early"] = self._stopped_early
+        if stage_stats is not None:
+            self._crawl_stats["stages"] = stage_stats
+        crawler_logger.info(f"Scrapping finished: {self._crawl_stats}")
+
+    def _make_frontier(self) -> frontiers.UrlFrontier:
+        """
+        Method creates a frontier for a scrapping run, that hands out no
+        more URLs than needed to reach self._page_limit and saves it in
+        self._frontier; it starts from self._start_url, or, if pages
+        were already collected (e.g. restored from a checkpoint), from
+        every linked URL that is not a collected page yet
+
+        :return: a UrlFrontier instance
+        """
+        if len(self._page_links):
+            urls = [
+                url
+                for url in self._page_links.urls
+                if url not in self._page_links
+            ]
+        else:
+            urls = [self._start_url]
+        self._frontier = frontiers.UrlFrontier(
+            urls,
+            self._page_limit - len(self._page_links),
+            seen=self._page_links,
+        )
+        return self._frontier
+
+    def _scrap_with_threads(
+        self,
+        max_workers: int,
+        prog_bar: tqdm,
+        worker: Optional[Callable] = None,
+    ) -> None:
+        """
+        Method runs scrapping with a pool of long-lived worker threads
+        sharing one frontier and one requests Session, that keeps
+        a connection alive for every worker, workers take new URLs as
+        soon as they finish previous ones
 
         :param max_workers: max number of active threads
+        :param prog_bar: a progress bar to update
+        :param worker: a worker loop, self._scrap_worker if not given
         :return: None
         """
-        max_workers = (
+        worker = worker if worker is not None else self._scrap_worker
+        frontier = self._make_frontier()
+        lock = threading.Lock()
+
+        with sessions.PooledSession(
             max_workers
-            if max_workers <= settings.MAX_REQUESTS_PER_SECOND
-            else settings.MAX_REQUESTS_PER_SECOND
-        )
-        visited = set()
-        url_pool = [self._start_url]
+        ) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            workers = [
+                executor.submit(worker, lock, frontier, session, prog_bar)
+                for _ in range(max_workers)
+            ]
+            for future in concurrent.futures.as_completed(workers):
+                future.result()
+            self._connection_stats = session.stats
 
-        with tqdm(total=self._page_limit) as prog_bar, Session() as session:
-            lock = threading.Lock()
+    async def _scrap_with_asyncio(
+        self, max_connections: int, prog_bar: tqdm
+    ) -> None:
+        """
+        Method runs scrapping on an asyncio event loop, starting a task
+        for every URL taken from the frontier while a bounded semaphore
+        caps the number of in-flight requests, which is kept below
+        the limit of the concurrency controller, and the connector keeps
+        as many connections as there can be in-flight requests;
+        scrapping stops when the limit is reached or there are no URLs
+        left to visit
 
-            while len(self._page_links) < self._page_limit:
-                diff = self._page_limit - len(self._page_links)
-                url_pool = [url for url in url_pool if url not in visited]
+        :param max_connections: max number of in-flight requests
+        :param prog_bar: a progress bar to update
+        :return: None
+        """
+        frontier = self._make_frontier()
+        semaphore = asyncio.BoundedSemaphore(max_connections)
+        tasks = set()
 
-                if len(url_pool) < diff:
-                    link_pool_for_workers = url_pool[:]
-                    url_pool.clear()
-                else:
-                    link_pool_for_workers = url_pool[:diff]
-                    url_pool[:diff] = []
-
-                with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    futures = []
-                    for url in link_pool_for_workers:
-                        futures.append(
-                            executor.submit(
-                                self.scrap_one_url,
-                                url,
-                                lock,
-                                visited,
-                                url_pool,
-                                session,
+        connector = aiohttp.TCPConnector(
+            limit=max_connections,
+            limit_per_host=settings.MAX_HOST_CONNECTIONS or 0,
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            while True:
+                if len(tasks) < self._concurrency.limit and (
+                    url := frontier.try_claim()
+                ):
+                    await semaphore.acquire()
+                    tasks.add(
+                        asyncio.create_task(
+                            self.scrap_one_url_async(
+                                url, frontier, session, semaphore
                             )
                         )
-                    for future in concurrent.futures.as_completed(futures):
-                        if future.result() != settings.NOT_SET:
-                            prog_bar.update(1)
+                    )
+                elif tasks:
+                    done, tasks = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    prog_bar.update(sum(task.result() for task in done))
+                else:
+                    break
+
+    def _fetch_stage(
+        self,
+        frontier: frontiers.UrlFrontier,
+        session: Session,
+        item: Tuple[str, None],
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Method is the fetch stage of the pipeline engine, it requests
+        a URL holding a slot of the concurrency controller; it releases
+        claims of URLs it drops itself, so that a URL recorded as
+        a redirect target is released without counting a wasted request
+
+        :param frontier: a frontier of URLs to visit
+        :param session: a session instance
+        :param item: a tuple of a claimed URL and None
+        :return: a tuple of the URL and page data or None if request
+        failed
+        """
+        url, _ = item
+        request_text = None
+        requested = False
+        self._concurrency.acquire()
+        try:
+            if not self._is_recorded_target(url):
+                requested = True
+                request_text = self.url_crawler(**self._crawler_options())(
+                    url, session
+                )
+        finally:
+            self._concurrency.release()
+            if not isinstance(request_text, str):
+                frontier.release(url, wasted=requested)
+        if isinstance(request_text, str):
+            return url, request_text
+
+    def _parse_stage(
+        self, executor: ProcessPoolExecutor, item: Tuple[str, str]
+    ) -> Optional[Tuple[str, List[str]]]:
+        """
+        Method is the parse stage of the pipeline engine, it parses page
+        data in a process pool and waits for the result, so a number of
+        stage workers bounds a number of pages being parsed
+
+        :param executor: a process pool executor
+        :param item: a tuple of a URL and page data
+        :return: a tuple of the URL and found internal links or None if
+        there are none
+        """
+        url, request_text = item
+        links = executor.submit(self.url_parser().parse, request_text).result()
+        if links:
+            return url, links
+
+    def _normalize_stage(
+        self, item: Tuple[str, List[str]]
+    ) -> Tuple[str, List[str]]:
+        """
+        Method is the normalize stage of the pipeline engine
+
+        :param item: a tuple of a URL and found internal links
+        :return: a tuple of the URL and processed links
+        """
+        url, links = item
+        return url, self._process_wiki_links(links)
+
+    def _store_stage(
+        self,
+        frontier: frontiers.UrlFrontier,
+        prog_bar: tqdm,
+        item: Tuple[str, List[str]],
+    ) -> Tuple[str, List[str]]:
+        """
+        Method is the store stage of the pipeline engine, the only
+        writer of self._page_links, which records page data, adds found
+        links to the frontier and commits the claim of the URL
+
+        :param frontier: a frontier of URLs to visit
+        :param prog_bar: a progress bar to update
+        :param item: a tuple of a URL and processed links
+        :return: the item or None if the page was a duplicate
+        """
+        url, processed_links = item
+        page_url = self._record_page(url, processed_links)
+        if page_url is None:
+            return None
+        self._add_to_frontier(frontier, url, page_url, processed_links)
+        frontier.commit(url)
+        prog_bar.update(1)
+        return item
 
-    def count_page_rank(self) -> None:
+    @staticmethod
+    def _release_item(frontier: frontiers.UrlFrontier, item: Any) -> None:
         """
-        The method counts page rank for pages by reversing _page_links
-        dictionary key-value pairs, then counting number of links that
-        lead to the page and saves results in self._page_rank dictionary
+        Method releases a claim of a URL of an item dropped by
+        a pipeline stage
 
+        :param frontier: a frontier of URLs to visit
+        :param item: a tuple of a URL and any payload
         :return: None
         """
+        frontier.release(item[0])
+
+    def _scrap_with_pipeline(
+        self, max_workers: int, prog_bar: tqdm
+    ) -> Dict[str, Dict[str, Union[int, float]]]:
+        """
+        Method runs scrapping as a pipeline of fetch, parse, normalize
+        and store stages connected with bounded queues: fetching runs on
+        max_workers I/O threads, parsing runs in a pool of processes
+        (started with "spawn", as forking a process with running threads
+        is unsafe) and a single store worker writes collected data
+        The calling thread feeds the pipeline with claimed URLs until
+        the frontier is finished
+
+        :param max_workers: max number of fetching threads
+        :param prog_bar: a progress bar to update
+        :return: a dictionary of stage statistics by stage name
+        """
+        frontier = self._make_frontier()
+        release = functools.partial(self._release_item, frontier)
+
+        with sessions.PooledSession(
+            max_workers
+        ) as session, ProcessPoolExecutor(
+            max_workers=settings.PROCESSES_PARSING,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            pipeline = pipelines.Pipeline(
+                pipelines.PipelineStage(
+                    "fetch",
+                    functools.partial(self._fetch_stage, frontier, session),
+                    workers=max_workers,
+                ),
+                pipelines.PipelineStage(
+                    "parse",
+                    functools.partial(self._parse_stage, executor),
+                    workers=settings.PROCESSES_PARSING,
+                    on_drop=release,
+                ),
+                pipelines.PipelineStage(
+                    "normalize", self._normalize_stage, on_drop=release
+                ),
+                pipelines.PipelineStage(
+                    "store",
+                    functools.partial(self._store_stage, frontier, prog_bar),
+                    on_drop=release,
+                ),
+            )
+            with pipeline:
+                while (url := frontier.claim()) is not None:
+                    pipeline.put((url, None))
+            self._connection_stats = session.stats
+            return pipeline.stats
+
+    def _is_indexed(self) -> bool:
+        """
+        The method checks if the in-link index covers all pages of
+        self._page_links, it does not if page links were replaced
+
+        :return: True if the index is up to date
+        """
+        return self._in_links.graph is self._page_links and (
+            self._in_links.pages_number == len(self._page_links)
+        )
+
+    def _link_matrix(self) -> rank_engines.LinkMatrix:
+        """
+        The method returns a link matrix of collected pages, built from
+        the in-link index if it is up to date; a matrix built from the
+        index is kept until more pages are recorded, so that PageRank
+        and HITS of one crawl share it
+
+        :return: a LinkMatrix instance
+        """
+        if not self._is_indexed():
+            return rank_engines.LinkMatrix.from_page_links(self._page_links)
+        if self._matrix is None or self._matrix_pages != len(self._page_links):
+            self._matrix = rank_engines.LinkMatrix.from_in_link_index(
+                self._in_links
+            )
+            self._matrix_pages = len(self._page_links)
+        return self._matrix
+
+    def count_in_links(self) -> Dict[str, int]:
+        """
+        The method counts a number of distinct pages linking to every
+        page, taking counts from the in-link index if it is up to date
+        or by reversing _page_links dictionary key-value pairs otherwise
+
+        :return: a dictionary of in-link numbers
+        """
+        if self._is_indexed():
+            return self._in_links.in_degrees()
         rev_data = self.dict_inverter().invert_dict(self._page_links)
         unique_data = {key: set(value) for key, value in rev_data.items()}
-        self._page_rank = {
-            key: len(value) for key, value in unique_data.items()
+        return {key: len(value) for key, value in unique_data.items()}
+
+    def save_graph(self, path: str) -> None:
+        """
+        The method saves collected page links as a link graph file, that
+        can be opened with graph_files.open_link_matrix and ranked
+        without scrapping again
+
+        :param path: a path of the file
+        :return: None
+        """
+        graph_files.save_link_matrix(self._link_matrix(), path)
+
+    def count_page_rank(
+        self,
+        engine: Optional[rank_engines.RankEngine] = None,
+        warm_start: bool = False,
+        compare_cold_start: bool = False,
+        threads: int = 1,
+    ) -> rank_engines.RankResult:
+        """
+        The method counts PageRank for pages with a given rank engine
+        or with a default one built from self.rank_engine, or from
+        self.blocked_rank_engine if more than one thread is asked for,
+        and saves results in self._page_rank dictionary
+
+        A warm start begins iterations from ranks of the previous run,
+        so that ranking again after a few more pages were scrapped
+        takes fewer iterations; statistics of the run are saved in
+        self._rank_stats with the wall time of the run and logged to
+        the metrics logger
+
+        :param engine: a rank engine instance
+        :param warm_start: if True, iterations start from
+        self._page_rank
+        :param compare_cold_start: if True, a warm-started run is
+        repeated from scratch to count saved iterations and time
+        :param threads: a number of threads multiplying row blocks of
+        the link matrix with a default engine
+        :return: a RankResult instance with number of iterations and
+        final residual of the run
+        """
+        if engine is None:
+            engine = (
+                self.blocked_rank_engine(threads=threads)
+                if threads > 1
+                else self.rank_engine()
+            )
+        matrix = self._link_matrix()
+        initial = self._page_rank if warm_start and self._page_rank else None
+        start = timeit.default_timer()
+        result = engine.rank(matrix, initial=initial)
+        self._rank_stats = {
+            "warm_start": initial is not None,
+            "iterations": result.iterations,
+            "local_iterations": result.local_iterations,
+            "local_updates": result.local_updates,
+            "residual": result.residual,
+            "seconds": timeit.default_timer() - start,
         }
+        if compare_cold_start and initial is not None:
+            start = timeit.default_timer()
+            cold_iterations = engine.rank(matrix).iterations
+            self._rank_stats["cold_seconds"] = timeit.default_timer() - start
+            self._rank_stats["cold_iterations"] = cold_iterations
+            # local iterations are counted as full ones, which they
+            # are at most
+            self._rank_stats["iterations_saved"] = (
+                cold_iterations - result.iterations - result.local_iterations
+            )
+        metrics_logger.info(
+            "page rank: "
+            + " ".join(
+                f"{key}={value}" for key, value in self._rank_stats.items()
+            )
+        )
+        self._page_rank = result.scores
+        return result
+
+    def count_hits(
+        self, engine: Optional[rank_engines.HitsRankEngine] = None
+    ) -> rank_engines.HitsResult:
+        """
+        The method counts HITS authority and hub scores for pages with
+        a given engine or with a default one built from
+        self.hits_engine over the same link matrix as count_page_rank
+        and saves results in self._authorities and self._hubs
+        dictionaries
+
+        :param engine: a HITS engine instance
+        :return: a HitsResult instance with number of iterations and
+        final residual of the run
+        """
+        engine = engine if engine is not None else self.hits_engine()
+        result = engine.rank(self._link_matrix())
+        self._authorities, self._hubs = result.scores, result.hubs
+        return result
+
+    def count_page_rank_batch(
+        self,
+        rank_settings: List[rank_engines.RankSetting],
+        engine: Optional[rank_engines.PowerIterationRankEngine] = None,
+    ) -> List[rank_engines.RankResult]:
+        """
+        The method counts PageRank of collected pages for a batch of
+        damping factors and personalization vectors in one run over
+        the same link matrix, self._page_rank is left as it is
+
+        :param rank_settings: a list of RankSetting instances
+        :param engine: a rank engine instance, whose tolerance and
+        max_iterations are used
+        :return: a list of RankResult instances in the order of settings
+        """
+        engine = engine if engine is not None else self.rank_engine()
+        return engine.rank_batch(self._link_matrix(), rank_settings)
 
 
 if __name__ == "__main__":
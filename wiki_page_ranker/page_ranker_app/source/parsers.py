@@ -1,7 +1,14 @@
+import html
+import json
+import re
+
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
 
-from bs4 import BeautifulSoup
+from page_ranker_app import settings
+from page_ranker_app.source import urls
 
 
 class Parser(ABC):
@@ -17,25 +24,385 @@ class Parser(ABC):
 class WikiParser(Parser):
     """
     a class that processes data from Wikipedia pages
+
+    Anchors can be extracted with one of two backends: "scanner" finds
+    them in a single regular expression pass over the page, skipping
+    comments, CDATA sections, declarations, processing instructions,
+    scripts and styles as html.parser does, and "bs4" builds
+    a full BeautifulSoup tree with html.parser
+
+    A canonical link of a page tells which page it is: Wikipedia serves
+    a redirect with 200 status and the content of its target page,
+    whose canonical link points to the target
     """
 
-    def parse(self, request_text: str) -> List[str]:
+    backends = ("scanner", "bs4")
+
+    # comments (including empty "<!-->" and "<!--->" ones), CDATA
+    # sections, declarations and processing instructions are skipped
+    # as html.parser does; attributes of an anchor or a link tag may be
+    # separated by whitespace or slashes
+    _token_re = re.compile(
+        r"<(?:!--(?:-?>|.*?(?:-->|\Z))"
+        r"|!\[CDATA\[.*?(?:\]\]>|\Z)"
+        r"|[!?][^>]*(?:>|\Z)"
+        r"|(script|style)\b.*?(?:</\1\s*>|\Z)"
+        r"|(?:a|(link))((?:[\s/]+[^\s=>/]+"
+        r"(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]+))?)*)"
+        r"[\s/]*>)",
+        re.IGNORECASE | re.DOTALL,
+    )
+    _attribute_re = re.compile(
+        r"([^\s=>/]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+)))?"
+    )
+
+    def __init__(self, backend: str = settings.PARSER_BACKEND):
+        """
+        object constructor
+
+        :param backend: a name of link extraction backend
+        """
+        if backend not in self.backends:
+            raise ValueError(f"Unknown parser backend {backend}")
+        self.backend = backend
+
+    def parse(self, request_text: Union[str, bytes]) -> List[str]:
         """
         method for parsing and processing of Wikipedia page data, it
         collects and returns a list of links on internal resources
 
-        :param request_text: Wikipedia page data in string form
+        :param request_text: Wikipedia page data in string form or
+        UTF-8 encoded bytes
         :return: a list of links on internal resources
         """
-        _soup = BeautifulSoup(request_text, "html.parser")
-        internal_url_links = []
+        if isinstance(request_text, bytes):
+            request_text = request_text.decode("utf-8", errors="replace")
+        hrefs = (
+            self._scan_hrefs(request_text)
+            if self.backend == "scanner"
+            else self._soup_hrefs(request_text)
+        )
+        return [href for href in hrefs if self._is_internal(href)]
+
+    def canonical_href(self, request_text: Union[str, bytes]) -> Optional[str]:
+        """
+        method returns an href value of the canonical link of a page,
+        a <link> tag with rel="canonical", the first one if there are
+        several
+
+        :param request_text: Wikipedia page data in string form or
+        UTF-8 encoded bytes
+        :return: an href value or None if the page has no canonical
+        link
+        """
+        if isinstance(request_text, bytes):
+            request_text = request_text.decode("utf-8", errors="replace")
+        if self.backend == "scanner":
+            return self.scan_canonical_href(request_text)
+        _soup = BeautifulSoup(
+            request_text, "html.parser", parse_only=SoupStrainer("link")
+        )
+        for link in _soup.find_all("link", href=True):
+            if "canonical" in (rel.lower() for rel in link.get("rel", ())):
+                return link["href"]
+        return None
+
+    @classmethod
+    def scan_canonical_href(cls, request_text: str) -> Optional[str]:
+        """
+        method returns an href value of the canonical link of a page
+        with the scanner, scanning stops at the link, which is in the
+        head of a page
+
+        :param request_text: page data in string form
+        :return: an href value or None if the page has no canonical
+        link
+        """
+        for match in cls._token_re.finditer(request_text):
+            href = cls._match_canonical_href(match)
+            if href is not None:
+                return href
+        return None
+
+    @staticmethod
+    def _is_internal(href: str) -> bool:
+        """
+        method checks if a link points to an article of the wiki
+
+        :param href: an href value
+        :return: True if the link is internal
+        """
+        return href.startswith("/wiki/") and ":" not in href
 
+    @staticmethod
+    def _soup_hrefs(request_text: str) -> Iterator[str]:
+        """
+        method yields href values of all anchors of a page, using
+        a BeautifulSoup tree
+
+        :param request_text: page data in string form
+        :return: an iterator of href values
+        """
+        _soup = BeautifulSoup(request_text, "html.parser")
         for link in _soup.find_all("a", href=True):
-            if link.get("href").startswith("/wiki/") and ":" not in link.get(
-                "href"
+            yield link["href"]
+
+    @classmethod
+    def _scan_hrefs(cls, request_text: str) -> Iterator[str]:
+        """
+        method yields href values of all anchors of a page, using
+        a single pass of a regular expression over the page
+
+        :param request_text: page data in string form
+        :return: an iterator of href values
+        """
+        for match in cls._token_re.finditer(request_text):
+            href = cls._match_href(match)
+            if href is not None:
+                yield href
+
+    @classmethod
+    def _match_href(cls, match: re.Match) -> Optional[str]:
+        """
+        method returns an href value of a token found by the scanner
+
+        :param match: a match of the token regular expression
+        :return: an href value or None if the token is not an anchor
+        with an href
+        """
+        attributes = match.group(3)
+        if not attributes or match.group(2) is not None:
+            return None
+        return cls._attribute(attributes, "href")
+
+    @classmethod
+    def _match_canonical_href(cls, match: re.Match) -> Optional[str]:
+        """
+        method returns an href value of a token found by the scanner if
+        it is a canonical link
+
+        :param match: a match of the token regular expression
+        :return: an href value or None if the token is not a canonical
+        link with an href
+        """
+        attributes = match.group(3)
+        if not attributes or match.group(2) is None:
+            return None
+        rel = cls._attribute(attributes, "rel")
+        if rel is None or "canonical" not in rel.lower().split():
+            return None
+        return cls._attribute(attributes, "href")
+
+    @classmethod
+    def _attribute(cls, attributes: str, name: str) -> Optional[str]:
+        """
+        method returns a value of an attribute of a tag found by
+        the scanner, the last one if it is repeated
+
+        :param attributes: attributes of the tag as they are written
+        :param name: a lowercase name of the attribute
+        :return: an unescaped value or None if the tag has no such
+        attribute
+        """
+        if name not in attributes.lower():
+            return None
+        value = None
+        for attribute, *values in cls._attribute_re.findall(attributes):
+            if attribute.lower() == name:
+                value = "".join(values)
+        if value is not None and "&" in value:
+            value = html.unescape(value)
+        return value
+
+
+class IncrementalLinkExtractor:
+    """
+    a link extractor that is fed a page in chunks while it downloads,
+    finding links with the scanner of WikiParser, so that links of
+    a page are known as soon as its main content ends; the canonical
+    link of the page is kept as canonical_href
+
+    Text that can hold an incomplete tag, comment or script is kept
+    until the next chunk comes, the rest of scanned text is dropped, so
+    that memory use does not grow with the page size
+    """
+
+    # an anchor or a link tag that is not closed by ">" outside of
+    # quotes yet, the lookahead and the backreference match its quoted
+    # values without backtracking
+    _incomplete_tag_re = re.compile(
+        r"<(?:a|link)[\s/](?=((?:[^>\"']+|\"[^\"]*\"|'[^']*')*))\1"
+        r"(?:\"[^\"]*|'[^']*)?\Z",
+        re.IGNORECASE,
+    )
+    _tag_name_re = re.compile(r"<[a-z]*\Z", re.IGNORECASE)
+
+    def __init__(self, end_marker: Optional[str] = settings.STREAM_END_MARKER):
+        """
+        object constructor
+
+        :param end_marker: markup that ends the main content of a page,
+        text after it is not scanned, a page is scanned to its end if
+        None
+        """
+        self.end_marker = end_marker
+        self.links: List[str] = []
+        self.canonical_href: Optional[str] = None
+        self.finished = False
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> bool:
+        """
+        method scans a next chunk of a page for links
+
+        :param chunk: a chunk of page data
+        :return: True if the main content has ended and no more chunks
+        are needed
+        """
+        if self.finished:
+            return True
+        end = -1
+        if self.end_marker:
+            searched = max(0, len(self._buffer) - len(self.end_marker) + 1)
+            self._buffer += chunk
+            end = self._buffer.find(self.end_marker, searched)
+        else:
+            self._buffer += chunk
+        if end != -1:
+            self._scan(end, final=True)
+        else:
+            self._scan(self._incomplete_start(), final=False)
+        return self.finished
+
+    def _incomplete_start(self) -> int:
+        """
+        method returns a position kept text may be incomplete from:
+        a start of an anchor or a link tag, which is not closed yet and
+        may hold "<" in quoted values, a tag name cut by the end of
+        the chunk or a beginning of the end marker
+
+        :return: a position in kept text, its length if all of it is
+        complete
+        """
+        size = len(self._buffer)
+        incomplete = self._incomplete_tag_re.search(self._buffer)
+        start = incomplete.start() if incomplete else size
+        last_tag = self._buffer.rfind("<")
+        if last_tag != -1 and self._tag_name_re.match(self._buffer, last_tag):
+            start = min(start, last_tag)
+        if self.end_marker:
+            for length in range(min(len(self.end_marker) - 1, size), 0, -1):
+                if self._buffer.endswith(self.end_marker[:length]):
+                    return min(start, size - length)
+        return start
+
+    def close(self) -> List[str]:
+        """
+        method scans text left after the last chunk of a page
+
+        :return: a list of links on internal resources
+        """
+        if not self.finished:
+            self._scan(len(self._buffer), final=True)
+        return self.links
+
+    def _scan(self, end: int, final: bool) -> None:
+        """
+        method collects links of kept text up to a given position and
+        drops scanned text; unless the scan is final, a comment or
+        script that reaches the position may continue in the next chunk
+        and is kept
+
+        :param end: a position to scan text up to
+        :param final: if True, no text of the page follows the position
+        :return: None
+        """
+        keep = end
+        for match in WikiParser._token_re.finditer(self._buffer, 0, end):
+            if not final and match.end() == end and match.group(3) is None:
+                keep = match.start()
+                break
+            href = WikiParser._match_href(match)
+            if href is not None:
+                if WikiParser._is_internal(href):
+                    self.links.append(href)
+            elif self.canonical_href is None:
+                self.canonical_href = WikiParser._match_canonical_href(match)
+        if final:
+            self._buffer = ""
+            self.finished = True
+        else:
+            self._buffer = self._buffer[keep:]
+
+
+class ApiLinks(NamedTuple):
+    """
+    links of a batch of pages returned by the MediaWiki API: links by
+    titles of pages and titles the API normalized or resolved as
+    redirects mapped to titles they became
+    """
+
+    links: Dict[str, List[str]]
+    aliases: Dict[str, str]
+
+    def resolve(self, title: str) -> str:
+        """
+        method returns a title of the page a requested title stands for
+
+        :param title: a requested title
+        :return: a title of the page
+        """
+        for _ in range(len(self.aliases)):
+            if title not in self.aliases:
+                break
+            title = self.aliases[title]
+        return title
+
+
+class MediaWikiApiParser(Parser):
+    """
+    a class that processes responses of the MediaWiki API to
+    action=query&prop=links requests (formatversion=2), links are
+    returned as they are written on wiki pages, so they are processed
+    as links found by WikiParser
+
+    Missing and invalid pages have no links
+    """
+
+    def parse(self, request_text: Union[str, bytes]) -> List[str]:
+        """
+        method collects links of all pages of an API response
+
+        :param request_text: an API response in JSON form
+        :return: a list of links on internal resources
+        """
+        api_links = self.parse_batch([json.loads(request_text)])
+        return [link for links in api_links.links.values() for link in links]
+
+    def parse_batch(self, responses: List[Dict[str, Any]]) -> ApiLinks:
+        """
+        method merges decoded API responses of a batch of titles, that
+        were returned one after another while following continuation
+
+        :param responses: decoded API responses
+        :return: an ApiLinks instance
+        """
+        links = {}
+        aliases = {}
+        for response in responses:
+            query = response.get("query", {})
+            for alias in query.get("normalized", []) + query.get(
+                "redirects", []
             ):
-                internal_url_links.append(link["href"])
-        return internal_url_links
+                aliases[alias["from"]] = alias["to"]
+            for page in query.get("pages", []):
+                if "missing" in page or "invalid" in page:
+                    continue
+                links.setdefault(page["title"], []).extend(
+                    urls.title_href(link["title"])
+                    for link in page.get("links", ())
+                )
+        return ApiLinks(links, aliases)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+"""
+Staged pipelines, where every stage runs its own workers and passes
+results to the next stage through a bounded queue
+"""
+
+import queue
+import threading
+import timeit
+
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from page_ranker_app import settings
+from page_ranker_app.source.loggers import crawler_logger
+
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    a stage of a pipeline: a number of worker threads that take items
+    from a bounded input queue, process them with a given function and
+    put results into the input queue of the next stage
+
+    A full input queue blocks the previous stage, so a slow stage slows
+    down the stages before it instead of piling items up in memory
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+        on_drop: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        object constructor
+
+        :param name: a name of the stage for statistics
+        :param func: a function that processes an item and returns
+        an item for the next stage or None to drop the item
+        :param workers: a number of worker threads
+        :param queue_size: a max number of items in the input queue
+        :param on_drop: a callable that is given every dropped item,
+        including items whose processing raised an exception
+        """
+        self.name = name
+        self.input = queue.Queue(maxsize=queue_size)
+        self._func = func
+        self._workers_number = workers
+        self._on_drop = on_drop
+        self._next_stage = None
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._dropped = 0
+        self._max_depth = 0
+        self._started = None
+        self._stopped = None
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        getter for stage statistics: numbers of processed and dropped
+        items, throughput in items per second, current and max depth
+        of the input queue
+
+        :return: a dictionary of statistics
+        """
+        with self._lock:
+            end = self._stopped or timeit.default_timer()
+            spent_time = end - self._started if self._started else 0.0
+            return {
+                "processed": self._processed,
+                "dropped": self._dropped,
+                "items_per_second": (
+                    self._processed / spent_time if spent_time else 0.0
+                ),
+                "queue_depth": self.input.qsize(),
+                "max_queue_depth": self._max_depth,
+            }
+
+    def connect(self, next_stage: "PipelineStage") -> "PipelineStage":
+        """
+        method makes a given stage the receiver of results
+
+        :param next_stage: the next stage
+        :return: the next stage, so that calls can be chained
+        """
+        self._next_stage = next_stage
+        return next_stage
+
+    def put(self, item: Any) -> None:
+        """
+        method puts an item into the input queue, blocking while it is
+        full
+
+        :param item: given item
+        :return: None
+        """
+        self.input.put(item)
+        depth = self.input.qsize()
+        if depth > self._max_depth:
+            with self._lock:
+                self._max_depth = max(self._max_depth, depth)
+
+    def start(self) -> None:
+        """
+        method starts worker threads of the stage
+
+        :return: None
+        """
+        self._started = timeit.default_timer()
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"{self.name}-{number}", daemon=True
+            )
+            for number in range(self._workers_number)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        method lets workers finish queued items and waits for them to
+        exit
+
+        :return: None
+        """
+        for _ in self._threads:
+            self.input.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._stopped = timeit.default_timer()
+
+    def _work(self) -> None:
+        """
+        method is a worker loop of the stage
+
+        :return: None
+        """
+        while (item := self.input.get()) is not _STOP:
+            try:
+                result = self._func(item)
+            except Exception as exc:
+                crawler_logger.error(f"Stage {self.name} failed: {exc!r}")
+                result = None
+
+            with self._lock:
+                self._processed += 1
+                self._dropped += result is None
+            if result is None:
+                if self._on_drop is not None:
+                    self._on_drop(item)
+            elif self._next_stage is not None:
+                self._next_stage.put(result)
+
+
+class Pipeline:
+    """
+    a chain of stages, that are started together and stopped one after
+    another, so that every stage finishes the items left by the previous
+    one before it stops
+    """
+
+    def __init__(self, *stages: PipelineStage):
+        """
+        object constructor, connecting given stages in order
+
+        :param stages: stages of the pipeline
+        """
+        self.stages = stages
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.connect(next_stage)
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """
+        getter for statistics of every stage
+
+        :return: a dictionary of stage statistics by stage name
+        """
+        return {stage.name: stage.stats for stage in self.stages}
+
+    def put(self, item: Any) -> None:
+        """
+        method puts an item into the first stage
+
+        :param item: given item
+        :return: None
+        """
+        self.stages[0].put(item)
+
+    def __enter__(self) -> "Pipeline":
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        for stage in self.stages:
+            stage.stop()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,1051 @@
+"""
+Rank engines that compute page rank over a crawled link graph
+"""
+
+import functools
+import random
+import threading
+
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from page_ranker_app import settings
+from page_ranker_app.source import graphs
+
+
+class RankResult(NamedTuple):
+    """
+    a result of a rank engine run, local iterations and updates count
+    work of a warm-started run that recomputed only changed pages
+    """
+
+    scores: Dict[str, float]
+    iterations: int
+    residual: float
+    converged: bool
+    local_iterations: int = 0
+    local_updates: int = 0
+
+
+class HitsResult(NamedTuple):
+    """
+    a result of a HITS run, scores are authority scores of pages
+    """
+
+    scores: Dict[str, float]
+    hubs: Dict[str, float]
+    iterations: int
+    residual: float
+    converged: bool
+
+
+class RankSetting(NamedTuple):
+    """
+    parameters of one PageRank run of a batch: a damping factor and
+    weights of pages a random surfer jumps to, all pages are equally
+    likely if personalization is None
+    """
+
+    damping: float = settings.DAMPING_FACTOR
+    personalization: Optional[Mapping[str, float]] = None
+
+
+class RankEstimate(NamedTuple):
+    """
+    an estimated rank of a page with a half-width of its confidence
+    interval
+    """
+
+    url: str
+    score: float
+    error: float
+
+
+class LinkMatrix:
+    """
+    a sparse representation of a link graph, stored as a CSR matrix
+    where rows are link targets and columns are link sources, so that
+    a single row holds all in-links of a page
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        out_degree: np.ndarray,
+        out_links: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ):
+        """
+        object constructor
+
+        :param urls: a sequence of URLs, where position is a node id
+        :param indptr: CSR row offsets of in-links, of len(urls) + 1
+        :param indices: CSR column indices, ids of linking pages
+        :param out_degree: a number of distinct out-links of every node
+        :param out_links: CSR row offsets and column indices of
+        out-links if they are known, see out_links method
+        """
+        self.urls = urls
+        self.indptr = indptr
+        self.indices = indices
+        self.out_degree = out_degree
+        self._out_links = out_links
+
+    @property
+    def nodes_number(self) -> int:
+        """
+        getter for a number of nodes in the matrix
+
+        :return: a number of nodes
+        """
+        return len(self.urls)
+
+    @property
+    def edges_number(self) -> int:
+        """
+        getter for a number of edges in the matrix
+
+        :return: a number of edges
+        """
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(
+        cls,
+        urls: List[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+    ) -> "LinkMatrix":
+        """
+        method builds a matrix from parallel arrays of edge sources and
+        targets, dropping repeated edges
+
+        :param urls: a list of URLs, where position is a node id
+        :param sources: an array of source node ids
+        :param targets: an array of target node ids
+        :return: a LinkMatrix instance
+        """
+        nodes_number = len(urls)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        edge_keys = np.unique(targets * nodes_number + sources)
+        row_ids, indices = np.divmod(edge_keys, nodes_number)
+
+        indptr = np.zeros(nodes_number + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_ids, minlength=nodes_number), out=indptr[1:])
+        out_degree = np.bincount(indices, minlength=nodes_number)
+        return cls(urls, indptr, indices.astype(np.int32), out_degree)
+
+    @classmethod
+    def from_page_links(
+        cls, page_links: Mapping[str, Sequence[str]]
+    ) -> "LinkMatrix":
+        """
+        method builds a matrix from a UrlGraph or any dictionary of
+        page links, where keys are URLs of pages and values are lists
+        of URLs they link to
+
+        :param page_links: a UrlGraph or a dictionary of page links
+        :return: a LinkMatrix instance
+        """
+        graph = (
+            page_links
+            if isinstance(page_links, graphs.UrlGraph)
+            else graphs.UrlGraph.from_mapping(page_links)
+        )
+        sources, targets = graph.edge_arrays()
+        return cls.from_edges(graph.urls[:], sources, targets)
+
+    @classmethod
+    def from_in_link_index(cls, index: graphs.InLinkIndex) -> "LinkMatrix":
+        """
+        method builds a matrix from a snapshot of an in-link index,
+        which already holds distinct edges and node degrees, and keeps
+        out-links, which the index gives without a transpose
+
+        :param index: an InLinkIndex instance
+        :return: a LinkMatrix instance
+        """
+        indptr, indices, out_degree = index.csr_arrays()
+        out_links = index.out_csr_arrays(len(out_degree), len(indices))
+        urls = index.graph.urls[: len(out_degree)]
+        return cls(urls, indptr, indices, out_degree, out_links)
+
+    def out_links(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        method returns a transposed matrix, where rows are link sources
+        and columns are link targets, so that a single row holds all
+        out-links of a page; the transpose is kept for later calls
+
+        :return: a tuple of CSR row offsets and column indices
+        """
+        if self._out_links is None:
+            self._out_links = self._transpose()
+        return self._out_links
+
+    def _transpose(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        method transposes the in-link matrix, see out_links method
+
+        :return: a tuple of CSR row offsets and column indices
+        """
+        row_ids = np.repeat(
+            np.arange(self.nodes_number, dtype=np.int32), np.diff(self.indptr)
+        )
+        out_indptr = np.zeros(self.nodes_number + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.indices, minlength=self.nodes_number),
+            out=out_indptr[1:],
+        )
+        out_indices = row_ids[np.argsort(self.indices, kind="stable")]
+        return out_indptr, out_indices
+
+
+def csr_rows(
+    indptr: np.ndarray, rows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    function returns a sub-matrix of given CSR rows as row offsets of
+    the sub-matrix and positions of its entries in the whole matrix
+
+    :param indptr: CSR row offsets
+    :param rows: an array of row ids
+    :return: a tuple of row offsets and entry positions
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    sub_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=sub_indptr[1:])
+    positions = np.repeat(starts - sub_indptr[:-1], lengths)
+    positions += np.arange(sub_indptr[-1])
+    return sub_indptr, positions
+
+
+def csr_matvec(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    values: np.ndarray,
+) -> np.ndarray:
+    """
+    function sums given values over columns of every CSR row, which is
+    a product of a binary CSR matrix and a vector
+
+    :param indptr: CSR row offsets
+    :param indices: CSR column indices
+    :param values: a vector of values for every column
+    :return: a vector of row sums
+    """
+    sums = np.zeros(len(indptr) - 1, dtype=values.dtype)
+    starts = indptr[:-1]
+    non_empty = starts < indptr[1:]
+    if len(indices):
+        sums[non_empty] = np.add.reduceat(values[indices], starts[non_empty])
+    return sums
+
+
+def row_blocks(indptr: np.ndarray, block_edges: int) -> List[Tuple[int, int]]:
+    """
+    function splits CSR rows into consecutive blocks of about
+    block_edges entries, a row longer than that makes a block alone
+
+    :param indptr: CSR row offsets
+    :param block_edges: a number of entries in a block
+    :return: a list of tuples of first and past-the-end rows of blocks
+    """
+    rows_number = len(indptr) - 1
+    cuts = np.searchsorted(
+        indptr, np.arange(block_edges, indptr[-1], block_edges)
+    )
+    bounds = np.unique(np.concatenate(([0], cuts, [rows_number])))
+    bounds = bounds[bounds <= rows_number].tolist()
+    return list(zip(bounds, bounds[1:]))
+
+
+def blocked_matvec(
+    executor: Executor,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    blocks: List[Tuple[int, int]],
+    values: np.ndarray,
+) -> np.ndarray:
+    """
+    function multiplies a binary CSR matrix by a vector as csr_matvec
+    does, a block of rows per task of a given executor; NumPy releases
+    the GIL in gathers and sums, so blocks are multiplied in parallel
+    by a thread pool, and a gathered block stays in cache while it is
+    summed
+
+    :param executor: an executor that runs tasks
+    :param indptr: CSR row offsets
+    :param indices: CSR column indices
+    :param blocks: row blocks made by row_blocks
+    :param values: a vector of values for every column
+    :return: a vector of row sums
+    """
+    sums = np.empty(len(indptr) - 1, dtype=values.dtype)
+
+    def multiply(block: Tuple[int, int]) -> None:
+        first, end = block
+        block_indptr = indptr[first : end + 1]
+        sums[first:end] = csr_matvec(
+            block_indptr - block_indptr[0],
+            indices[block_indptr[0] : block_indptr[-1]],
+            values,
+        )
+
+    for _ in executor.map(multiply, blocks):
+        pass
+    return sums
+
+
+def degree_buckets(
+    indptr: np.ndarray, indices: np.ndarray
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    function groups non-empty CSR rows by their lengths, so that column
+    indices of rows of one length form a dense matrix
+
+    :param indptr: CSR row offsets
+    :param indices: CSR column indices
+    :return: a list of tuples of row ids and a matrix of their column
+    indices, a row of the matrix for every row id
+    """
+    lengths = np.diff(indptr)
+    order = np.argsort(lengths, kind="stable")
+    bounds = np.flatnonzero(np.diff(lengths[order])) + 1
+    buckets = []
+    for rows in np.split(order, bounds):
+        length = lengths[rows[0]] if len(rows) else 0
+        if length:
+            positions = indptr[rows][:, np.newaxis] + np.arange(length)
+            buckets.append((rows, indices[positions]))
+    return buckets
+
+
+def buckets_matmul(
+    buckets: List[Tuple[np.ndarray, np.ndarray]],
+    values: np.ndarray,
+    rows_number: int,
+) -> np.ndarray:
+    """
+    function sums rows of given values over columns of every bucketed
+    row, which is a product of a binary sparse matrix and a dense
+    matrix; rows of values are gathered a bucket at a time, so every
+    column index is read once for all columns of values
+
+    :param buckets: row buckets made by degree_buckets
+    :param values: a matrix with a row of values for every column
+    :param rows_number: a number of rows of the sparse matrix
+    :return: a matrix of row sums
+    """
+    sums = np.zeros((rows_number, values.shape[1]), dtype=values.dtype)
+    for rows, columns in buckets:
+        sums[rows] = np.take(values, columns, axis=0).sum(axis=1)
+    return sums
+
+
+class RankEngine(ABC):
+    """
+    an interface for rank engines
+    """
+
+    @abstractmethod
+    def rank(
+        self,
+        graph: Union[LinkMatrix, Mapping[str, Sequence[str]]],
+        initial: Optional[Mapping[str, float]] = None,
+    ) -> RankResult:
+        """
+        method counts ranks for all pages of a given graph
+
+        :param graph: a LinkMatrix or a dictionary of page links
+        :param initial: ranks of a previous run on a part of the graph
+        to start from, if the engine supports warm starts
+        :return: a RankResult instance
+        """
+        raise NotImplementedError
+
+
+class PowerIterationRankEngine(RankEngine):
+    """
+    a rank engine that counts PageRank by damped power iteration over
+    a sparse link matrix
+    """
+
+    def __init__(
+        self,
+        damping: float = settings.DAMPING_FACTOR,
+        tolerance: float = settings.RANK_TOLERANCE,
+        max_iterations: int = settings.MAX_RANK_ITERATIONS,
+        local_fraction: float = settings.WARM_START_LOCAL_FRACTION,
+        local_tolerance: float = settings.WARM_START_LOCAL_TOLERANCE,
+    ):
+        """
+        object constructor
+
+        :param damping: a probability to follow a link on a page
+        :param tolerance: an L1 distance between two consecutive rank
+        vectors at which iteration stops
+        :param max_iterations: a max number of iterations
+        :param local_fraction: a max share of pages a warm-started run
+        recomputes locally, a larger change is iterated over all pages
+        :param local_tolerance: a relative change of rank of a page at
+        which a warm-started run recomputes pages it links to
+        """
+        if not 0 < damping < 1:
+            raise ValueError("Damping factor must be between 0 and 1")
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.local_fraction = local_fraction
+        self.local_tolerance = local_tolerance
+
+    def rank(
+        self,
+        graph: Union[LinkMatrix, Mapping[str, Sequence[str]]],
+        initial: Optional[Mapping[str, float]] = None,
+    ) -> RankResult:
+        """
+        method counts PageRank for all pages of a given graph; rank of
+        pages without out-links (dangling pages, including pages that
+        were not crawled) is spread evenly over all pages
+
+        A warm-started run begins with given ranks of a previous run,
+        new pages get an even share; if after the first iteration only
+        a small share of pages changed noticeably (by local_tolerance of
+        their rank), it recomputes only pages linked from changed pages
+        until such changes die out, then polishes ranks with full
+        iterations until they converge
+
+        :param graph: a LinkMatrix or a dictionary of page links
+        :param initial: ranks of a previous run to start from
+        :return: a RankResult instance
+        """
+        matrix = self._as_matrix(graph)
+        return self._iterate(
+            matrix,
+            initial,
+            functools.partial(csr_matvec, matrix.indptr, matrix.indices),
+        )
+
+    @staticmethod
+    def _as_matrix(
+        graph: Union[LinkMatrix, Mapping[str, Sequence[str]]],
+    ) -> LinkMatrix:
+        """
+        method returns a link matrix of a given graph
+
+        :param graph: a LinkMatrix or a dictionary of page links
+        :return: a LinkMatrix instance
+        """
+        if isinstance(graph, LinkMatrix):
+            return graph
+        return LinkMatrix.from_page_links(graph)
+
+    def _iterate(
+        self,
+        matrix: LinkMatrix,
+        initial: Optional[Mapping[str, float]],
+        matvec: Callable[[np.ndarray], np.ndarray],
+    ) -> RankResult:
+        """
+        method runs power iteration over a link matrix, see rank method
+
+        :param matrix: a link matrix
+        :param initial: ranks of a previous run to start from
+        :param matvec: a function that multiplies the link matrix by
+        a vector of values for every column
+        :return: a RankResult instance
+        """
+        nodes_number = matrix.nodes_number
+        if not nodes_number:
+            return RankResult({}, 0, 0.0, True)
+
+        dangling = matrix.out_degree == 0
+        inverse_degree = np.zeros(nodes_number)
+        inverse_degree[~dangling] = 1 / matrix.out_degree[~dangling]
+        ranks = np.full(nodes_number, 1 / nodes_number)
+        if initial:
+            ranks = self._warm_ranks(matrix, initial)
+        iterations, residual = 0, np.inf
+        local_iterations = local_updates = 0
+        # ranks updated locally are checked with a full iteration
+        polish = False
+
+        while iterations < self.max_iterations and (
+            residual > self.tolerance or polish
+        ):
+            iterations += 1
+            polish = False
+            spread = matvec(ranks * inverse_degree)
+            dangling_rank = ranks[dangling].sum()
+            new_ranks = self.damping * spread
+            new_ranks += (
+                1 - self.damping + self.damping * dangling_rank
+            ) / nodes_number
+            changes = np.abs(new_ranks - ranks)
+            residual = float(changes.sum())
+            ranks = new_ranks
+
+            if initial and iterations == 1 and residual > self.tolerance:
+                changed = np.flatnonzero(
+                    changes > self.local_tolerance * ranks
+                )
+                if len(changed) <= self.local_fraction * nodes_number:
+                    local_iterations, local_updates = self._update_locally(
+                        matrix, ranks, inverse_degree, dangling, changed
+                    )
+                    polish = True
+
+        scores = dict(zip(matrix.urls, ranks.tolist()))
+        return RankResult(
+            scores,
+            iterations,
+            residual,
+            residual <= self.tolerance and not polish,
+            local_iterations,
+            local_updates,
+        )
+
+    def rank_batch(
+        self,
+        graph: Union[LinkMatrix, Mapping[str, Sequence[str]]],
+        rank_settings: Sequence[RankSetting],
+    ) -> List[RankResult]:
+        """
+        method counts PageRank for several damping factors and
+        personalization vectors at once, iterating a dense matrix with
+        a column of ranks for every setting, so that the link matrix is
+        read once per iteration for all of them; in-links are grouped
+        by in-degree of pages, so that the product is a few dense
+        gathers and sums, and a column stops being iterated when it
+        converges
+
+        Rank of pages without out-links is spread over pages in
+        proportion to personalization of the setting, so a setting
+        without personalization gives the same ranks as rank method
+
+        :param graph: a LinkMatrix or a dictionary of page links
+        :param rank_settings: a sequence of RankSetting instances
+        :return: a list of RankResult instances in the order of settings
+        """
+        if not rank_settings:
+            return []
+        matrix = self._as_matrix(graph)
+        nodes_number = matrix.nodes_number
+        if not nodes_number:
+            return [RankResult({}, 0, 0.0, True) for _ in rank_settings]
+
+        dampings = np.array([setting.damping for setting in rank_settings])
+        if not np.all((0 < dampings) & (dampings < 1)):
+            raise ValueError("Damping factor must be between 0 and 1")
+        jumps = np.column_stack(
+            [
+                self._jump_vector(matrix, setting.personalization)
+                for setting in rank_settings
+            ]
+        )
+        dangling = np.flatnonzero(matrix.out_degree == 0)
+        inverse_degree = np.zeros(nodes_number)
+        linking = matrix.out_degree > 0
+        inverse_degree[linking] = 1 / matrix.out_degree[linking]
+        buckets = degree_buckets(matrix.indptr, matrix.indices)
+
+        settings_number = len(rank_settings)
+        final_ranks = np.empty((nodes_number, settings_number))
+        iterations = np.zeros(settings_number, dtype=np.int64)
+        residuals = np.full(settings_number, np.inf)
+        # columns of settings that are still iterated, kept contiguous
+        active = np.arange(settings_number)
+        ranks = jumps.copy()
+        while len(active) and iterations[active[0]] < self.max_iterations:
+            iterations[active] += 1
+            damping = dampings[active]
+            dangling_rank = np.take(ranks, dangling, axis=0).sum(axis=0)
+            new_ranks = buckets_matmul(
+                buckets, ranks * inverse_degree[:, np.newaxis], nodes_number
+            )
+            new_ranks *= damping
+            new_ranks += (1 - damping + damping * dangling_rank) * jumps
+            ranks -= new_ranks
+            residuals[active] = np.abs(ranks).sum(axis=0)
+            ranks = new_ranks
+
+            converged = residuals[active] <= self.tolerance
+            if converged.any():
+                final_ranks[:, active[converged]] = ranks[:, converged]
+                ranks = np.ascontiguousarray(ranks[:, ~converged])
+                jumps = np.ascontiguousarray(jumps[:, ~converged])
+                active = active[~converged]
+        final_ranks[:, active] = ranks
+
+        return [
+            RankResult(
+                dict(zip(matrix.urls, final_ranks[:, column].tolist())),
+                int(iterations[column]),
+                float(residuals[column]),
+                bool(residuals[column] <= self.tolerance),
+            )
+            for column in range(settings_number)
+        ]
+
+    @staticmethod
+    def _jump_vector(
+        matrix: LinkMatrix, personalization: Optional[Mapping[str, float]]
+    ) -> np.ndarray:
+        """
+        method builds a vector of probabilities to jump to every page,
+        URLs of personalization that are not in the matrix are ignored
+
+        :param matrix: a link matrix
+        :param personalization: weights of pages or None for an even
+        distribution
+        :return: a vector summing up to 1
+        :raises ValueError if no page of the matrix has a positive
+        weight
+        """
+        nodes_number = matrix.nodes_number
+        if personalization is None:
+            return np.full(nodes_number, 1 / nodes_number)
+        jumps = np.fromiter(
+            (personalization.get(url, 0.0) for url in matrix.urls),
+            dtype=np.float64,
+            count=nodes_number,
+        )
+        if np.any(jumps < 0) or jumps.sum() <= 0:
+            raise ValueError(
+                "Personalization must give a positive weight to a page"
+            )
+        return jumps / jumps.sum()
+
+    @staticmethod
+    def _warm_ranks(
+        matrix: LinkMatrix, initial: Mapping[str, float]
+    ) -> np.ndarray:
+        """
+        method builds a starting rank vector from ranks of a previous
+        run, pages missing from it get an even share and the vector is
+        normalized to sum up to 1; if the ranks sum up to 0, all pages
+        get an even share
+
+        :param matrix: a link matrix
+        :param initial: ranks of a previous run
+        :return: a rank vector
+        """
+        nodes_number = matrix.nodes_number
+        ranks = np.fromiter(
+            (initial.get(url, np.nan) for url in matrix.urls),
+            dtype=np.float64,
+            count=nodes_number,
+        )
+        ranks[np.isnan(ranks)] = 1 / nodes_number
+        total = ranks.sum()
+        if not total > 0:
+            return np.full(nodes_number, 1 / nodes_number)
+        return ranks / total
+
+    def _update_locally(
+        self,
+        matrix: LinkMatrix,
+        ranks: np.ndarray,
+        inverse_degree: np.ndarray,
+        dangling: np.ndarray,
+        changed: np.ndarray,
+    ) -> Tuple[int, int]:
+        """
+        method updates ranks in place only for pages linked from pages
+        whose rank changed by more than local_tolerance of it, until no
+        such pages are left, the active set grows beyond local_fraction
+        of pages or max_iterations is reached; partial updates do not
+        keep the sum of ranks, so ranks are normalized in the end
+
+        :param matrix: a link matrix
+        :param ranks: a rank vector, updated in place
+        :param inverse_degree: inverse out-degrees of pages
+        :param dangling: a mask of pages without out-links
+        :param changed: ids of pages changed by the last iteration
+        :return: a tuple of numbers of local iterations and of updated
+        ranks
+        """
+        nodes_number = matrix.nodes_number
+        out_indptr, out_targets = matrix.out_links()
+
+        dangling_rank = ranks[dangling].sum()
+        iterations = updates = 0
+        while iterations < self.max_iterations:
+            active = np.unique(out_targets[csr_rows(out_indptr, changed)[1]])
+            if (
+                not len(active)
+                or len(active) > self.local_fraction * nodes_number
+            ):
+                break
+            iterations += 1
+            updates += len(active)
+
+            sub_indptr, positions = csr_rows(matrix.indptr, active)
+            sources = matrix.indices[positions]
+            spread = csr_matvec(
+                sub_indptr,
+                np.arange(len(sources)),
+                ranks[sources] * inverse_degree[sources],
+            )
+            new_ranks = self.damping * spread
+            new_ranks += (
+                1 - self.damping + self.damping * dangling_rank
+            ) / nodes_number
+            changes = new_ranks - ranks[active]
+            ranks[active] = new_ranks
+            dangling_rank += changes[dangling[active]].sum()
+            changed = active[
+                np.abs(changes) > self.local_tolerance * new_ranks
+            ]
+        ranks /= ranks.sum()
+        return iterations, updates
+
+
+class BlockedPowerIterationRankEngine(PowerIterationRankEngine):
+    """
+    a rank engine that counts PageRank by damped power iteration as
+    PowerIterationRankEngine does, multiplying the link matrix by row
+    blocks of about block_edges links in a pool of threads; blocks are
+    not bound to cores or memory nodes
+    """
+
+    def __init__(
+        self,
+        threads: int = settings.THREADS_RANKING,
+        block_edges: int = settings.RANK_BLOCK_EDGES,
+        **kwargs: Any,
+    ):
+        """
+        object constructor
+
+        :param threads: a number of threads multiplying blocks
+        :param block_edges: a number of links in a row block, a block
+        should fit into a core cache
+        :param kwargs: arguments of PowerIterationRankEngine
+        """
+        super().__init__(**kwargs)
+        if threads < 1 or block_edges < 1:
+            raise ValueError("Threads and block size must be positive")
+        self.threads = threads
+        self.block_edges = block_edges
+
+    def rank(
+        self,
+        graph: Union[LinkMatrix, Mapping[str, Sequence[str]]],
+        initial: Optional[Mapping[str, float]] = None,
+    ) -> RankResult:
+        """
+        method counts PageRank for all pages of a given graph, see
+        PowerIterationRankEngine.rank
+
+        :param graph: a LinkMatrix or a dictionary of page links
+        :param initial: ranks of a previous run to start from
+        :return: a RankResult instance
+        """
+        matrix = self._as_matrix(graph)
+        blocks = row_blocks(matrix.indptr, self.block_edges)
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            return self._iterate(
+                matrix,
+                initial,
+                functools.partial(
+                    blocked_matvec,
+                    executor,
+                    matrix.indptr,
+                    matrix.indices,
+                    blocks,
+                ),
+            )
+
+
+class HitsRankEngine(RankEngine):
+    """
+    a rank engine that counts HITS authority and hub scores by power
+    iteration over a sparse link matrix: authority of a page is a sum
+    of hub scores of pages linking to it, hub score of a page is a sum
+    of authorities of pages it links to, both vectors are normalized
+    to sum up to 1 after every step
+    """
+
+    def __init__(
+        self,
+        tolerance: float = settings.RANK_TOLERANCE,
+        max_iterations: int = settings.MAX_RANK_ITERATIONS,
+    ):
+        """
+        object constructor
+
+        :param tolerance: a sum of L1 distances between consecutive
+        authority and hub vectors at which iteration stops
+        :param max_iterations: a max number of iterations
+        """
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def rank(
+        self,
+        graph: Union[LinkMatrix, Mapping[str, Sequence[str]]],
+        initial: Optional[Mapping[str, float]] = None,
+    ) -> HitsResult:
+        """
+        method counts authority and hub scores for all pages of a given
+        graph; pages without in-links have no authority and pages
+        without out-links are no hubs
+
+        :param graph: a LinkMatrix or a dictionary of page links
+        :param initial: hub scores of a previous run to start from,
+        pages missing from them start with an even share; the run
+        starts with even hub scores if the previous ones give no
+        authority to any page
+        :return: a HitsResult instance
+        """
+        matrix = PowerIterationRankEngine._as_matrix(graph)
+        nodes_number = matrix.nodes_number
+        if not matrix.edges_number:
+            zeros = dict.fromkeys(matrix.urls, 0.0)
+            return HitsResult(zeros, dict(zeros), 0, 0.0, True)
+
+        out_indptr, out_indices = matrix.out_links()
+        hubs = np.full(nodes_number, 1 / nodes_number)
+        if initial:
+            warm_hubs = PowerIterationRankEngine._warm_ranks(matrix, initial)
+            if warm_hubs[matrix.out_degree > 0].any():
+                hubs = warm_hubs
+        authorities = np.zeros(nodes_number)
+        iterations, residual = 0, np.inf
+
+        while iterations < self.max_iterations and residual > self.tolerance:
+            iterations += 1
+            new_authorities = csr_matvec(matrix.indptr, matrix.indices, hubs)
+            new_authorities /= new_authorities.sum()
+            new_hubs = csr_matvec(out_indptr, out_indices, new_authorities)
+            new_hubs /= new_hubs.sum()
+            residual = float(
+                np.abs(new_authorities - authorities).sum()
+                + np.abs(new_hubs - hubs).sum()
+            )
+            authorities, hubs = new_authorities, new_hubs
+
+        return HitsResult(
+            dict(zip(matrix.urls, authorities.tolist())),
+            dict(zip(matrix.urls, hubs.tolist())),
+            iterations,
+            residual,
+            residual <= self.tolerance,
+        )
+
+
+class MonteCarloRankEstimator:
+    """
+    a streaming PageRank estimator over a growing UrlGraph, that is
+    updated page by page as pages are recorded, so that approximate
+    ranks are available during a crawl
+
+    Every node starts walks_per_node random walks; at every visited
+    node a walk stops with probability 1 - damping or moves to a random
+    distinct out-link, and a walk that stops at a page without links
+    is dropped. A share of visits of a node is its PageRank with rank
+    of dangling pages spread evenly over all pages, as counted by
+    PowerIterationRankEngine. Links of a recorded page never change,
+    so walks are never rerouted: a walk that wants to leave a page
+    that is not recorded yet is parked there and continues when the
+    page is recorded. A page costs walks of its new nodes and of walks
+    parked at it, the per-edge work is copying distinct links once
+    """
+
+    def __init__(
+        self,
+        graph: graphs.UrlGraph,
+        walks_per_node: int = settings.LIVE_RANK_WALKS,
+        damping: float = settings.DAMPING_FACTOR,
+        confidence_z: float = settings.LIVE_RANK_CONFIDENCE_Z,
+        seed: Optional[int] = None,
+    ):
+        """
+        object constructor
+
+        :param graph: an estimated graph
+        :param walks_per_node: a number of walks started at every node
+        :param damping: a probability to follow a link on a page
+        :param confidence_z: a number of standard errors in an error
+        bound, 1.96 gives about 95% confidence
+        :param seed: a seed of random walks, for repeatable estimates
+        """
+        if not 0 < damping < 1:
+            raise ValueError("Damping factor must be between 0 and 1")
+        if walks_per_node < 1:
+            raise ValueError("A number of walks per node must be positive")
+        self.graph = graph
+        self.walks_per_node = walks_per_node
+        self.damping = damping
+        self.confidence_z = confidence_z
+        self._random = random.Random(seed).random
+        self._page_rows: Dict[int, int] = {}
+        self._offsets = array("q", [0])
+        self._targets = array("i")
+        self._visits = array("q")
+        self._parked: Dict[int, int] = {}
+        self._total_visits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pages_number(self) -> int:
+        """
+        getter for a number of recorded pages
+
+        :return: a number of pages
+        """
+        return len(self._page_rows)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for estimator counters: recorded pages, nodes, started
+        walks, visits and walks parked at pages not recorded yet
+
+        :return: a dictionary of counters
+        """
+        with self._lock:
+            return {
+                "live_rank_pages": len(self._page_rows),
+                "live_rank_nodes": len(self._visits),
+                "live_rank_walks": len(self._visits) * self.walks_per_node,
+                "live_rank_visits": self._total_visits,
+                "live_rank_parked": sum(self._parked.values()),
+            }
+
+    def add_page(self, page_id: int) -> None:
+        """
+        method records distinct links of a page recorded in the graph,
+        starts walks of new nodes and continues walks parked at the page
+
+        :param page_id: an id of the page
+        :return: None
+        """
+        targets = dict.fromkeys(self.graph.links_of(page_id))
+        with self._lock:
+            self._page_rows[page_id] = len(self._offsets) - 1
+            self._targets.extend(targets)
+            self._offsets.append(len(self._targets))
+
+            new_nodes = range(len(self._visits), self.graph.nodes_number)
+            self._visits.extend([self.walks_per_node] * len(new_nodes))
+            self._total_visits += self.walks_per_node * len(new_nodes)
+            for node_id in new_nodes:
+                for _ in range(self.walks_per_node):
+                    self._walk(node_id)
+            for _ in range(self._parked.pop(page_id, 0)):
+                self._walk(page_id, moving=True)
+
+    def _walk(self, node_id: int, moving: bool = False) -> None:
+        """
+        method continues a walk from a node it has visited, until it
+        stops or gets parked, must be called holding the lock
+
+        :param node_id: an id of the node
+        :param moving: True if the walk has already decided to leave
+        the node
+        :return: None
+        """
+        while moving or self._random() < self.damping:
+            moving = False
+            row = self._page_rows.get(node_id)
+            if row is None:
+                self._parked[node_id] = self._parked.get(node_id, 0) + 1
+                return
+            start, end = self._offsets[row], self._offsets[row + 1]
+            if start == end:
+                return
+            node_id = self._targets[
+                start + int(self._random() * (end - start))
+            ]
+            self._visits[node_id] += 1
+            self._total_visits += 1
+
+    def _estimate(self, node_id: int, visits: int) -> RankEstimate:
+        """
+        method turns visits of a node into an estimate, taking visits as
+        Poisson counts for the error bound, must be called holding the
+        lock
+
+        :param node_id: an id of the node
+        :param visits: a number of visits of the node
+        :return: a RankEstimate instance
+        """
+        return RankEstimate(
+            self.graph.url(node_id),
+            visits / self._total_visits,
+            self.confidence_z * visits**0.5 / self._total_visits,
+        )
+
+    def estimate(self, url: str) -> RankEstimate:
+        """
+        method returns a current rank estimate of a given URL
+
+        :param url: given URL
+        :return: a RankEstimate instance
+        :raises KeyError if the URL has no estimate yet
+        """
+        with self._lock:
+            node_id = self.graph.url_id(url)
+            if node_id >= len(self._visits):
+                raise KeyError(url)
+            return self._estimate(node_id, self._visits[node_id])
+
+    def current_top_k(self, k: int) -> List[RankEstimate]:
+        """
+        method returns current estimates of k highest ranked pages
+
+        :param k: a number of pages
+        :return: a list of RankEstimate instances in descending order
+        of scores
+        """
+        with self._lock:
+            visits = np.array(self._visits, dtype=np.int64)
+            if k < len(visits):
+                top = np.argpartition(visits, len(visits) - k)[-k:]
+            else:
+                top = np.arange(len(visits))
+            top = top[np.argsort(-visits[top], kind="stable")]
+            return [
+                self._estimate(int(node_id), int(visits[node_id]))
+                for node_id in top
+            ]
+
+    def is_top_k_separated(self, k: int) -> bool:
+        """
+        method checks if error bounds of the k highest ranked pages stay
+        above the error bound of the next page, so that the top k set
+        is unlikely to change with more walks on the current graph
+
+        :param k: a number of pages
+        :return: True if the top k set is separated
+        """
+        top = self.current_top_k(k + 1)
+        if len(top) <= k:
+            return bool(top)
+        return top[k - 1].score - top[k - 1].error > (
+            top[k].score + top[k].error
+        )
+
+
+if __name__ == "__main__":
+    pass
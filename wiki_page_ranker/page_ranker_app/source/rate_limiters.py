@@ -0,0 +1,213 @@
+"""
+Rate limiters that keep the crawler within an allowed request rate
+"""
+
+import asyncio
+import threading
+import time
+import urllib.parse
+
+from typing import Dict, Optional, Union
+
+from page_ranker_app import settings
+
+
+class TokenBucket:
+    """
+    a thread-safe token bucket, tokens are added at a given rate up to
+    a burst size and every request takes one token
+
+    A request that finds the bucket empty reserves a future token, so
+    waiting requests are served in order without polling; the same
+    bucket can be used by threads (acquire) and by coroutines
+    (acquire_async)
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        object constructor
+
+        :param rate: a number of tokens added per second
+        :param burst: a max number of tokens in the bucket
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1")
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._first_grant = None
+        self._last_grant = None
+        self._granted = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        getter for the rate of the bucket
+
+        :return: a number of tokens added per second
+        """
+        return self._rate
+
+    @property
+    def granted(self) -> int:
+        """
+        getter for a number of granted tokens
+
+        :return: a number of granted tokens
+        """
+        return self._granted
+
+    @property
+    def achieved_rate(self) -> float:
+        """
+        getter for a rate of granted tokens between the first and the
+        last grant
+
+        :return: a number of granted tokens per second
+        """
+        with self._lock:
+            if self._granted < 2 or self._last_grant <= self._first_grant:
+                return 0.0
+            spent_time = self._last_grant - self._first_grant
+            return (self._granted - 1) / spent_time
+
+    def reserve(self) -> float:
+        """
+        method takes a token, reserving a future one if the bucket is
+        empty
+
+        :return: a number of seconds to wait before the token is granted
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst,
+                self._tokens + (now - self._updated) * self._rate,
+            )
+            self._updated = now
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self._rate)
+
+            self._granted += 1
+            if self._first_grant is None:
+                self._first_grant = now
+            self._last_grant = max(self._last_grant or now, now + delay)
+            return delay
+
+    def acquire(self) -> None:
+        """
+        method blocks the calling thread until a token is granted
+
+        :return: None
+        """
+        time.sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        """
+        method waits on the event loop until a token is granted
+
+        :return: None
+        """
+        await asyncio.sleep(self.reserve())
+
+
+class RateLimiter:
+    """
+    a rate limiter that combines a global token bucket with a bucket
+    per host, a request waits until both grant a token
+    """
+
+    def __init__(
+        self,
+        rate: float = settings.MAX_REQUESTS_PER_SECOND,
+        burst: int = settings.RATE_LIMIT_BURST,
+        host_rate: Optional[float] = settings.MAX_HOST_REQUESTS_PER_SECOND,
+        host_burst: int = settings.RATE_LIMIT_BURST,
+    ):
+        """
+        object constructor
+
+        :param rate: a max number of requests per second in total
+        :param burst: a max number of requests made at once in total
+        :param host_rate: a max number of requests per second to one
+        host, hosts are not limited separately if None
+        :param host_burst: a max number of requests made at once to one
+        host
+        """
+        self._bucket = TokenBucket(rate, burst)
+        self._host_rate = host_rate
+        self._host_burst = host_burst
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        getter for limiter statistics: allowed and achieved request
+        rates and a number of granted requests
+
+        :return: a dictionary of statistics
+        """
+        return {
+            "allowed_rate": self._bucket.rate,
+            "achieved_rate": self._bucket.achieved_rate,
+            "granted_requests": self._bucket.granted,
+        }
+
+    def _host_bucket(self, url: str) -> Optional[TokenBucket]:
+        """
+        method returns a bucket for a host of given URL, creating it on
+        the first request to the host
+
+        :param url: given URL
+        :return: a TokenBucket instance or None if hosts are not limited
+        """
+        if self._host_rate is None:
+            return None
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            bucket = self._host_buckets.get(host)
+            if bucket is None:
+                bucket = self._host_buckets[host] = TokenBucket(
+                    self._host_rate, self._host_burst
+                )
+            return bucket
+
+    def _reserve(self, url: str) -> float:
+        """
+        method takes tokens from the global and the host buckets
+
+        :param url: a URL to be requested
+        :return: a number of seconds to wait before making the request
+        """
+        delay = self._bucket.reserve()
+        host_bucket = self._host_bucket(url)
+        if host_bucket is not None:
+            delay = max(delay, host_bucket.reserve())
+        return delay
+
+    def acquire(self, url: str) -> None:
+        """
+        method blocks the calling thread until a request to a given URL
+        is allowed
+
+        :param url: a URL to be requested
+        :return: None
+        """
+        time.sleep(self._reserve(url))
+
+    async def acquire_async(self, url: str) -> None:
+        """
+        method waits on the event loop until a request to a given URL
+        is allowed
+
+        :param url: a URL to be requested
+        :return: None
+        """
+        await asyncio.sleep(self._reserve(url))
+
+
+if __name__ == "__main__":
+    pass
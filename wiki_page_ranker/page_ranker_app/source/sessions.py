@@ -0,0 +1,125 @@
+"""
+HTTP sessions with connection pools sized for the crawler, that keep
+connections alive between requests of many workers
+"""
+
+import threading
+
+from typing import Any, Dict, Optional
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool
+
+from page_ranker_app import settings
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    an HTTP adapter that counts connections opened and requests made by
+    its connection pools, including pools dropped by the pool manager
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """
+        method creates the pool manager, making it add counters of
+        every pool it drops to counters of the adapter
+
+        :param args: positional arguments of HTTPAdapter method
+        :param kwargs: keyword arguments of HTTPAdapter method
+        :return: None
+        """
+        super().init_poolmanager(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._dropped_connections = 0
+        self._dropped_requests = 0
+        self.poolmanager.pools.dispose_func = self._dispose
+
+    def _dispose(self, pool: HTTPConnectionPool) -> None:
+        """
+        method counts and closes a pool dropped by the pool manager
+
+        :param pool: the dropped pool
+        :return: None
+        """
+        with self._lock:
+            self._dropped_connections += pool.num_connections
+            self._dropped_requests += pool.num_requests
+        pool.close()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for connection counters: opened connections, requests
+        sent over connections opened before (kept alive) and host pools
+
+        :return: a dictionary of counters
+        """
+        pools = self.poolmanager.pools
+        with self._lock:
+            connections = self._dropped_connections
+            requests = self._dropped_requests
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    requests += pool.num_requests
+        return {
+            "connections_opened": connections,
+            "connections_reused": max(0, requests - connections),
+            "connection_pools": len(pools),
+        }
+
+
+class PooledSession(Session):
+    """
+    a requests Session whose HTTP and HTTPS connection pools hold
+    a connection for every worker that shares the session, so that
+    connections are kept alive and reused instead of being opened for
+    a request and dropped because the pool is full
+
+    A number of connections to one host is capped by host_connections,
+    workers wait for a free connection once the cap is reached
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        host_connections: Optional[int] = settings.MAX_HOST_CONNECTIONS,
+        hosts: int = settings.CONNECTION_POOL_HOSTS,
+    ):
+        """
+        object constructor
+
+        :param max_connections: a number of workers sharing the session
+        :param host_connections: a max number of connections to one
+        host, not capped below max_connections if None
+        :param hosts: a number of hosts whose pools are kept
+        """
+        super().__init__()
+        if max_connections < 1 or hosts < 1:
+            raise ValueError("Connection and host numbers must be positive")
+        pool_size = max_connections
+        if host_connections is not None:
+            pool_size = min(pool_size, host_connections)
+        self.adapter = CountingHTTPAdapter(
+            pool_connections=hosts,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        self.mount("http://", self.adapter)
+        self.mount("https://", self.adapter)
+        self.headers["Connection"] = "keep-alive"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for connection counters of the session adapter
+
+        :return: a dictionary of counters
+        """
+        return self.adapter.stats
+
+
+if __name__ == "__main__":
+    pass
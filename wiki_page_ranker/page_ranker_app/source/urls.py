@@ -0,0 +1,184 @@
+"""
+Canonical forms of Wikipedia URLs, so that variants of a link to one
+page become a single graph node
+"""
+
+import functools
+import threading
+import urllib.parse
+
+from typing import Dict, List
+
+from page_ranker_app import settings
+
+# characters MediaWiki leaves unescaped in page URLs
+MEDIAWIKI_SAFE_CHARS = ";@$!*(),/~:"
+WIKI_PATH_PREFIX = "/wiki/"
+
+
+def canonical_title(title: str) -> str:
+    """
+    function applies MediaWiki title rules to a decoded page title:
+    spaces and underscores are the same character and the first letter
+    is uppercase
+
+    :param title: a decoded title
+    :return: a canonical title
+    """
+    title = title.replace(" ", "_").strip("_")
+    first = title[:1].upper()
+    if len(first) != 1:
+        return title
+    return first + title[1:]
+
+
+@functools.lru_cache(maxsize=settings.CANONICAL_URL_CACHE_SIZE)
+def canonical_url(href: str, base: str = "") -> str:
+    """
+    function resolves a link against a base URL and returns its
+    canonical form: the fragment is dropped, the host is lowercase,
+    the path is percent-encoded the way MediaWiki encodes it and page
+    titles follow MediaWiki title rules; results are memoized in
+    a bounded LRU cache, as the same popular links repeat on many pages
+
+    :param href: a link as it is written on a page
+    :param base: a URL the link is relative to
+    :return: a canonical URL
+    """
+    url = urllib.parse.urljoin(base, href.strip())
+    scheme, netloc, path, query, _ = urllib.parse.urlsplit(url)
+    path = urllib.parse.unquote(path)
+    if path.startswith(WIKI_PATH_PREFIX):
+        path = WIKI_PATH_PREFIX + canonical_title(
+            path[len(WIKI_PATH_PREFIX) :]
+        )
+    path = urllib.parse.quote(path, safe=MEDIAWIKI_SAFE_CHARS)
+    return urllib.parse.urlunsplit((scheme, netloc.lower(), path, query, ""))
+
+
+def url_title(url: str) -> str:
+    """
+    function returns a decoded page title of a wiki page URL
+
+    :param url: a URL of a page
+    :return: a page title with underscores for spaces
+    """
+    path = urllib.parse.urlsplit(url).path
+    return urllib.parse.unquote(path.removeprefix(WIKI_PATH_PREFIX))
+
+
+def title_href(title: str) -> str:
+    """
+    function returns a link to a page of a given title as it is written
+    on wiki pages
+
+    :param title: a decoded page title
+    :return: a link relative to the wiki host
+    """
+    return WIKI_PATH_PREFIX + urllib.parse.quote(
+        canonical_title(title), safe=MEDIAWIKI_SAFE_CHARS
+    )
+
+
+class RedirectMap:
+    """
+    a thread-safe map of canonical URLs known to redirect to canonical
+    URLs of their target pages, shared by crawlers that record
+    redirects they followed and by the scrapping code that rewrites
+    links to known redirects before they are queued
+
+    Lookups do not take the lock, as a single dictionary read is atomic
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._rewrites = 0
+        self._saved_fetches = 0
+        self._duplicate_fetches = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        getter for redirect counters: known redirects, links rewritten
+        to redirect targets, fetches saved as a page was already
+        recorded or queued under its target URL and fetches of
+        redirects to pages that were recorded already
+
+        :return: a dictionary of counters
+        """
+        with self._lock:
+            return {
+                "redirects": len(self._targets),
+                "redirect_rewrites": self._rewrites,
+                "redirect_fetches_saved": self._saved_fetches,
+                "redirect_duplicate_fetches": self._duplicate_fetches,
+            }
+
+    def add(self, url: str, final_url: str) -> bool:
+        """
+        method records that a request of a URL ended at a final URL,
+        nothing is recorded if the canonical final URL is the URL itself
+
+        :param url: a canonical requested URL
+        :param final_url: a URL of the final response
+        :return: True if a redirect was recorded
+        """
+        target = canonical_url(final_url)
+        if target == url:
+            return False
+        with self._lock:
+            self._targets[url] = target
+        return True
+
+    def resolve(self, url: str) -> str:
+        """
+        method returns a URL of the page a given URL redirects to
+
+        :param url: a canonical URL
+        :return: a canonical URL of the target, the URL itself if it is
+        not known to redirect
+        """
+        return self._targets.get(url, url)
+
+    def rewrite(self, links: List[str]) -> List[str]:
+        """
+        method replaces links to known redirects with their targets
+
+        :param links: canonical URLs
+        :return: a list of rewritten URLs
+        """
+        targets = self._targets
+        rewritten = [targets.get(link, link) for link in links]
+        rewrites = sum(
+            target != link for target, link in zip(rewritten, links)
+        )
+        if rewrites:
+            with self._lock:
+                self._rewrites += rewrites
+        return rewritten
+
+    def count_saved_fetches(self, number: int = 1) -> None:
+        """
+        method counts fetches that were not made thanks to known
+        redirects
+
+        :param number: a number of saved fetches
+        :return: None
+        """
+        with self._lock:
+            self._saved_fetches += number
+
+    def count_duplicate_fetch(self) -> None:
+        """
+        method counts a fetch of a redirect whose target page was
+        recorded before the redirect became known
+
+        :return: None
+        """
+        with self._lock:
+            self._duplicate_fetches += 1
+
+
+if __name__ == "__main__":
+    pass
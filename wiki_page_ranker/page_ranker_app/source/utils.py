@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import logging
 import math
@@ -13,6 +14,40 @@ from page_ranker_app import settings
 Exc_variants = Union[Type[Exception], tuple[Type[Exception]]]
 
 
+def _handle_error(
+    logger: logging.Logger,
+    func: Callable,
+    args: tuple,
+    exc: Exception,
+    tries_left: int,
+    re_raise: bool,
+    log_traceback: bool,
+) -> None:
+    """
+    A function logs an exception raised by a call of a decorated
+    function, after the last try it logs the traceback and re-raises
+    the exception if required
+
+    :param logger: a logger object for logging exceptions
+    :param func: the decorated function
+    :param args: positional arguments of the call
+    :param exc: the raised exception
+    :param tries_left: a number of tries left
+    :param re_raise: shows if the exception will be reraised
+    :param log_traceback: shows if traceback will be logged
+    :return: None
+    """
+    if tries_left:
+        logger.error(
+            f"Error: {exc} Retrying call of {func.__name__} with arguments: {args}"
+        )
+    else:
+        if log_traceback:
+            logger.error(traceback.format_exc())
+        if re_raise:
+            raise exc
+
+
 def handle_errors(
     logger: logging.Logger,
     re_raise: bool = settings.EXCEPTION_RE_RAISE,
@@ -22,7 +57,9 @@ def handle_errors(
     delay: Union[int, float] = settings.RETRY_DELAY,
 ) -> Callable:
     """
-    A decorator used to handle and log exceptions
+    A decorator used to handle and log exceptions, a coroutine function
+    is wrapped with a coroutine that waits between tries without
+    blocking the event loop
 
     :param logger: a logger object for logging exceptions
     :param re_raise: shows if Exceptions listed in exc_type will be
@@ -35,6 +72,9 @@ def handle_errors(
     :param delay: delay between tries in seconds
     :return: decorated function object
     """
+    func_tries = (
+        tries if type(tries) == int and tries > 0 else settings.MAX_RETRIES
+    )
 
     def decorator(func: Callable) -> Callable:
         """
@@ -55,29 +95,51 @@ def handle_errors(
             :return:
             """
             logger.info(f"Calling {func.__name__} with arguments: {args}")
-            func_delay = delay
-            func_tries = (
-                tries
-                if type(tries) == int and tries > 0
-                else settings.MAX_RETRIES
-            )
-
-            while func_tries:
-                func_tries -= 1
+            for tries_left in reversed(range(func_tries)):
                 try:
                     return func(*args, **kwargs)
                 except exc_type as exc:
-                    if func_tries:
-                        logger.error(
-                            f"Error: {exc} Retrying call of {func.__name__} with arguments: {args}"
-                        )
-                        time.sleep(func_delay)
-                    else:
-                        if log_traceback:
-                            logger.error(traceback.format_exc())
-                        if re_raise:
-                            raise exc
+                    _handle_error(
+                        logger,
+                        func,
+                        args,
+                        exc,
+                        tries_left,
+                        re_raise,
+                        log_traceback,
+                    )
+                if tries_left:
+                    time.sleep(delay)
 
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any):
+            """
+            a wrapper that implements the logics of handle_error
+            decorator for coroutine functions
+
+            :param args: any number of positional arguments
+            :param kwargs: any number of keyword arguments
+            :return:
+            """
+            logger.info(f"Calling {func.__name__} with arguments: {args}")
+            for tries_left in reversed(range(func_tries)):
+                try:
+                    return await func(*args, **kwargs)
+                except exc_type as exc:
+                    _handle_error(
+                        logger,
+                        func,
+                        args,
+                        exc,
+                        tries_left,
+                        re_raise,
+                        log_traceback,
+                    )
+                if tries_left:
+                    await asyncio.sleep(delay)
+
+        if asyncio.iscoroutinefunction(func):
+            return async_wrapper
         return wrapper
 
     return decorator
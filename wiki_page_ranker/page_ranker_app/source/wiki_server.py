@@ -0,0 +1,217 @@
+"""
+A local aiohttp stand-in for Wikipedia, that serves generated pages
+linking to each other, for tests and benchmarks of crawling engines
+"""
+
+import asyncio
+import contextlib
+import threading
+
+from typing import Iterator
+
+from aiohttp import web
+
+
+def page_links(page: int, pages_number: int, links_per_page: int) -> list:
+    """
+    function returns numbers of pages a given generated page links to
+
+    :param page: a number of the page
+    :param pages_number: a number of generated pages
+    :param links_per_page: a number of links on every page
+    :return: a list of page numbers
+    """
+    return [
+        (page * 7 + step + 1) % pages_number for step in range(links_per_page)
+    ]
+
+
+def make_wiki_app(
+    pages_number: int,
+    links_per_page: int,
+    redirects: bool = False,
+    api_links_limit: int = 500,
+    http_redirects: bool = False,
+) -> web.Application:
+    """
+    function creates an application serving pages /wiki/Page_<n> for
+    n from 0 to pages_number - 1, other URLs respond with 404 status;
+    pages have ETags and a request with a matching If-None-Match header
+    gets 304 status
+
+    As Wikipedia does, /wiki/Redirect_<n> is answered with 200 status and
+    the content of /wiki/Page_<n>, with a "(Redirected from ...)" marker,
+    and every page has a canonical link on its own URL; with
+    http_redirects, redirects are answered with 301 status instead
+
+    Links of the same pages are served by a MediaWiki API stand-in at
+    /w/api.php, that answers action=query&prop=links requests in
+    formatversion=2 form, with normalized titles, resolved redirects and
+    continuation after every api_links_limit links
+
+    :param pages_number: a number of generated pages
+    :param links_per_page: a number of links on every page
+    :param redirects: if True, every other link of a page points to
+    a redirect of the linked page
+    :param api_links_limit: a max number of links in an API response
+    :param http_redirects: if True, redirects are answered with 301 status
+    :return: an aiohttp application
+    """
+
+    def link_titles(page: int) -> list:
+        return [
+            f"{'Redirect' if redirects and step % 2 else 'Page'}_{link}"
+            for step, link in enumerate(
+                page_links(page, pages_number, links_per_page)
+            )
+        ]
+
+    def page_number(title: str):
+        number = title.removeprefix("Page_").removeprefix("Redirect_")
+        if number.isdigit() and int(number) < pages_number:
+            return int(number)
+
+    async def wiki_page(request: web.Request) -> web.Response:
+        title = request.match_info["title"]
+        number = page_number(title)
+        if number is None:
+            raise web.HTTPNotFound()
+        redirected = title.startswith("Redirect_")
+        if redirected and http_redirects:
+            raise web.HTTPMovedPermanently(f"/wiki/Page_{number}")
+        marker = (
+            '<span class="mw-redirectedfrom">(Redirected from <a href="'
+            f'/w/index.php?title={title}&amp;redirect=no">{title}</a>)</span>'
+            if redirected
+            else ""
+        )
+        etag = f'"{title}"'
+        if request.headers.get("If-None-Match") == etag:
+            raise web.HTTPNotModified(headers={"ETag": etag})
+        anchors = "".join(
+            f'<li><a href="/wiki/{link}">{link}</a></li>'
+            for link in link_titles(number)
+        )
+        return web.Response(
+            text=f'<html><head><link rel="canonical" href="'
+            f'{request.scheme}://{request.host}/wiki/Page_{number}"></head>'
+            f"<body><h1>Page_{number}</h1>{marker}<ul>{anchors}</ul>"
+            '<div class="printfooter"></div>'
+            f'<a href="/wiki/Special:Random">Random</a></body></html>',
+            content_type="text/html",
+            headers={"ETag": etag},
+        )
+
+    async def api(request: web.Request) -> web.Response:
+        query = request.query
+        titles = query.get("titles", "").split("|")
+        if query.get("action") != "query" or query.get("prop") != "links":
+            return web.json_response({"error": {"code": "badvalue"}})
+        if len(titles) > 50:
+            return web.json_response({"error": {"code": "toomanyvalues"}})
+
+        normalized, resolved, pages = [], [], {}
+        for title in titles:
+            name = title.replace("_", " ")
+            if name != title:
+                normalized.append({"from": title, "to": name})
+            number = page_number(title.replace(" ", "_"))
+            if name.startswith("Redirect ") and number is not None:
+                resolved.append({"from": name, "to": f"Page {number}"})
+                name = f"Page {number}"
+            pages[name] = number
+
+        links = [
+            (number + 1, link.replace("_", " "))
+            for number in sorted(set(pages.values()) - {None})
+            for link in sorted(link_titles(number))
+        ]
+        start = 0
+        if "plcontinue" in query:
+            page_id, _, title = query["plcontinue"].split("|", 2)
+            start = links.index((int(page_id), title))
+        limit = min(int(query.get("pllimit", "10").replace("max", "500")), 500)
+        chunk = links[start : start + min(limit, api_links_limit)]
+
+        body = {"batchcomplete": True}
+        if start + len(chunk) < len(links):
+            page_id, title = links[start + len(chunk)]
+            body = {
+                "continue": {
+                    "plcontinue": f"{page_id}|0|{title}",
+                    "continue": "||",
+                }
+            }
+        body["query"] = {
+            "normalized": normalized,
+            "redirects": resolved,
+            "pages": [
+                (
+                    {"ns": 0, "title": name, "missing": True}
+                    if number is None
+                    else {
+                        "pageid": number + 1,
+                        "ns": 0,
+                        "title": name,
+                        "links": [
+                            {"ns": 0, "title": title}
+                            for page_id, title in chunk
+                            if page_id == number + 1
+                        ],
+                    }
+                )
+                for name, number in pages.items()
+            ],
+        }
+        return web.json_response(body)
+
+    app = web.Application()
+    app.router.add_get("/wiki/{title}", wiki_page)
+    app.router.add_get("/w/api.php", api)
+    return app
+
+
+@contextlib.contextmanager
+def running_wiki_server(
+    pages_number: int = 30,
+    links_per_page: int = 5,
+    redirects: bool = False,
+    api_links_limit: int = 500,
+    http_redirects: bool = False,
+) -> Iterator[str]:
+    """
+    context manager that runs a stand-in server on a free local port in
+    a background thread and yields its base URL
+
+    :param pages_number: a number of generated pages
+    :param links_per_page: a number of links on every page
+    :param redirects: if True, every other link of a page points to
+    a redirect of the linked page
+    :param api_links_limit: a max number of links in an API response
+    :param http_redirects: if True, redirects are answered with 301 status
+    :return: an iterator yielding a base URL of the server
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(
+        make_wiki_app(
+            pages_number,
+            links_per_page,
+            redirects,
+            api_links_limit,
+            http_redirects,
+        )
+    )
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
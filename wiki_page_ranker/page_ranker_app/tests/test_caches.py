@@ -0,0 +1,113 @@
+import os
+import time
+
+from page_ranker_app.source.caches import CachedResponse, ResponseCache
+
+
+def test_response_cache_put_get(tmp_path):
+    cache = ResponseCache(tmp_path)
+    assert cache.get("https://en.wikipedia.org/wiki/A") is None
+
+    cache.put("https://en.wikipedia.org/wiki/A", "body of A", '"a1"')
+    entry = cache.get("https://en.wikipedia.org/wiki/A")
+    assert entry.body == "body of A"
+    assert entry.etag == '"a1"'
+    assert entry.last_modified is None
+    assert cache.is_fresh(entry)
+    assert entry.validators == {"If-None-Match": '"a1"'}
+
+    stats = cache.stats
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+    assert stats["cache_stores"] == 1
+    assert stats["cache_entries"] == 1
+    assert 0 < stats["cache_size"] < len("body of A") + 200
+
+
+def test_response_cache_persists_between_instances(tmp_path):
+    ResponseCache(tmp_path).put("url", "body", last_modified="yesterday")
+
+    cache = ResponseCache(tmp_path)
+    assert cache.stats["cache_entries"] == 1
+    assert cache.get("url").validators == {"If-Modified-Since": "yesterday"}
+
+
+def test_response_cache_stale_entries(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0)
+    cache.put("validated", "body", '"v1"')
+    cache.put("unvalidated", "body")
+
+    entry = cache.get("validated")
+    assert entry is not None and not cache.is_fresh(entry)
+    assert cache.get("unvalidated") is None
+    assert cache.stats["cache_evictions"] == 1
+
+    refreshed = cache.refresh(entry)
+    assert refreshed.stored_at >= entry.stored_at
+    assert refreshed.body == "body"
+    assert cache.stats["cache_revalidations"] == 1
+
+
+def test_response_cache_refresh_keeps_entry_file(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.put("url", "body", '"v1"')
+    (path,) = tmp_path.glob("*/*")
+    data = path.read_bytes()
+    os.utime(path, (0, 0))
+
+    entry = cache.get("url")
+    assert entry.stored_at == 0 and not cache.is_fresh(entry)
+    refreshed = cache.refresh(entry)
+    assert path.read_bytes() == data
+    assert cache.is_fresh(refreshed)
+    assert cache.is_fresh(ResponseCache(tmp_path, ttl=60).get("url"))
+
+
+def test_response_cache_removes_temporary_files(tmp_path):
+    ResponseCache(tmp_path).put("url", "body")
+    (path,) = tmp_path.glob("*/*")
+    temp_path = path.with_name(f"{path.name}.0123.tmp")
+    temp_path.write_bytes(b"interrupted write")
+
+    cache = ResponseCache(tmp_path)
+    assert not temp_path.exists()
+    assert cache.stats["cache_entries"] == 1
+    assert cache.stats["cache_size"] == path.stat().st_size
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    body = os.urandom(1000).hex()
+    probe = ResponseCache(tmp_path / "probe")
+    probe.put("a", body)
+    entry_size = probe.stats["cache_size"]
+
+    cache = ResponseCache(tmp_path / "cache", max_size=3 * entry_size + 16)
+    for url in ("a", "b", "c"):
+        cache.put(url, body)
+    assert cache.get("a") is not None
+
+    cache.put("d", body)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats["cache_size"] <= 3 * entry_size + 16
+    entry_files = list((tmp_path / "cache").glob("*/*"))
+    assert len(entry_files) == cache.stats["cache_entries"] == 3
+
+
+def test_response_cache_drops_corrupted_entries(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("url", "body")
+    (path,) = tmp_path.glob("*/*")
+    path.write_bytes(b"not a cache entry")
+
+    assert cache.get("url") is None
+    assert cache.stats["cache_entries"] == 0
+    assert not path.exists()
+
+
+def test_cached_response_validators():
+    entry = CachedResponse("url", "body", '"e"', "date", time.time())
+    assert entry.validators == {
+        "If-None-Match": '"e"',
+        "If-Modified-Since": "date",
+    }
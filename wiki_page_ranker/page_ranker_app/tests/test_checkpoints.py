@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from page_ranker_app.source.checkpoints import CrawlCheckpoint
+
+
+def test_crawl_checkpoint_record_and_load(tmp_path):
+    path = tmp_path / "crawl.jsonl"
+    checkpoint = CrawlCheckpoint(path, interval=0.01)
+    checkpoint.open("a", 10)
+    checkpoint.record("a", ["b", "c"])
+    checkpoint.record("b", ["a"])
+    checkpoint.close()
+
+    header, pages = CrawlCheckpoint.load(path)
+    assert header == {"start_url": "a", "page_limit": 10}
+    assert list(pages) == [("a", ["b", "c"]), ("b", ["a"])]
+    assert checkpoint.stats["checkpoint_records"] == 2
+    assert checkpoint.stats["checkpoint_pending"] == 0
+
+
+def test_crawl_checkpoint_appends_after_partial_record(tmp_path):
+    path = tmp_path / "crawl.jsonl"
+    path.write_text(
+        json.dumps({"start_url": "a", "page_limit": 3})
+        + "\n"
+        + json.dumps(["a", ["b"]])
+        + '\n["b", ["c"'
+    )
+    assert list(CrawlCheckpoint.load(path)[1]) == [("a", ["b"])]
+
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.open("a", 3, append=True)
+    checkpoint.record("b", ["c"])
+    checkpoint.close()
+
+    header, pages = CrawlCheckpoint.load(path)
+    assert header["start_url"] == "a"
+    assert list(pages) == [("a", ["b"]), ("b", ["c"])]
+
+
+def test_crawl_checkpoint_refuses_foreign_journal(tmp_path):
+    path = tmp_path / "crawl.jsonl"
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.open("a", 3)
+    checkpoint.record("a", ["b"])
+    checkpoint.close()
+
+    with pytest.raises(ValueError, match="already exists"):
+        CrawlCheckpoint(path).open("a", 3)
+    with pytest.raises(ValueError, match="another crawl"):
+        CrawlCheckpoint(path).open("b", 3, append=True)
+    with pytest.raises(ValueError, match="another crawl"):
+        CrawlCheckpoint(path).open("a", 5, append=True)
+    assert list(CrawlCheckpoint.load(path)[1]) == [("a", ["b"])]
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from page_ranker_app.source import concurrency
+
+
+def make_controller(**kwargs):
+    options = {"initial_limit": 10, "max_limit": 100, "window": 10}
+    options.update(kwargs)
+    return concurrency.AdaptiveConcurrencyController(**options)
+
+
+def test_controller_increases_limit_when_healthy():
+    controller = make_controller()
+    for _ in range(30):
+        controller.record(0.1, 200)
+    assert controller.limit == 13
+    assert controller.stats["concurrency_increases"] == 3
+    assert controller.stats["latency_p95"] == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("status", [429, 500, 503, None])
+def test_controller_decreases_limit_on_throttling_and_errors(status):
+    controller = make_controller()
+    for _ in range(9):
+        controller.record(0.1, 200)
+    controller.record(0.1, status)
+    assert controller.limit == 5
+    assert controller.stats["concurrency_decreases"] == 1
+
+
+def test_controller_decreases_limit_on_latency_growth():
+    controller = make_controller()
+    for _ in range(10):
+        controller.record(0.1, 200)
+    for _ in range(10):
+        controller.record(1.0, 200)
+    assert controller.limit == 5
+    assert controller.stats["baseline_latency"] == pytest.approx(0.1)
+
+
+def test_controller_keeps_limit_within_bounds():
+    controller = make_controller(initial_limit=2, min_limit=2, max_limit=3)
+    for _ in range(50):
+        controller.record(0.1, 200)
+    assert controller.limit == 3
+    for _ in range(50):
+        controller.record(0.1, 429)
+    assert controller.limit == 2
+
+
+def test_controller_acquire_waits_for_free_slot():
+    controller = make_controller(initial_limit=1)
+    controller.acquire()
+    acquired = threading.Event()
+
+    def waiter():
+        controller.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(timeout=0.1)
+    controller.release()
+    assert acquired.wait(timeout=5)
+    thread.join()
+    assert controller.in_flight == 1
+
+
+def test_controller_invalid_limits():
+    with pytest.raises(ValueError):
+        make_controller(min_limit=5, max_limit=2)
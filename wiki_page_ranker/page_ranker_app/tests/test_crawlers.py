@@ -1,15 +1,29 @@
 import pytest
 
 from functools import wraps
-from requests import HTTPError
+from requests import HTTPError, Session
 from unittest import mock
 
 from page_ranker_app import settings
+from page_ranker_app.source.utils import handle_errors
 from page_ranker_app.source.utils import mock_decorator as mock_deco
 
 mock.patch("page_ranker_app.source.utils.handle_errors", mock_deco).start()
 
-from page_ranker_app.source.crawlers import WikiCrawler
+import asyncio
+
+import aiohttp
+
+from page_ranker_app.source.caches import ResponseCache
+from page_ranker_app.source.loggers import crawler_logger
+from page_ranker_app.source.crawlers import (
+    AsyncWikiCrawler,
+    MediaWikiApiCrawler,
+    StreamingWikiCrawler,
+    WikiCrawler,
+)
+from page_ranker_app.source.urls import RedirectMap
+from page_ranker_app.source.wiki_server import running_wiki_server
 
 code_assets = [
     (
@@ -40,6 +54,19 @@ def test_wiki_crawler_call_text(response_code, response_text, expected):
         assert crawler(url, mock_session) == expected
 
 
+def test_wiki_crawler_call_reports_to_observer():
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 429
+    observer = mock.MagicMock()
+
+    crawler = WikiCrawler(observer=observer)
+    with pytest.raises(HTTPError):
+        crawler("someurl", mock_session)
+    latency, status = observer.call_args.args
+    assert latency >= 0
+    assert status == 429
+
+
 code_assets_exception = [
     500,
     305,
@@ -59,3 +86,246 @@ def test_wiki_crawler_call_exceptions(response_code):
     crawler = WikiCrawler()
     with mock_session, pytest.raises(HTTPError):
         crawler(url, mock_session)
+
+
+async_assets = [
+    ("/wiki/Page_3", '<a href="/wiki/Page_22">'),
+    ("/wiki/Page_300", settings.NOT_SET),
+]
+
+
+@pytest.mark.parametrize("path, expected", async_assets)
+def test_async_wiki_crawler_fetch(path, expected):
+    async def fetch(url):
+        async with aiohttp.ClientSession() as session:
+            return await AsyncWikiCrawler()(url, session)
+
+    with running_wiki_server() as base_url:
+        result = asyncio.run(fetch(base_url + path))
+    if isinstance(expected, str):
+        assert expected in result
+    else:
+        assert result == expected
+
+
+def test_wiki_crawler_call_uses_cache(tmp_path):
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.text = "fresh text"
+    mock_session.get.return_value.headers = {"ETag": '"v1"'}
+
+    crawler = WikiCrawler(cache=ResponseCache(tmp_path))
+    assert crawler("someurl", mock_session) == "fresh text"
+    assert crawler("someurl", mock_session) == "fresh text"
+    assert mock_session.get.call_count == 1
+
+
+def test_wiki_crawler_call_revalidates_stale_cache(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0)
+    cache.put("someurl", "cached text", '"v1"')
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 304
+
+    crawler = WikiCrawler(cache=cache)
+    assert crawler("someurl", mock_session) == "cached text"
+    headers = mock_session.get.call_args.kwargs["headers"]
+    assert headers == {"If-None-Match": '"v1"'}
+    assert cache.stats["cache_revalidations"] == 1
+
+
+def test_wiki_crawler_call_records_redirect(tmp_path):
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.text = "target text"
+    mock_session.get.return_value.url = "https://en.wikipedia.org/wiki/B#c"
+    mock_session.get.return_value.headers = {}
+    redirects, cache = RedirectMap(), ResponseCache(tmp_path)
+
+    crawler = WikiCrawler(cache=cache, redirects=redirects)
+    alias = "https://en.wikipedia.org/wiki/A"
+    assert crawler(alias, mock_session) == "target text"
+    assert redirects.resolve(alias) == "https://en.wikipedia.org/wiki/B"
+    assert cache.get("https://en.wikipedia.org/wiki/B").body == "target text"
+    assert crawler(alias, mock_session) == "target text"
+    assert mock_session.get.call_count == 1
+
+
+def test_wiki_crawler_call_records_canonical_redirect(tmp_path):
+    body = (
+        '<html><head><link rel="canonical" '
+        'href="https://en.wikipedia.org/wiki/B"></head></html>'
+    )
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.text = body
+    mock_session.get.return_value.url = "https://en.wikipedia.org/wiki/A"
+    mock_session.get.return_value.headers = {}
+    alias = "https://en.wikipedia.org/wiki/A"
+
+    for crawler_class in (WikiCrawler, StreamingWikiCrawler):
+        redirects = RedirectMap()
+        crawler = crawler_class(
+            cache=ResponseCache(tmp_path), redirects=redirects
+        )
+        crawler(alias, mock_session)
+        assert redirects.resolve(alias) == "https://en.wikipedia.org/wiki/B"
+
+        # a cached body of the alias tells its target too
+        redirects = RedirectMap()
+        crawler = crawler_class(
+            cache=ResponseCache(tmp_path), redirects=redirects
+        )
+        crawler(alias, mock_session)
+        assert redirects.resolve(alias) == "https://en.wikipedia.org/wiki/B"
+    assert mock_session.get.call_count == 1
+
+
+@pytest.mark.parametrize("http_redirects", [False, True])
+def test_async_wiki_crawler_fetch_records_redirect(http_redirects):
+    redirects = RedirectMap()
+
+    async def fetch(url):
+        async with aiohttp.ClientSession() as session:
+            return await AsyncWikiCrawler(redirects=redirects)(url, session)
+
+    with running_wiki_server(http_redirects=http_redirects) as base_url:
+        asyncio.run(fetch(base_url + "/wiki/Redirect_3"))
+        asyncio.run(fetch(base_url + "/wiki/Page_4"))
+    assert redirects.stats["redirects"] == 1
+    assert redirects.resolve(base_url + "/wiki/Redirect_3") == (
+        base_url + "/wiki/Page_3"
+    )
+
+
+@pytest.mark.parametrize("ttl", [3600, 0])
+def test_async_wiki_crawler_fetch_uses_cache(tmp_path, ttl):
+    cache = ResponseCache(tmp_path, ttl=ttl)
+
+    async def fetch(url):
+        async with aiohttp.ClientSession() as session:
+            crawler = AsyncWikiCrawler(cache=cache)
+            return [await crawler(url, session) for _ in range(2)]
+
+    with running_wiki_server() as base_url:
+        first, second = asyncio.run(fetch(base_url + "/wiki/Page_1"))
+    assert first == second
+    assert cache.stats["cache_stores"] == 1
+    assert cache.stats["cache_revalidations"] == (0 if ttl else 1)
+
+
+def test_streaming_wiki_crawler_stops_at_main_content_end():
+    chunks = iter(
+        [
+            b'<a href="/wiki/A">a</a><a hr',
+            b'ef="/wiki/B">b</a><div class="print',
+            b'footer"><a href="/wiki/Footer">f</a>',
+            b"never read",
+        ]
+    )
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.encoding = "utf-8"
+    mock_session.get.return_value.iter_content.return_value = chunks
+
+    crawler = StreamingWikiCrawler()
+    assert crawler("someurl", mock_session) == ["/wiki/A", "/wiki/B"]
+    assert mock_session.get.call_args.kwargs["stream"]
+    assert next(chunks) == b"never read"
+    mock_session.get.return_value.close.assert_called_once()
+
+
+def test_streaming_wiki_crawler_caps_body_size():
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.encoding = None
+    mock_session.get.return_value.iter_content.return_value = [
+        '<a href="/wiki/Zürich">z</a>'.encode(),
+        b'<a href="/wiki/Cut">c</a>',
+    ]
+
+    crawler = StreamingWikiCrawler(max_body_size=40)
+    assert crawler("someurl", mock_session) == ["/wiki/Zürich"]
+
+
+@pytest.mark.parametrize(
+    "chunks, stored",
+    [
+        ([b'<a href="/wiki/A">a</a>', b'<a href="/wiki/B">b</a>'], True),
+        ([b'<a href="/wiki/A">a</a><div class="printfooter">'], False),
+    ],
+)
+def test_streaming_wiki_crawler_caches_complete_bodies(
+    tmp_path, chunks, stored
+):
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.encoding = "utf-8"
+    mock_session.get.return_value.headers = {}
+    mock_session.get.return_value.iter_content.return_value = chunks
+    cache = ResponseCache(tmp_path)
+
+    crawler = StreamingWikiCrawler(cache=cache)
+    links = crawler("someurl", mock_session)
+    entry = cache.get("someurl")
+    assert (entry is not None) == stored
+    if stored:
+        assert entry.body == b"".join(chunks).decode()
+        assert crawler("someurl", mock_session) == links
+        assert mock_session.get.call_count == 1
+
+
+def test_mediawiki_api_crawler_follows_continuation():
+    with running_wiki_server(api_links_limit=3) as base_url, Session() as s:
+        crawler = MediaWikiApiCrawler()
+        urls = [f"{base_url}/wiki/Page_{page}" for page in (1, 2, 40)]
+        responses = crawler(urls, s)
+
+    assert len(responses) == 4
+    assert "continue" not in responses[-1]
+    assert responses[0]["query"]["normalized"][0] == {
+        "from": "Page_1",
+        "to": "Page 1",
+    }
+    links = [
+        link["title"]
+        for response in responses
+        for page in response["query"]["pages"]
+        for link in page.get("links", ())
+    ]
+    assert len(links) == 10
+
+
+def test_mediawiki_api_crawler_retries_single_requests():
+    first = mock.MagicMock(status_code=200)
+    last = mock.MagicMock(status_code=200)
+    first.json.return_value = {"continue": {"plcontinue": "1|0|B"}}
+    last.json.return_value = {"batchcomplete": True}
+    mock_session = mock.MagicMock()
+    mock_session.get.side_effect = [first, ConnectionError("reset"), last]
+    retrying = handle_errors(logger=crawler_logger, tries=2, delay=0)(
+        MediaWikiApiCrawler._request
+    )
+
+    with mock.patch.object(MediaWikiApiCrawler, "_request", retrying):
+        responses = MediaWikiApiCrawler()(
+            ["https://en.wikipedia.org/wiki/A"], mock_session
+        )
+
+    assert responses == [first.json.return_value, last.json.return_value]
+    assert mock_session.get.call_count == 3
+    retried, resumed = mock_session.get.call_args_list[1:]
+    assert retried.kwargs["params"]["plcontinue"] == "1|0|B"
+    assert resumed.kwargs["params"] == retried.kwargs["params"]
+
+
+def test_mediawiki_api_crawler_raises_api_errors():
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.json.return_value = {
+        "error": {"code": "maxlag"}
+    }
+
+    with pytest.raises(HTTPError):
+        MediaWikiApiCrawler()(
+            ["https://en.wikipedia.org/wiki/A"], mock_session
+        )
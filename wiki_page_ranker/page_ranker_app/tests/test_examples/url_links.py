@@ -88,7 +88,7 @@ processed_links = {
         "https://en.wikipedia.org/wiki/Social_enterprise",
         "https://en.wikipedia.org/wiki/Prisoner%27s_rights",
         "https://en.wikipedia.org/wiki/Advocacy",
-        "https://en.wikipedia.org/wiki/Royal_Commission#New_South_Wales",
+        "https://en.wikipedia.org/wiki/Royal_Commission",
         "https://en.wikipedia.org/wiki/Prison_reform",
         "https://en.wikipedia.org/wiki/Mental_health",
         "https://en.wikipedia.org/wiki/Human_rights",
@@ -0,0 +1,126 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from page_ranker_app.source import frontiers
+
+
+def test_url_frontier_queues_each_url_once():
+    frontier = frontiers.UrlFrontier(["a", "b"])
+    assert frontier.add(["b", "c", "a", "c", "d"]) == 2
+    assert list(frontier) == ["a", "b", "c", "d"]
+    assert frontier.seen_number == 4
+    assert frontier.stats["duplicate_urls"] == 3
+    assert "c" in frontier
+    assert "e" not in frontier
+
+
+def test_url_frontier_try_claim_commit_and_release():
+    frontier = frontiers.UrlFrontier(["a", "b"])
+    assert frontier.try_claim() == "a"
+    assert frontier.try_claim() == "b"
+    assert frontier.try_claim() is None
+    assert frontier.in_progress == 2
+    frontier.commit("a")
+    frontier.release("b")
+    stats = frontier.stats
+    assert (stats["in_progress"], stats["committed"]) == (0, 1)
+    assert stats["wasted_requests"] == 1
+
+
+def test_url_frontier_release_without_request():
+    frontier = frontiers.UrlFrontier(["a"])
+    frontier.release(frontier.claim(), wasted=False)
+    assert frontier.in_progress == 0
+    assert frontier.stats["wasted_requests"] == 0
+
+
+def test_url_frontier_claim_returns_none_when_exhausted():
+    frontier = frontiers.UrlFrontier(["a"])
+    assert frontier.claim() == "a"
+    frontier.commit("a")
+    assert frontier.claim() is None
+
+
+def test_url_frontier_reserves_page_limit():
+    frontier = frontiers.UrlFrontier(["a", "b", "c"], page_limit=2)
+    assert frontier.try_claim() == "a"
+    assert frontier.try_claim() == "b"
+    assert frontier.try_claim() is None
+    frontier.release("a")
+    assert frontier.try_claim() == "c"
+    frontier.commit("b")
+    frontier.commit("c")
+    assert frontier.claim() is None
+    assert frontier.committed == 2
+
+
+def test_url_frontier_claim_waits_for_urls_in_progress():
+    frontier = frontiers.UrlFrontier(["a"])
+    assert frontier.claim() == "a"
+    taken = []
+    waiter = threading.Thread(target=lambda: taken.append(frontier.claim()))
+    waiter.start()
+    frontier.add(["b"])
+    frontier.commit("a")
+    waiter.join(timeout=5)
+    assert taken == ["b"]
+
+
+def test_url_frontier_claim_waits_for_released_slot():
+    frontier = frontiers.UrlFrontier(["a", "b"], page_limit=1)
+    assert frontier.claim() == "a"
+    taken = []
+    waiter = threading.Thread(target=lambda: taken.append(frontier.claim()))
+    waiter.start()
+    frontier.release("a")
+    waiter.join(timeout=5)
+    assert taken == ["b"]
+
+
+def test_url_frontier_close_wakes_waiting_workers():
+    frontier = frontiers.UrlFrontier(["a"])
+    frontier.claim()
+    taken = []
+    waiter = threading.Thread(target=lambda: taken.append(frontier.claim()))
+    waiter.start()
+    frontier.close()
+    waiter.join(timeout=5)
+    assert taken == [None]
+    assert frontier.try_claim() is None
+
+
+def test_url_frontier_claims_each_url_once_under_contention():
+    urls = [f"url{number}" for number in range(1000)]
+    frontier = frontiers.UrlFrontier(urls, page_limit=600)
+    claimed = []
+
+    def worker():
+        while (url := frontier.claim()) is not None:
+            claimed.append(url)
+            if url.endswith("7"):
+                frontier.release(url)
+            else:
+                frontier.commit(url)
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        for _ in range(20):
+            executor.submit(worker)
+
+    assert len(claimed) == len(set(claimed))
+    assert frontier.committed == 600
+    assert frontier.stats["wasted_requests"] == len(claimed) - 600
+
+
+def test_url_frontier_never_queues_seen_urls():
+    frontier = frontiers.UrlFrontier(["b", "a"], seen=["a"])
+    assert list(frontier) == ["b"]
+    assert frontier.add(["a", "c"]) == 1
+    assert "a" in frontier
+
+
+def test_url_frontier_mark_seen_does_not_queue():
+    frontier = frontiers.UrlFrontier(["a"])
+    assert frontier.mark_seen(["a", "b"]) == 1
+    assert frontier.add(["b", "c"]) == 1
+    assert list(frontier) == ["a", "c"]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from page_ranker_app.source import graph_files, rank_engines
+
+graph_assets = [
+    {},
+    {"a": ["b"], "b": ["a"]},
+    {"Ärger": ["a", "Ωmega", "a"], "a": ["https://x/wiki/Ä_(b)"]},
+]
+
+
+@pytest.mark.parametrize("page_links", graph_assets)
+def test_link_matrix_file_round_trip(tmp_path, page_links):
+    matrix = rank_engines.LinkMatrix.from_page_links(page_links)
+    graph_files.save_link_matrix(matrix, tmp_path / "graph.bin")
+    loaded = graph_files.open_link_matrix(tmp_path / "graph.bin")
+
+    assert list(loaded.urls) == list(matrix.urls)
+    assert [loaded.urls[i] for i in range(len(loaded.urls))] == matrix.urls
+    assert loaded.urls[-1:] == matrix.urls[-1:]
+    np.testing.assert_array_equal(loaded.indptr, matrix.indptr)
+    np.testing.assert_array_equal(loaded.indices, matrix.indices)
+    np.testing.assert_array_equal(loaded.out_degree, matrix.out_degree)
+    assert isinstance(loaded.indptr, np.memmap)
+    assert not (tmp_path / "graph.bin.tmp").exists()
+
+
+def test_rank_from_link_matrix_file(tmp_path):
+    page_links = {"a": ["b", "c"], "b": ["c"], "c": ["a"], "d": ["c", "e"]}
+    graph_files.save_link_matrix(
+        rank_engines.LinkMatrix.from_page_links(page_links),
+        tmp_path / "graph.bin",
+    )
+    engine = rank_engines.PowerIterationRankEngine()
+    result = engine.rank(graph_files.open_link_matrix(tmp_path / "graph.bin"))
+    expected = engine.rank(page_links)
+    assert result.iterations == expected.iterations
+    assert result.scores == pytest.approx(expected.scores)
+
+
+def test_open_link_matrix_rejects_other_files(tmp_path):
+    (tmp_path / "graph.bin").write_bytes(b"\0" * 100)
+    with pytest.raises(ValueError):
+        graph_files.open_link_matrix(tmp_path / "graph.bin")
+
+
+def test_url_table_index_errors(tmp_path):
+    matrix = rank_engines.LinkMatrix.from_page_links({"a": ["b"]})
+    graph_files.save_link_matrix(matrix, tmp_path / "graph.bin")
+    urls = graph_files.open_link_matrix(tmp_path / "graph.bin").urls
+    assert urls[-2] == "a"
+    with pytest.raises(IndexError):
+        urls[2]
@@ -0,0 +1,95 @@
+import pytest
+
+from page_ranker_app.source import graphs
+
+page_links_assets = [
+    {"a": ["url1"], "b": ["url3", "url5"], "c": ["url4"]},
+    {"a": ["url1", "url2"], "b": ["url3", "url4"], "c": ["url4"]},
+    {"a": ["b", "b"], "b": [], "c": ["a", "c"]},
+]
+
+
+@pytest.mark.parametrize("page_links", page_links_assets)
+def test_url_graph_behaves_as_dictionary(page_links):
+    graph = graphs.UrlGraph.from_mapping(page_links)
+    assert len(graph) == len(page_links)
+    assert list(graph) == list(page_links)
+    assert dict(graph.items()) == page_links
+
+
+def test_url_graph_interns_urls_once():
+    graph = graphs.UrlGraph.from_mapping(page_links_assets[1])
+    assert graph.urls == ["a", "url1", "url2", "b", "url3", "url4", "c"]
+    assert graph.nodes_number == 7
+    assert graph.edges_number == 5
+    assert graph.url_id("url4") == 5
+    assert graph.url(5) == "url4"
+    assert graph.links_of(graph.url_id("b")).tolist() == [4, 5]
+
+
+def test_url_graph_contains_only_crawled_pages():
+    graph = graphs.UrlGraph.from_mapping(page_links_assets[0])
+    assert "a" in graph
+    assert "url1" not in graph
+    assert "unknown" not in graph
+    with pytest.raises(KeyError):
+        graph["url1"]
+
+
+def test_url_graph_add_page_twice():
+    graph = graphs.UrlGraph()
+    graph.add_page("a", ["b"])
+    with pytest.raises(ValueError):
+        graph.add_page("a", ["c"])
+
+
+def test_url_graph_edge_arrays():
+    graph = graphs.UrlGraph.from_mapping(page_links_assets[2])
+    sources, targets = graph.edge_arrays()
+    assert sources.tolist() == [0, 0, 2, 2]
+    assert targets.tolist() == [1, 1, 0, 2]
+    graph.add_page("d", ["a"])
+    assert graph.edge_arrays()[1].tolist() == [1, 1, 0, 2, 0]
+
+
+def test_in_link_index_dedupes_links_of_a_page():
+    graph = graphs.UrlGraph()
+    index = graphs.InLinkIndex(graph)
+    assert index.add_page(graph.add_page("a", ["b", "c", "b"])) == 2
+    assert index.add_page(graph.add_page("b", ["c", "a"])) == 2
+
+    assert index.pages_number == 2
+    assert index.edges_number == 4
+    assert index.in_degree("c") == 2
+    assert index.in_degree("b") == 1
+    assert index.in_degree("unknown") == 0
+    assert index.in_degrees() == {"a": 1, "b": 1, "c": 2}
+
+
+def test_in_link_index_csr_arrays():
+    graph = graphs.UrlGraph()
+    index = graphs.InLinkIndex(graph)
+    index.add_page(graph.add_page("a", ["b", "c", "b"]))
+    index.add_page(graph.add_page("c", ["a"]))
+    graph.intern("not_indexed_yet")
+
+    indptr, indices, out_degree = index.csr_arrays()
+    assert indptr.tolist() == [0, 1, 2, 3, 3]
+    assert indices.tolist() == [2, 0, 0]
+    assert out_degree.tolist() == [2, 0, 1, 0]
+
+
+def test_in_link_index_out_csr_arrays():
+    graph = graphs.UrlGraph()
+    index = graphs.InLinkIndex(graph)
+    index.add_page(graph.add_page("c", ["a", "b", "a"]))
+    index.add_page(graph.add_page("a", ["c"]))
+    index.add_page(graph.add_page("b", []))
+    graph.intern("not_indexed_yet")
+
+    out_indptr, out_indices = index.out_csr_arrays(4, 3)
+    assert out_indptr.tolist() == [0, 2, 3, 3, 3]
+    assert out_indices.tolist() == [1, 2, 0]
+    out_indptr, out_indices = index.out_csr_arrays(3, 2)
+    assert out_indptr.tolist() == [0, 2, 2, 2]
+    assert out_indices.tolist() == [1, 2]
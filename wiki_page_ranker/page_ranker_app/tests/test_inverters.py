@@ -1,7 +1,11 @@
+import marshal
+
 import pytest
 from typing import Dict, Tuple, List
+from unittest import mock
 
-from page_ranker_app.source import inverters
+from page_ranker_app.source import graphs, inverters
+from page_ranker_app.source.rank_engines import LinkMatrix
 
 
 @pytest.mark.parametrize(
@@ -93,3 +97,78 @@ def test_invert_dict_processed(
     result = inverter.invert_dict(source_dict)
     un_result = {key: set(value) for key, value in result.items()}
     assert un_result == expected
+
+
+@pytest.mark.parametrize("source_dict, expected", inverting_assets)
+def test_invert_dict_numpy(
+    source_dict: Dict[str, List[str]], expected: Dict[str, List[str]]
+):
+    inverter = inverters.DictionaryInverterNumpy()
+    result = inverter.invert_dict(source_dict)
+    un_result = {key: set(value) for key, value in result.items()}
+    assert un_result == expected
+
+
+def test_invert_dict_numpy_matches_sync_order():
+    source_dict = {"a": ["c", "b", "c"], "b": ["c", "a"], "c": ["b"]}
+    expected = inverters.DictionaryInverterSync().invert_dict(source_dict)
+    assert inverters.DictionaryInverterNumpy().invert_dict(source_dict) == (
+        expected
+    )
+
+
+def test_invert_graph_numpy_array_form():
+    inverter = inverters.DictionaryInverterNumpy()
+    urls, indptr, indices = inverter.invert_graph(
+        {"a": ["b", "c"], "b": ["c"]}
+    )
+    assert urls == ["a", "b", "c"]
+    assert indptr.tolist() == [0, 0, 1, 3]
+    assert indices.tolist() == [0, 0, 1]
+
+
+@pytest.mark.parametrize(
+    "make_source", [graphs.UrlGraph.from_mapping, LinkMatrix.from_page_links]
+)
+def test_invert_dict_numpy_graph_inputs_are_not_rebuilt(make_source):
+    source_dict = {"a": ["c", "b"], "b": ["c", "a"], "c": ["b"]}
+    source = make_source(source_dict)
+    with mock.patch.object(graphs.UrlGraph, "from_mapping") as from_mapping:
+        result = inverters.DictionaryInverterNumpy().invert_dict(source)
+    from_mapping.assert_not_called()
+    assert {key: set(value) for key, value in result.items()} == {
+        "a": {"b"},
+        "b": {"a", "c"},
+        "c": {"a", "b"},
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2, 10_000])
+def test_invert_dict_processed_chunk_sizes(chunk_size):
+    source_dict = {"a": ["c", "b"], "b": ["c", "a"], "c": ["b"], "d": []}
+    expected = inverters.DictionaryInverterSync().invert_dict(source_dict)
+    inverter = inverters.DictionaryInverterProcessing()
+    result = inverter.invert_dict(
+        source_dict, max_workers=2, chunk_size=chunk_size
+    )
+    if chunk_size is None:
+        result = {key: sorted(value) for key, value in result.items()}
+        expected = {key: sorted(value) for key, value in expected.items()}
+    assert result == expected
+
+
+def test_invert_chunk_shards_values():
+    items = [("a", ["x", "y"]), ("b", ["x"])]
+    first = inverters.DictionaryInverterProcessing.invert_chunk(items, 3)
+    second = inverters.DictionaryInverterProcessing.invert_chunk(
+        items[::-1], 3
+    )
+    merged = inverters.DictionaryInverterProcessing.merge_shard
+    shard_dicts = [
+        marshal.loads(merged([part_1, part_2]))
+        for part_1, part_2 in zip(first, second)
+    ]
+    assert len(shard_dicts) == 3
+    assert sum(len(shard) for shard in shard_dicts) == 2
+    (x_keys,) = [shard["x"] for shard in shard_dicts if "x" in shard]
+    assert x_keys == ["a", "b", "b", "a"]
@@ -1,3 +1,4 @@
+import json
 import pathlib
 import threading
 
@@ -5,8 +6,15 @@ import pytest
 
 from unittest import mock
 
-from page_ranker_app.source import page_rankers
+from page_ranker_app import settings
+from page_ranker_app.source import (
+    checkpoints,
+    frontiers,
+    page_rankers,
+    rank_engines,
+)
 from page_ranker_app.tests.test_examples import url_links
+from page_ranker_app.source.wiki_server import running_wiki_server
 
 cur_path = pathlib.Path(__file__).resolve().parent
 
@@ -60,20 +68,14 @@ def test_wiki_page_ranker_collect_page_data(url, url_text_source, expected):
 
 scrap_assets = [
     (
-        "https://en.wikipedia.org/url_1",
+        "https://en.wikipedia.org/wiki/Superintendent",
         cur_path / "test_examples/url_text1.html",
-        (
-            {"https://en.wikipedia.org/url_1"},
-            url_links.processed_links["url_1"],
-        ),
+        list(dict.fromkeys(url_links.processed_links["url_1"])),
     ),
     (
-        "https://en.wikipedia.org/url_2",
+        "https://en.wikipedia.org/wiki/Justice_Action",
         cur_path / "test_examples/url_text2.html",
-        (
-            {"https://en.wikipedia.org/url_2"},
-            url_links.processed_links["url_2"],
-        ),
+        list(dict.fromkeys(url_links.processed_links["url_2"])),
     ),
 ]
 
@@ -90,10 +92,209 @@ def test_wiki_page_ranker_scrap_one_url(url, url_text_source, expected):
 
     page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
     lock = threading.Lock()
-    visited = set()
-    url_pool = []
-    page_ranker.scrap_one_url(url, lock, visited, url_pool, mock_session)
-    assert (visited, url_pool) == expected
+    frontier = frontiers.UrlFrontier([url])
+    assert page_ranker.scrap_one_url(
+        frontier.try_claim(), lock, frontier, mock_session
+    )
+    assert url in frontier
+    assert list(frontier) == [link for link in expected if link != url]
+    assert list(page_ranker._page_links) == [url]
+
+
+def test_wiki_page_ranker_scrap_one_url_records_page_once():
+    mock_session = mock.MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.text = '<a href="/wiki/Page">p</a>'
+
+    url = "https://en.wikipedia.org/wiki/Start"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 2)
+    lock = threading.Lock()
+    frontier = frontiers.UrlFrontier()
+    recorded = [
+        page_ranker.scrap_one_url(url, lock, frontier, mock_session)
+        for _ in range(2)
+    ]
+    assert recorded == [True, False]
+    assert list(page_ranker._page_links) == [url]
+    assert list(frontier) == ["https://en.wikipedia.org/wiki/Page"]
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio", "pipeline"])
+def test_wiki_page_ranker_scrap_data_till_limit_engines(engine):
+    with running_wiki_server(pages_number=30) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 30
+        )
+        page_ranker.scrap_data_till_limit(max_workers=50, engine=engine)
+
+    assert len(page_ranker._page_links) == 30
+    assert page_ranker._page_links[base_url + "/wiki/Page_0"] == [
+        f"{base_url}/wiki/Page_{page}" for page in range(1, 6)
+    ]
+    assert page_ranker.crawl_stats["engine"] == engine
+    assert page_ranker.crawl_stats["pages"] == 30
+    assert page_ranker.crawl_stats["pages_per_second"] > 0
+    assert page_ranker.crawl_stats["committed"] == 30
+    assert page_ranker.crawl_stats["wasted_requests"] == 0
+    if engine != "asyncio":
+        assert page_ranker.crawl_stats["connections_opened"] <= 50
+        assert page_ranker.crawl_stats["connections_reused"] > 0
+        assert page_ranker.crawl_stats["connection_pools"] == 1
+
+
+@pytest.mark.parametrize("http_redirects", [False, True])
+@pytest.mark.parametrize(
+    "engine, streaming_fetch",
+    [
+        ("threads", False),
+        ("threads", True),
+        ("asyncio", False),
+        ("pipeline", False),
+    ],
+)
+def test_wiki_page_ranker_records_redirects_once(
+    engine, streaming_fetch, http_redirects
+):
+    with running_wiki_server(
+        pages_number=30, redirects=True, http_redirects=http_redirects
+    ) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0",
+            30,
+            cache_dir=None,
+            streaming_fetch=streaming_fetch,
+        )
+        page_ranker.scrap_data_till_limit(max_workers=10, engine=engine)
+
+    assert sorted(page_ranker._page_links) == sorted(
+        f"{base_url}/wiki/Page_{page}" for page in range(30)
+    )
+    stats = page_ranker.crawl_stats
+    assert stats["redirects"] > 0
+    assert stats["redirect_fetches_saved"] > 0
+    assert stats["redirect_rewrites"] > 0
+    assert stats["committed"] == 30
+    assert stats["wasted_requests"] == stats["redirect_duplicate_fetches"]
+
+
+def test_wiki_page_ranker_scrap_with_streaming_fetch():
+    with running_wiki_server(pages_number=30) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 30, streaming_fetch=True
+        )
+        page_ranker.scrap_data_till_limit(max_workers=10)
+        with pytest.raises(ValueError):
+            page_ranker.scrap_data_till_limit(engine="asyncio")
+
+    assert len(page_ranker._page_links) == 30
+    assert page_ranker._page_links[base_url + "/wiki/Page_0"] == [
+        f"{base_url}/wiki/Page_{page}" for page in range(1, 6)
+    ]
+
+
+@pytest.mark.parametrize("redirects", [False, True])
+def test_wiki_page_ranker_scrap_with_api_matches_pages(redirects):
+    graphs = {}
+    with running_wiki_server(
+        pages_number=60, redirects=redirects, api_links_limit=100
+    ) as base_url:
+        for engine in ("threads", "api"):
+            page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+                base_url + "/wiki/Page_0", 60, cache_dir=None
+            )
+            page_ranker.scrap_data_till_limit(max_workers=4, engine=engine)
+            graphs[engine] = page_ranker
+
+    api_stats = graphs["api"].crawl_stats
+    page_links = {
+        engine: {
+            url: sorted(links)
+            for url, links in accumulator._page_links.items()
+        }
+        for engine, accumulator in graphs.items()
+    }
+    if redirects:
+        # links to redirects are rewritten once the redirects are known,
+        # which depends on the order pages are scrapped in
+        assert set(page_links["api"]) == set(page_links["threads"])
+        assert api_stats["redirects"] > 0
+    else:
+        assert page_links["api"] == page_links["threads"]
+        assert api_stats["wasted_requests"] == 0
+    assert api_stats["committed"] == 60
+    assert api_stats["granted_requests"] * 5 < (
+        graphs["threads"].crawl_stats["granted_requests"]
+    )
+
+
+def test_wiki_page_ranker_scrap_with_pipeline_stage_stats():
+    with running_wiki_server(pages_number=10) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 10
+        )
+        page_ranker.scrap_data_till_limit(max_workers=5, engine="pipeline")
+
+    stages = page_ranker.crawl_stats["stages"]
+    assert list(stages) == ["fetch", "parse", "normalize", "store"]
+    assert [stage["processed"] for stage in stages.values()] == [10] * 4
+    assert all(stage["queue_depth"] == 0 for stage in stages.values())
+    assert stages["store"]["items_per_second"] > 0
+
+
+def test_wiki_page_ranker_warm_recrawl_uses_cache(tmp_path):
+    with running_wiki_server(pages_number=10) as base_url:
+        start_url = base_url + "/wiki/Page_0"
+        cold = page_rankers.WikiPageRankInfoAccumulator(
+            start_url, 10, cache_dir=tmp_path
+        )
+        cold.scrap_data_till_limit(max_workers=5)
+        warm = page_rankers.WikiPageRankInfoAccumulator(
+            start_url, 10, cache_dir=tmp_path
+        )
+        warm.scrap_data_till_limit(max_workers=5)
+
+    assert cold.crawl_stats["cache_stores"] == 10
+    assert warm.crawl_stats["cache_hits"] == 10
+    assert warm.crawl_stats["cache_misses"] == 0
+    assert dict(warm._page_links) == dict(cold._page_links)
+
+
+def test_wiki_page_ranker_resume_from_checkpoint(tmp_path):
+    journal = tmp_path / "crawl.jsonl"
+    with running_wiki_server(pages_number=30) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 20, checkpoint_path=journal
+        )
+        page_ranker.scrap_data_till_limit(max_workers=5)
+
+        lines = journal.read_text().splitlines(keepends=True)
+        journal.write_text("".join(lines[:11]) + lines[11][:10])
+        interrupted = [json.loads(line)[0] for line in lines[1:11]]
+
+        resumed = page_rankers.WikiPageRankInfoAccumulator.resume(journal)
+        assert list(resumed._page_links) == interrupted
+        resumed.scrap_data_till_limit(max_workers=5)
+
+    assert len(resumed._page_links) == 20
+    assert list(resumed._page_links)[:10] == interrupted
+    assert resumed.crawl_stats["pages"] == 10
+    assert resumed.crawl_stats["checkpoint_records"] == 10
+    _, pages = checkpoints.CrawlCheckpoint.load(journal)
+    assert dict(pages) == dict(resumed._page_links)
+
+    fresh = page_rankers.WikiPageRankInfoAccumulator(
+        base_url + "/wiki/Page_0", 20, checkpoint_path=journal
+    )
+    with pytest.raises(ValueError, match="already exists"):
+        fresh.scrap_data_till_limit(max_workers=5)
+
+
+def test_wiki_page_ranker_scrap_data_till_limit_unknown_engine():
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+        "https://en.wikipedia.org/wiki/Main_Page", 1
+    )
+    with pytest.raises(ValueError):
+        page_ranker.scrap_data_till_limit(engine="carrier_pigeons")
 
 
 page_rank_assets = [
@@ -109,9 +310,182 @@ page_rank_assets = [
 
 
 @pytest.mark.parametrize("source_dict, expected", page_rank_assets)
-def test_wiki_page_ranker_count_page_rank(source_dict, expected):
+def test_wiki_page_ranker_count_in_links(source_dict, expected):
     url = "https://en.wikipedia.org/"
     page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
     page_ranker._page_links = source_dict
-    page_ranker.count_page_rank()
-    assert page_ranker.page_rank == expected
+    assert page_ranker.count_in_links() == expected
+
+
+def test_wiki_page_ranker_in_links_are_indexed_during_crawl():
+    with running_wiki_server(pages_number=30) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 20
+        )
+        page_ranker.scrap_data_till_limit(max_workers=5)
+
+    assert page_ranker.in_links.pages_number == 20
+    in_links = page_ranker.count_in_links()
+    scores = page_ranker.count_page_rank().scores
+    page_ranker._page_links = dict(page_ranker._page_links)
+    assert in_links == page_ranker.count_in_links()
+    assert scores == pytest.approx(page_ranker.count_page_rank().scores)
+    assert page_ranker.in_links.in_degree(base_url + "/wiki/Page_1") == (
+        in_links.get(base_url + "/wiki/Page_1", 0)
+    )
+
+
+def test_wiki_page_ranker_count_page_rank():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
+    page_ranker._page_links = {
+        "a": ["url1", "url2"],
+        "b": ["url3", "url4"],
+        "c": ["url4"],
+    }
+    result = page_ranker.count_page_rank()
+    assert result.converged
+    assert page_ranker.page_rank == result.scores
+    assert sum(page_ranker.page_rank.values()) == pytest.approx(1)
+    assert max(page_ranker.page_rank, key=page_ranker.page_rank.get) == "url4"
+
+
+def test_wiki_page_ranker_count_page_rank_warm_start():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
+    page_ranker._page_links = {
+        f"p{i}": [f"p{(i + 1) % 50}", "hub"] for i in range(50)
+    }
+    page_ranker._page_links["hub"] = ["p0"]
+    page_ranker.count_page_rank(warm_start=True)
+    assert page_ranker.rank_stats["warm_start"] is False
+
+    page_ranker._page_links["p25"] = ["p26", "hub", "new"]
+    page_ranker._page_links["new"] = ["p0"]
+    result = page_ranker.count_page_rank(
+        warm_start=True, compare_cold_start=True
+    )
+    stats = page_ranker.rank_stats
+    assert result.converged
+    assert stats["warm_start"] is True
+    assert stats["iterations"] == result.iterations
+    assert stats["iterations_saved"] == (
+        stats["cold_iterations"] - result.iterations - result.local_iterations
+    )
+    assert stats["iterations_saved"] > 0
+    assert stats["seconds"] > 0 and stats["cold_seconds"] > 0
+
+
+def test_wiki_page_ranker_live_rank_during_crawl():
+    with running_wiki_server(pages_number=30) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 20, live_rank=True
+        )
+        page_ranker.scrap_data_till_limit(max_workers=5)
+
+    stats = page_ranker.crawl_stats
+    assert stats["live_rank_pages"] == 20
+    assert stats["live_rank_nodes"] == page_ranker._page_links.nodes_number
+    assert stats["stopped_early"] is False
+    top = page_ranker.live_rank.current_top_k(5)
+    assert len(top) == 5
+    assert all(estimate.error > 0 for estimate in top)
+
+
+def test_wiki_page_ranker_stops_at_stable_top_k():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+        url, 1000, live_rank=True
+    )
+    page_ranker._frontier = frontiers.UrlFrontier(["p0"])
+    page_ranker._stop_top_k = 1
+    with mock.patch.object(page_rankers.settings, "LIVE_RANK_STABLE_PAGES", 5):
+        for page in range(100):
+            page_url = page_ranker._record_page(f"p{page}", ["hub"])
+            page_ranker._add_to_frontier(
+                page_ranker._frontier, page_url, page_url, ["hub"]
+            )
+            if page_ranker._stopped_early:
+                break
+
+    assert page_ranker._stopped_early
+    assert page_ranker._frontier.claim() is None
+    assert page_ranker.live_rank.current_top_k(1)[0].url == "hub"
+    assert page_ranker.live_rank.pages_number < 100
+
+
+def test_wiki_page_ranker_checks_top_k_periodically():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+        url, 1000, live_rank=True
+    )
+    page_ranker._frontier = frontiers.UrlFrontier(["p0"])
+    page_ranker._stop_top_k = 1
+    with mock.patch.object(
+        page_ranker.live_rank,
+        "current_top_k",
+        wraps=page_ranker.live_rank.current_top_k,
+    ) as current_top_k:
+        for page in range(35):
+            page_url = page_ranker._record_page(f"p{page}", ["hub"])
+            page_ranker._add_to_frontier(
+                page_ranker._frontier, page_url, page_url, ["hub"]
+            )
+
+    assert current_top_k.call_count == 35 // settings.LIVE_RANK_CHECK_PAGES
+
+
+def test_wiki_page_ranker_stop_top_k_needs_live_rank():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
+    with pytest.raises(ValueError):
+        page_ranker.scrap_data_till_limit(stop_top_k=10)
+
+
+def test_wiki_page_ranker_count_page_rank_batch():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
+    page_ranker._page_links = {"a": ["b", "c"], "b": ["c"], "c": ["a"]}
+    default, topical = page_ranker.count_page_rank_batch(
+        [
+            rank_engines.RankSetting(),
+            rank_engines.RankSetting(0.5, {"b": 1.0}),
+        ]
+    )
+    assert page_ranker.page_rank == {}
+    assert default.scores == pytest.approx(
+        page_ranker.count_page_rank().scores
+    )
+    assert max(topical.scores, key=topical.scores.get) == "b"
+
+
+def test_wiki_page_ranker_count_page_rank_with_threads():
+    url = "https://en.wikipedia.org/"
+    page_ranker = page_rankers.WikiPageRankInfoAccumulator(url, 1)
+    page_ranker._page_links = {"a": ["b", "c"], "b": ["c"], "c": ["a"]}
+    expected = page_ranker.count_page_rank()
+    assert page_ranker.count_page_rank(threads=4) == expected
+
+
+def test_wiki_page_ranker_page_rank_and_hits_share_link_matrix():
+    with running_wiki_server(pages_number=30) as base_url:
+        page_ranker = page_rankers.WikiPageRankInfoAccumulator(
+            base_url + "/wiki/Page_0", 20
+        )
+        page_ranker.scrap_data_till_limit(max_workers=5)
+
+    with mock.patch.object(
+        rank_engines.LinkMatrix,
+        "from_in_link_index",
+        wraps=rank_engines.LinkMatrix.from_in_link_index,
+    ) as from_index:
+        page_ranker.count_page_rank()
+        result = page_ranker.count_hits()
+        assert from_index.call_count == 1
+        assert page_ranker.authorities == result.scores
+        assert page_ranker.hubs == result.hubs
+        assert page_ranker.authorities.keys() == page_ranker.page_rank.keys()
+
+        page_ranker._record_page(base_url + "/wiki/Extra_page", [])
+        page_ranker.count_hits()
+        assert from_index.call_count == 2
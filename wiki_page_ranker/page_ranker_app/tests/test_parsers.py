@@ -1,3 +1,4 @@
+import json
 import pathlib
 
 import pytest
@@ -5,7 +6,6 @@ import pytest
 from page_ranker_app.source import parsers
 from page_ranker_app.tests.test_examples import url_links
 
-
 cur_path = pathlib.Path(__file__).resolve().parent
 
 parsing_assets = [
@@ -25,3 +25,144 @@ def test_wiki_parser_parse(source_text, expected):
     parser = parsers.WikiParser()
     with open(source_text) as source:
         assert parser.parse(source.read()) == expected
+
+
+@pytest.mark.parametrize("backend", parsers.WikiParser.backends)
+@pytest.mark.parametrize("source_text, expected", parsing_assets)
+def test_wiki_parser_parse_backends(backend, source_text, expected):
+    parser = parsers.WikiParser(backend)
+    with open(source_text, "rb") as source:
+        assert parser.parse(source.read()) == expected
+
+
+markup_assets = [
+    '<a href="/wiki/A">A</a><A HREF="/wiki/B" title="b">B</A>',
+    "<a class=x href='/wiki/Single'>s</a><a href=/wiki/Bare>b</a>",
+    '<a title="x > y" href="/wiki/Quoted_&amp;_escaped">q</a>',
+    '<!-- <a href="/wiki/Commented"> --><a href="/wiki/Visible">v</a>',
+    '<script>var a = \'<a href="/wiki/Script">\';</script><a href="/wiki/C">',
+    '<abbr href="/wiki/Abbr">x</abbr><a name="top"><a href="#top">t</a>',
+    '<a href="/wiki/File:Image.png">f</a><a href="/wiki/Page#Part">p</a>',
+    '<a\nhref="/wiki/New_line"\n>n</a><a href="/wiki/Unclosed"',
+    '<!--><a href="/wiki/After_empty_comment">a</a>',
+    '<!---><a href="/wiki/After_empty_comment">a</a>',
+    '<a/href="/wiki/Slash">s</a><a href="/wiki/Slashes"/title="t"/>s</a>',
+    '<?php echo \'<a href="/wiki/Instruction">\'; ?><a href="/wiki/D">d</a>',
+    '<![CDATA[<a href="/wiki/Cdata">c</a>]]><a href="/wiki/E">e</a>',
+    '<!DOCTYPE html><!x <a href="/wiki/Bogus">b</a>><a href="/wiki/F">',
+    '<head><link rel="stylesheet" href="/w/load.php">'
+    '<link rel="canonical" href="https://en.wikipedia.org/wiki/Target"/>'
+    '</head><body><span class="mw-redirectedfrom">(Redirected from '
+    '<a href="/w/index.php?title=Alias&amp;redirect=no" class="mw-redirect"'
+    ' title="Alias">Alias</a>)</span><a href="/wiki/G">g</a></body>',
+    '<!-- <link rel="canonical" href="/wiki/Commented"> -->'
+    "<LINK REL='Alternate Canonical' HREF=/wiki/Upper_&amp;_escaped>"
+    '<link rel="canonical" href="/wiki/Second"><a href="/wiki/H">h</a>',
+    '<link href="<a href=\'/wiki/In_link\'>"><link rel="canonical">',
+    '<a title="<b>" href="/wiki/Lt_in_quotes">l</a>',
+]
+
+
+@pytest.mark.parametrize("markup", markup_assets)
+def test_wiki_parser_scanner_matches_bs4(markup):
+    scanner = parsers.WikiParser("scanner")
+    soup = parsers.WikiParser("bs4")
+    assert scanner.parse(markup) == soup.parse(markup)
+    assert scanner.canonical_href(markup) == soup.canonical_href(markup)
+
+
+@pytest.mark.parametrize("backend", parsers.WikiParser.backends)
+def test_wiki_parser_canonical_href(backend):
+    parser = parsers.WikiParser(backend)
+    with open(parsing_assets[0][0], "rb") as source:
+        assert parser.canonical_href(source.read()) == (
+            "https://en.wikipedia.org/wiki/Superintendent"
+        )
+    assert parser.canonical_href(markup_assets[14]) == (
+        "https://en.wikipedia.org/wiki/Target"
+    )
+    assert parser.canonical_href(markup_assets[15]) == "/wiki/Upper_&_escaped"
+    assert parser.canonical_href(markup_assets[0]) is None
+
+
+def test_wiki_parser_unknown_backend():
+    with pytest.raises(ValueError):
+        parsers.WikiParser("regex")
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000, 10**6])
+@pytest.mark.parametrize("source_text, _", parsing_assets)
+def test_incremental_link_extractor_stops_at_main_content_end(
+    chunk_size, source_text, _
+):
+    with open(source_text) as source:
+        text = source.read()
+    extractor = parsers.IncrementalLinkExtractor()
+    for start in range(0, len(text), chunk_size):
+        if extractor.feed(text[start : start + chunk_size]):
+            break
+    main_content = text[: text.index(extractor.end_marker)]
+    assert extractor.finished
+    assert extractor.close() == parsers.WikiParser().parse(main_content)
+
+
+@pytest.mark.parametrize("markup", markup_assets)
+def test_incremental_link_extractor_matches_parser(markup):
+    extractor = parsers.IncrementalLinkExtractor(end_marker=None)
+    for char in markup:
+        assert not extractor.feed(char)
+    assert extractor.close() == parsers.WikiParser().parse(markup)
+    assert extractor.canonical_href == (
+        parsers.WikiParser().canonical_href(markup)
+    )
+
+
+api_responses = [
+    {
+        "continue": {"plcontinue": "2|0|Page 9", "continue": "||"},
+        "query": {
+            "normalized": [{"from": "Page_1", "to": "Page 1"}],
+            "redirects": [{"from": "USA", "to": "United States"}],
+            "pages": [
+                {"pageid": 1, "ns": 0, "title": "Page 1", "links": []},
+                {
+                    "pageid": 2,
+                    "ns": 0,
+                    "title": "United States",
+                    "links": [{"ns": 0, "title": "Page 1"}],
+                },
+                {"ns": 0, "title": "Nothing", "missing": True},
+            ],
+        },
+    },
+    {
+        "batchcomplete": True,
+        "query": {
+            "pages": [
+                {"pageid": 1, "ns": 0, "title": "Page 1"},
+                {
+                    "pageid": 2,
+                    "ns": 0,
+                    "title": "United States",
+                    "links": [{"ns": 0, "title": "What?"}],
+                },
+            ],
+        },
+    },
+]
+
+
+def test_mediawiki_api_parser_parse_batch():
+    api_links = parsers.MediaWikiApiParser().parse_batch(api_responses)
+    assert api_links.links == {
+        "Page 1": [],
+        "United States": ["/wiki/Page_1", "/wiki/What%3F"],
+    }
+    assert api_links.resolve("Page_1") == "Page 1"
+    assert api_links.resolve("USA") == "United States"
+    assert api_links.resolve("Nothing") == "Nothing"
+
+
+def test_mediawiki_api_parser_parse():
+    parser = parsers.MediaWikiApiParser()
+    assert parser.parse(json.dumps(api_responses[0])) == ["/wiki/Page_1"]
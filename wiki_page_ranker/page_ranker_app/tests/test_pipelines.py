@@ -0,0 +1,71 @@
+import threading
+
+from page_ranker_app.source import pipelines
+
+
+def test_pipeline_passes_items_through_stages():
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+        return item
+
+    pipeline = pipelines.Pipeline(
+        pipelines.PipelineStage("double", lambda item: item * 2, workers=3),
+        pipelines.PipelineStage("increment", lambda item: item + 1),
+        pipelines.PipelineStage("collect", collect),
+    )
+    with pipeline:
+        for number in range(100):
+            pipeline.put(number)
+
+    assert sorted(results) == [number * 2 + 1 for number in range(100)]
+    stats = pipeline.stats
+    assert [stage["processed"] for stage in stats.values()] == [100] * 3
+    assert stats["double"]["queue_depth"] == 0
+
+
+def test_pipeline_stage_drops_items():
+    dropped = []
+    passed = []
+
+    def fail_on_seven(item):
+        if item == 7:
+            raise ValueError("seven")
+        return item
+
+    pipeline = pipelines.Pipeline(
+        pipelines.PipelineStage(
+            "odd",
+            lambda item: item if item % 2 else None,
+            on_drop=dropped.append,
+        ),
+        pipelines.PipelineStage(
+            "not_seven", fail_on_seven, on_drop=dropped.append
+        ),
+        pipelines.PipelineStage("collect", passed.append),
+    )
+    with pipeline:
+        for number in range(10):
+            pipeline.put(number)
+
+    assert sorted(dropped) == [0, 2, 4, 6, 7, 8]
+    assert passed == [1, 3, 5, 9]
+    assert pipeline.stats["odd"]["dropped"] == 5
+
+
+def test_pipeline_stage_queue_is_bounded():
+    release = threading.Event()
+    stage = pipelines.PipelineStage(
+        "blocked", lambda item: release.wait(), queue_size=2
+    )
+    stage.start()
+    for number in range(3):
+        stage.put(number)
+    assert stage.input.full()
+    release.set()
+    stage.stop()
+    assert stage.stats["processed"] == 3
+    assert stage.stats["max_queue_depth"] == 2
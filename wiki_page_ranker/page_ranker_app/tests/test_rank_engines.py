@@ -0,0 +1,415 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from page_ranker_app.source import graphs, rank_engines
+
+
+def reference_page_rank(page_links, damping, iterations=1000):
+    urls = list(dict.fromkeys([*page_links, *sum(page_links.values(), [])]))
+    size = len(urls)
+    matrix = np.zeros((size, size))
+    for url, links in page_links.items():
+        for link in set(links):
+            matrix[urls.index(link), urls.index(url)] = 1 / len(set(links))
+    matrix[:, matrix.sum(axis=0) == 0] = 1 / size
+    google = damping * matrix + (1 - damping) / size
+    ranks = np.full(size, 1 / size)
+    for _ in range(iterations):
+        ranks = google @ ranks
+    return dict(zip(urls, ranks))
+
+
+graph_assets = [
+    {"a": ["b"], "b": ["a"]},
+    {"a": ["url1", "url2"], "b": ["url3", "url4"], "c": ["url4"]},
+    {"a": ["b", "c", "c"], "b": ["c"], "c": ["a"], "d": ["c", "e"]},
+]
+
+
+@pytest.mark.parametrize("page_links", graph_assets)
+def test_power_iteration_matches_dense_reference(page_links):
+    engine = rank_engines.PowerIterationRankEngine(damping=0.85)
+    result = engine.rank(page_links)
+    expected = reference_page_rank(page_links, 0.85)
+    assert result.converged
+    assert result.scores.keys() == expected.keys()
+    for url, value in expected.items():
+        assert result.scores[url] == pytest.approx(value, abs=1e-7)
+
+
+def test_power_iteration_respects_max_iterations():
+    engine = rank_engines.PowerIterationRankEngine(
+        tolerance=0, max_iterations=3
+    )
+    result = engine.rank(graph_assets[2])
+    assert (result.iterations, result.converged) == (3, False)
+    assert result.residual > 0
+
+
+def test_power_iteration_empty_graph():
+    result = rank_engines.PowerIterationRankEngine().rank({})
+    assert result == rank_engines.RankResult({}, 0, 0.0, True)
+
+
+@pytest.mark.parametrize("damping", [0, 1, 1.5])
+def test_power_iteration_invalid_damping(damping):
+    with pytest.raises(ValueError):
+        rank_engines.PowerIterationRankEngine(damping=damping)
+
+
+def test_link_matrix_from_page_links():
+    matrix = rank_engines.LinkMatrix.from_page_links(graph_assets[2])
+    assert matrix.urls == ["a", "b", "c", "d", "e"]
+    assert matrix.out_degree.tolist() == [2, 1, 1, 2, 0]
+    assert matrix.indptr.tolist() == [0, 1, 2, 5, 5, 6]
+    assert matrix.indices.tolist() == [2, 0, 0, 1, 3, 3]
+
+
+@pytest.mark.parametrize("page_links", graph_assets)
+def test_link_matrix_from_in_link_index(page_links):
+    graph = graphs.UrlGraph()
+    index = graphs.InLinkIndex(graph)
+    for url, links in page_links.items():
+        index.add_page(graph.add_page(url, links))
+
+    matrix = rank_engines.LinkMatrix.from_in_link_index(index)
+    expected = rank_engines.LinkMatrix.from_page_links(page_links)
+    assert matrix.urls == expected.urls
+    assert matrix.indptr.tolist() == expected.indptr.tolist()
+    assert matrix.out_degree.tolist() == expected.out_degree.tolist()
+    for start, end in zip(matrix.indptr, matrix.indptr[1:]):
+        assert sorted(matrix.indices[start:end]) == sorted(
+            expected.indices[start:end]
+        )
+
+
+def test_csr_matvec_with_empty_rows():
+    indptr = np.array([0, 0, 2, 2, 3])
+    indices = np.array([0, 2, 1])
+    values = np.array([1.0, 10.0, 100.0])
+    result = rank_engines.csr_matvec(indptr, indices, values)
+    assert result.tolist() == [0.0, 101.0, 0.0, 10.0]
+
+
+def chain_graph(size):
+    page_links = {f"p{i}": [f"p{(i + 1) % size}", "hub"] for i in range(size)}
+    page_links["hub"] = ["p0"]
+    return page_links
+
+
+def test_warm_start_matches_cold_start():
+    page_links = chain_graph(100)
+    engine = rank_engines.PowerIterationRankEngine()
+    previous = engine.rank(page_links).scores
+    page_links["p50"] = [*page_links["p50"], "new"]
+    page_links["new"] = ["p0"]
+
+    cold = engine.rank(page_links)
+    warm = engine.rank(page_links, initial=previous)
+    assert warm.converged
+    assert warm.scores.keys() == cold.scores.keys()
+    for url, value in cold.scores.items():
+        assert warm.scores[url] == pytest.approx(value, abs=1e-7)
+    assert warm.iterations <= cold.iterations
+
+
+def test_warm_start_updates_small_change_locally():
+    page_links = chain_graph(1000)
+    engine = rank_engines.PowerIterationRankEngine()
+    previous = engine.rank(page_links).scores
+    page_links["p500"] = ["p501"]
+
+    warm = engine.rank(page_links, initial=previous)
+    assert warm.converged
+    assert warm.local_iterations > 0
+    assert 0 < warm.local_updates < warm.local_iterations * len(page_links)
+
+
+def test_warm_start_local_update_without_full_iterations_left():
+    page_links = chain_graph(1000)
+    previous = rank_engines.PowerIterationRankEngine().rank(page_links)
+    page_links["p500"] = ["p501"]
+
+    engine = rank_engines.PowerIterationRankEngine(max_iterations=1)
+    warm = engine.rank(page_links, initial=previous.scores)
+    assert warm.local_iterations > 0
+    assert warm.iterations == 1
+    assert np.isfinite(warm.residual)
+    assert not warm.converged
+
+
+def test_warm_start_with_same_ranks_converges_at_once():
+    engine = rank_engines.PowerIterationRankEngine()
+    previous = engine.rank(graph_assets[2])
+    warm = engine.rank(graph_assets[2], initial=previous.scores)
+    assert warm.converged
+    assert warm.iterations == 1
+    assert warm.local_iterations == 0
+
+
+@pytest.mark.parametrize("page_links", [*graph_assets, chain_graph(30)])
+def test_monte_carlo_estimates_match_power_iteration(page_links):
+    graph = graphs.UrlGraph()
+    estimator = rank_engines.MonteCarloRankEstimator(
+        graph, walks_per_node=5000, seed=1
+    )
+    for url, links in page_links.items():
+        estimator.add_page(graph.add_page(url, links))
+
+    expected = rank_engines.PowerIterationRankEngine().rank(page_links)
+    top = estimator.current_top_k(len(expected.scores))
+    assert {estimate.url for estimate in top} == expected.scores.keys()
+    assert sum(estimate.score for estimate in top) == pytest.approx(1)
+    for estimate in top:
+        assert estimate.score == pytest.approx(
+            expected.scores[estimate.url], abs=estimate.error
+        )
+
+
+def test_monte_carlo_continues_parked_walks():
+    graph = graphs.UrlGraph()
+    estimator = rank_engines.MonteCarloRankEstimator(
+        graph, walks_per_node=100, seed=1
+    )
+    estimator.add_page(graph.add_page("a", ["b"]))
+    parked = estimator.stats["live_rank_parked"]
+    assert parked > 0
+    estimator.add_page(graph.add_page("b", []))
+    assert estimator.stats["live_rank_parked"] == 0
+    assert estimator.stats["live_rank_visits"] > 200
+    assert estimator.estimate("b").score > estimator.estimate("a").score
+
+
+def test_monte_carlo_top_k():
+    graph = graphs.UrlGraph()
+    estimator = rank_engines.MonteCarloRankEstimator(graph, seed=1)
+    assert estimator.current_top_k(3) == []
+    for url, links in chain_graph(50).items():
+        estimator.add_page(graph.add_page(url, links))
+
+    top = estimator.current_top_k(3)
+    assert [estimate.url for estimate in top[:2]] == ["hub", "p0"]
+    assert top[0].score >= top[1].score >= top[2].score
+    assert estimator.is_top_k_separated(2)
+    assert len(estimator.current_top_k(100)) == 51
+    with pytest.raises(KeyError):
+        estimator.estimate("unknown")
+
+
+@pytest.mark.parametrize("walks_per_node", [0, -1])
+def test_monte_carlo_invalid_walks(walks_per_node):
+    with pytest.raises(ValueError):
+        rank_engines.MonteCarloRankEstimator(
+            graphs.UrlGraph(), walks_per_node=walks_per_node
+        )
+
+
+def test_buckets_matmul_matches_csr_matvec():
+    matrix = rank_engines.LinkMatrix.from_page_links(graph_assets[2])
+    buckets = rank_engines.degree_buckets(matrix.indptr, matrix.indices)
+    assert sorted(len(rows) for rows, _ in buckets) == [1, 3]
+    values = np.arange(10.0).reshape(5, 2)
+    sums = rank_engines.buckets_matmul(buckets, values, 5)
+    for column in range(2):
+        assert (
+            sums[:, column].tolist()
+            == rank_engines.csr_matvec(
+                matrix.indptr, matrix.indices, values[:, column]
+            ).tolist()
+        )
+
+
+@pytest.mark.parametrize("page_links", graph_assets)
+def test_rank_batch_matches_separate_runs(page_links):
+    rank_settings = [
+        rank_engines.RankSetting(damping) for damping in (0.5, 0.85, 0.95)
+    ]
+    results = rank_engines.PowerIterationRankEngine().rank_batch(
+        page_links, rank_settings
+    )
+    for setting, result in zip(rank_settings, results):
+        expected = rank_engines.PowerIterationRankEngine(
+            damping=setting.damping
+        ).rank(page_links)
+        assert result.converged
+        assert result.iterations == expected.iterations
+        assert result.scores == pytest.approx(expected.scores, abs=1e-12)
+
+
+def test_rank_batch_personalization():
+    page_links = graph_assets[2]
+    result = rank_engines.PowerIterationRankEngine().rank_batch(
+        page_links,
+        [rank_engines.RankSetting(0.85, {"d": 1.0, "unknown": 5.0})],
+    )[0]
+
+    urls = ["a", "b", "c", "d", "e"]
+    jumps = np.array([0.0, 0.0, 0.0, 1.0, 0.0])
+    matrix = np.zeros((5, 5))
+    for url, links in page_links.items():
+        for link in set(links):
+            matrix[urls.index(link), urls.index(url)] = 1 / len(set(links))
+    matrix[:, matrix.sum(axis=0) == 0] = jumps[:, np.newaxis]
+    ranks = jumps
+    for _ in range(1000):
+        ranks = 0.85 * matrix @ ranks + 0.15 * jumps
+    assert result.converged
+    assert [result.scores[url] for url in urls] == pytest.approx(ranks)
+
+
+def test_rank_batch_empty_graph():
+    results = rank_engines.PowerIterationRankEngine().rank_batch(
+        {}, [rank_engines.RankSetting()] * 2
+    )
+    assert results == [rank_engines.RankResult({}, 0, 0.0, True)] * 2
+
+
+def test_rank_batch_without_settings():
+    engine = rank_engines.PowerIterationRankEngine()
+    assert engine.rank_batch(graph_assets[2], []) == []
+
+
+@pytest.mark.parametrize(
+    "setting",
+    [
+        rank_engines.RankSetting(1.0),
+        rank_engines.RankSetting(0.85, {"unknown": 1.0}),
+        rank_engines.RankSetting(0.85, {"a": 1.0, "b": -1.0}),
+    ],
+)
+def test_rank_batch_invalid_settings(setting):
+    with pytest.raises(ValueError):
+        rank_engines.PowerIterationRankEngine().rank_batch(
+            graph_assets[0], [setting]
+        )
+
+
+@pytest.mark.parametrize("block_edges", [1, 2, 4, 100])
+def test_row_blocks_cover_rows(block_edges):
+    indptr = np.array([0, 0, 2, 2, 7, 8])
+    blocks = rank_engines.row_blocks(indptr, block_edges)
+    assert blocks[0][0] == 0 and blocks[-1][1] == 5
+    assert all(
+        end == first for (_, end), (first, _) in zip(blocks, blocks[1:])
+    )
+    assert all(first < end for first, end in blocks)
+    if block_edges >= 8:
+        assert blocks == [(0, 5)]
+
+
+@pytest.mark.parametrize("block_edges", [1, 3, 100])
+def test_blocked_matvec_matches_csr_matvec(block_edges):
+    matrix = rank_engines.LinkMatrix.from_page_links(graph_assets[2])
+    values = np.arange(1.0, 6.0)
+    blocks = rank_engines.row_blocks(matrix.indptr, block_edges)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = rank_engines.blocked_matvec(
+            executor, matrix.indptr, matrix.indices, blocks, values
+        )
+    expected = rank_engines.csr_matvec(matrix.indptr, matrix.indices, values)
+    assert result.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("page_links", [*graph_assets, {}])
+def test_blocked_engine_matches_power_iteration(page_links):
+    engine = rank_engines.BlockedPowerIterationRankEngine(
+        threads=3, block_edges=2
+    )
+    assert engine.rank(page_links) == (
+        rank_engines.PowerIterationRankEngine().rank(page_links)
+    )
+
+
+@pytest.mark.parametrize("threads, block_edges", [(0, 10), (2, 0)])
+def test_blocked_engine_invalid_arguments(threads, block_edges):
+    with pytest.raises(ValueError):
+        rank_engines.BlockedPowerIterationRankEngine(threads, block_edges)
+
+
+def reference_hits(page_links, iterations=1000):
+    urls = list(dict.fromkeys([*page_links, *sum(page_links.values(), [])]))
+    adjacency = np.zeros((len(urls), len(urls)))
+    for url, links in page_links.items():
+        for link in links:
+            adjacency[urls.index(url), urls.index(link)] = 1
+    hubs = np.full(len(urls), 1 / len(urls))
+    for _ in range(iterations):
+        authorities = adjacency.T @ hubs
+        authorities /= authorities.sum()
+        hubs = adjacency @ authorities
+        hubs /= hubs.sum()
+    return dict(zip(urls, authorities)), dict(zip(urls, hubs))
+
+
+@pytest.mark.parametrize("page_links", graph_assets)
+def test_hits_matches_dense_reference(page_links):
+    result = rank_engines.HitsRankEngine().rank(page_links)
+    authorities, hubs = reference_hits(page_links)
+    assert result.converged
+    assert result.scores == pytest.approx(authorities, abs=1e-7)
+    assert result.hubs == pytest.approx(hubs, abs=1e-7)
+
+
+def test_hits_shares_link_matrix():
+    matrix = rank_engines.LinkMatrix.from_page_links(graph_assets[2])
+    result = rank_engines.HitsRankEngine().rank(matrix)
+    assert result.scores.keys() == {"a", "b", "c", "d", "e"}
+    assert max(result.scores, key=result.scores.get) == "c"
+    assert max(result.hubs, key=result.hubs.get) in ("a", "b", "d")
+    assert result.hubs["e"] == 0 and result.scores["d"] == 0
+
+
+def test_hits_respects_max_iterations():
+    engine = rank_engines.HitsRankEngine(tolerance=0, max_iterations=2)
+    result = engine.rank(graph_assets[2])
+    assert (result.iterations, result.converged) == (2, False)
+
+
+@pytest.mark.parametrize(
+    "initial", [dict.fromkeys("abcde", 0.0), {**dict.fromkeys("abcd", 0.0)}]
+)
+def test_hits_warm_start_without_hub_weight(initial):
+    engine = rank_engines.HitsRankEngine()
+    cold = engine.rank(graph_assets[2])
+    warm = engine.rank(graph_assets[2], initial=initial)
+    assert warm.converged
+    assert warm.scores == pytest.approx(cold.scores, abs=1e-7)
+    assert warm.hubs == pytest.approx(cold.hubs, abs=1e-7)
+
+
+@pytest.mark.parametrize("page_links", [{}, {"a": [], "b": []}])
+def test_hits_without_links(page_links):
+    result = rank_engines.HitsRankEngine().rank(page_links)
+    assert result == rank_engines.HitsResult(
+        dict.fromkeys(page_links, 0.0),
+        dict.fromkeys(page_links, 0.0),
+        0,
+        0.0,
+        True,
+    )
+
+
+def test_link_matrix_out_links():
+    matrix = rank_engines.LinkMatrix.from_page_links(graph_assets[2])
+    out_indptr, out_indices = matrix.out_links()
+    assert out_indptr.tolist() == [0, 2, 3, 4, 6, 6]
+    assert out_indices.tolist() == [1, 2, 2, 0, 2, 4]
+    assert matrix.out_links() is matrix.out_links()
+
+
+def test_link_matrix_from_in_link_index_out_links():
+    graph = graphs.UrlGraph()
+    index = graphs.InLinkIndex(graph)
+    for url, links in [("c", ["a", "d", "a"]), ("a", ["c", "b"]), ("b", [])]:
+        index.add_page(graph.add_page(url, links))
+    out_indptr, out_indices = rank_engines.LinkMatrix.from_in_link_index(
+        index
+    ).out_links()
+    transposed = rank_engines.LinkMatrix.from_page_links(graph).out_links()
+    assert out_indptr.tolist() == transposed[0].tolist()
+    for start, end in zip(out_indptr[:-1], out_indptr[1:]):
+        assert sorted(out_indices[start:end]) == sorted(
+            transposed[1][start:end]
+        )
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from page_ranker_app.source import rate_limiters
+
+
+def test_token_bucket_grants_burst_at_once():
+    bucket = rate_limiters.TokenBucket(rate=1, burst=5)
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    assert bucket.reserve() == pytest.approx(1, abs=0.05)
+
+
+def test_token_bucket_reserves_tokens_in_order():
+    bucket = rate_limiters.TokenBucket(rate=10, burst=1)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays == pytest.approx([0, 0.1, 0.2, 0.3], abs=0.02)
+
+
+def test_token_bucket_keeps_rate():
+    bucket = rate_limiters.TokenBucket(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(21):
+        bucket.acquire()
+    assert time.monotonic() - start == pytest.approx(0.2, abs=0.05)
+    assert bucket.granted == 21
+    assert bucket.achieved_rate == pytest.approx(100, rel=0.1)
+
+
+def test_token_bucket_acquire_async():
+    bucket = rate_limiters.TokenBucket(rate=100, burst=1)
+
+    async def acquire_all():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(11)))
+
+    start = time.monotonic()
+    asyncio.run(acquire_all())
+    assert time.monotonic() - start == pytest.approx(0.1, abs=0.05)
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 1), (-1, 1), (1, 0)])
+def test_token_bucket_invalid_arguments(rate, burst):
+    with pytest.raises(ValueError):
+        rate_limiters.TokenBucket(rate, burst)
+
+
+def test_rate_limiter_limits_hosts_separately():
+    limiter = rate_limiters.RateLimiter(
+        rate=1000, burst=10, host_rate=1, host_burst=1
+    )
+    assert limiter._reserve("https://en.wikipedia.org/wiki/A") == 0
+    assert limiter._reserve("https://de.wikipedia.org/wiki/A") == 0
+    assert limiter._reserve("https://en.wikipedia.org/wiki/B") > 0.9
+    assert limiter.stats["granted_requests"] == 3
+
+
+def test_rate_limiter_without_host_limits():
+    limiter = rate_limiters.RateLimiter(rate=1000, burst=10, host_rate=None)
+    delays = [limiter._reserve("https://en.wikipedia.org/") for _ in range(5)]
+    assert delays == [0.0] * 5
@@ -0,0 +1,56 @@
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from page_ranker_app.source import sessions
+from page_ranker_app.source.wiki_server import running_wiki_server
+
+
+def fetch_pages(session, base_url, pages_number, workers):
+    def fetch(page):
+        session.get(f"{base_url}/wiki/Page_{page}").raise_for_status()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, range(pages_number)))
+
+
+def test_pooled_session_reuses_a_connection_per_worker():
+    with running_wiki_server() as base_url, sessions.PooledSession(
+        5
+    ) as session:
+        fetch_pages(session, base_url, 30, workers=5)
+        stats = session.stats
+
+    assert stats["connections_opened"] <= 5
+    assert stats["connections_opened"] + stats["connections_reused"] == 30
+    assert stats["connection_pools"] == 1
+
+
+def test_pooled_session_caps_host_connections():
+    with running_wiki_server() as base_url, sessions.PooledSession(
+        5, host_connections=2
+    ) as session:
+        fetch_pages(session, base_url, 30, workers=5)
+        stats = session.stats
+
+    assert stats["connections_opened"] <= 2
+    assert stats["connections_reused"] >= 28
+
+
+def test_pooled_session_counts_dropped_pools():
+    with running_wiki_server() as base_url, sessions.PooledSession(
+        1, hosts=1
+    ) as session:
+        fetch_pages(session, base_url, 2, workers=1)
+        other_host = base_url.replace("127.0.0.1", "localhost")
+        fetch_pages(session, other_host, 2, workers=1)
+        stats = session.stats
+
+    assert stats["connection_pools"] == 1
+    assert stats["connections_opened"] == 2
+    assert stats["connections_reused"] == 2
+
+
+def test_pooled_session_needs_positive_sizes():
+    with pytest.raises(ValueError):
+        sessions.PooledSession(0)
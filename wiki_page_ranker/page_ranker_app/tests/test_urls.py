@@ -0,0 +1,84 @@
+import pytest
+
+from page_ranker_app.source import urls
+
+base = "https://en.wikipedia.org/"
+
+canonical_assets = [
+    ("/wiki/Royal_Commission#New_South_Wales", "/wiki/Royal_Commission"),
+    ("/wiki/Royal_Commission#History", "/wiki/Royal_Commission"),
+    ("/wiki/Prisoner%27s_rights", "/wiki/Prisoner%27s_rights"),
+    ("/wiki/Prisoner's_rights", "/wiki/Prisoner%27s_rights"),
+    ("/wiki/Superintendent_%28police%29", "/wiki/Superintendent_(police)"),
+    ("/wiki/Superintendent_(police)", "/wiki/Superintendent_(police)"),
+    ("/wiki/Z%c3%bcrich", "/wiki/Z%C3%BCrich"),
+    ("/wiki/Zürich", "/wiki/Z%C3%BCrich"),
+    ("/wiki/mental health", "/wiki/Mental_health"),
+    (" /wiki/Main_Page\n", "/wiki/Main_Page"),
+    ("/wiki/Category:Prisons", "/wiki/Category:Prisons"),
+    ("/wiki/AT%26T", "/wiki/AT%26T"),
+    ("/w/index.php?title=Main_Page", "/w/index.php?title=Main_Page"),
+    ("https://EN.Wikipedia.org/wiki/Sydney", "/wiki/Sydney"),
+]
+
+
+@pytest.mark.parametrize("href, expected", canonical_assets)
+def test_canonical_url(href, expected):
+    assert urls.canonical_url(href, base) == "https://en.wikipedia.org" + (
+        expected
+    )
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("sydney", "Sydney"),
+        ("New south wales", "New_south_wales"),
+        ("_Mental_health_", "Mental_health"),
+        ("ßeta", "ßeta"),
+        ("", ""),
+    ],
+)
+def test_canonical_title(title, expected):
+    assert urls.canonical_title(title) == expected
+
+
+def test_canonical_url_is_memoized():
+    urls.canonical_url.cache_clear()
+    for _ in range(3):
+        urls.canonical_url("/wiki/Sydney", base)
+    info = urls.canonical_url.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+    assert info.maxsize == urls.settings.CANONICAL_URL_CACHE_SIZE
+
+
+def test_redirect_map_rewrites_links_to_known_redirects():
+    redirects = urls.RedirectMap()
+    alias, target = base + "wiki/USA", base + "wiki/United_States"
+    assert not redirects.add(target, target + "#History")
+    assert redirects.add(alias, target.replace("wiki/U", "wiki/u"))
+    assert redirects.resolve(alias) == target
+    assert redirects.resolve(target) == target
+    assert redirects.rewrite([alias, target, alias]) == [target] * 3
+    redirects.count_saved_fetches(2)
+    assert redirects.stats == {
+        "redirects": 1,
+        "redirect_rewrites": 2,
+        "redirect_fetches_saved": 2,
+        "redirect_duplicate_fetches": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "url, title, href",
+    [
+        (base + "wiki/Sydney", "Sydney", "/wiki/Sydney"),
+        (base + "wiki/What%3F", "What?", "/wiki/What%3F"),
+        (base + "wiki/Z%C3%BCrich", "Zürich", "/wiki/Z%C3%BCrich"),
+        (base + "wiki/Big_(band)", "Big_(band)", "/wiki/Big_(band)"),
+    ],
+)
+def test_url_title_and_title_href(url, title, href):
+    assert urls.url_title(url) == title
+    assert urls.title_href(title.replace("_", " ")) == href
+    assert urls.canonical_url(href, base) == url